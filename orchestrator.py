@@ -2,61 +2,447 @@
 Orchestrates test generation and execution.
 '''
 
+import argparse
+import json
 import os
-import subprocess
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
-def run_test(test_name, gen_type, shape, rank, constraints, m2_filename):
-    print(f"[{time.strftime('%H:%M:%S')}] --- Starting {test_name} ---")
-    
-    m2_filepath = os.path.join("src", "M2", m2_filename)
-    log_dir = "results"
-    log_filepath = os.path.join(log_dir, f"{test_name}.log")
-    
-    os.makedirs(log_dir, exist_ok=True)
-    
-    gen_cmd = [
-        "python", os.path.join("src", "generate.py"),
-        "--type", gen_type,
-        "--field", "ZZ/32003",
-        "--shape", shape,
-        "--rank", str(rank),
-        "--constraints", constraints,
-        "--out", m2_filename
-    ]
-    
-    print(f"Generating {m2_filepath} using {gen_type} generator...")
-    subprocess.run(gen_cmd, check=True)
-    
-    print(f"Executing M2... (routing to {log_filepath})")
-    start_time = time.time()
-    
-    with open(log_filepath, "w") as log_file:
-        m2_cmd = ["M2", "--script", m2_filepath]
-        
-        process = subprocess.run(m2_cmd, stdout=log_file, stderr=subprocess.STDOUT)
-        
-    elapsed = time.time() - start_time
-    
-    if process.returncode == 0:
-        print(f"[{time.strftime('%H:%M:%S')}] {test_name} completed in {elapsed:.2f} seconds.\n")
-    else:
-        print(f"[{time.strftime('%H:%M:%S')}] {test_name} failed with return code {process.returncode}. Check log.\n")
+from _utils._broker import DEFAULT_HOST, DEFAULT_PORT, HEARTBEAT_TIMEOUT, Broker, run_worker
+from _utils._cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
+from _utils._estimate import MIN_RECORDS, RuntimeModel, estimate
+from _utils._flattenings import parse_bipartitions
+from _utils._journal import JobJournal
+from _utils._multiprime import run_multiprime
+from _utils._portfolio import race
+from _utils._results import DEFAULT_RESULTS_PATH, ResultsStore, make_record, summarize
+from _utils._scheduler import make_job, run_job, run_jobs
+from _utils._sweep import cost_ordered, record_results, run_sweep, sweep_jobs
+from generate import GENERATOR_TYPES, elimination_options, generator_symmetries, parse_constraints
 
 
-if __name__ == "__main__":
+JOBS = [
     # Baseline Verification
     # Expected: Finishes very quickly. Betti table shows 9 quadrics.
-    run_test("test1_baseline", "flattening", "3,3,3", 2, "2,0,0", "test1_baseline.m2")
-    
+    make_job("test1_baseline", "flattening", "3,3,3", 2, "2,0,0"),
+
     # Confounding Triangle
     # Expected: Takes moderate time. Shows how degree-4 bounds deform.
-    run_test("test2_triangle", "strassen", "3,3,3", 3, "2,0,1;2,1,2", "test2_triangle.m2")
-    
+    make_job("test2_triangle", "strassen", "3,3,3", 3, "2,0,1;2,1,2"),
+
     # Overcomplete DAG
     # Constraint: We force a 2x2 bipartite zero block in the 3rd mode.
     # Expected: Longest runtime. Tests the flattening approach on an overcomplete model.
-    run_test("test3_overcomplete", "flattening", "4,4,4", 3, "2,0,0;2,0,1;2,1,0;2,1,1", "test3_overcomplete.m2")
-    
-    print("Done.")
\ No newline at end of file
+    make_job("test3_overcomplete", "flattening", "4,4,4", 3, "2,0,0;2,0,1;2,1,0;2,1,1"),
+]
+
+
+def report(result):
+    name = result["name"]
+    stamp = time.strftime('%H:%M:%S')
+    record = make_record(result)
+    summary = summarize(record)
+    if result["status"] == "ok" and result.get("cached"):
+        print(f"[{stamp}] {name} served from cache (originally {result['elapsed']:.2f} seconds). {summary}")
+    elif result["status"] == "ok" and result.get("peak_rss_kb") is None:
+        print(f"[{stamp}] {name} completed in {result['elapsed']:.2f} seconds. {summary}")
+    elif result["status"] == "ok":
+        print(f"[{stamp}] {name} completed in {result['elapsed']:.2f} seconds (peak RSS {result['peak_rss_kb'] / 1024:.1f} MB). {summary}")
+    elif result["status"] == "refused":
+        print(f"[{stamp}] {name} refused: {result['error']}.")
+    elif result.get("strategy") == "auto":
+        print(f"[{stamp}] {name}: no strategy finished ({result['status']}). Check log.")
+    elif result["status"] == "timeout":
+        print(f"[{stamp}] {name} timed out after {result['elapsed']:.2f} seconds. Check log.")
+    elif result["status"] == "failed":
+        print(f"[{stamp}] {name} failed with return code {result['returncode']}. Check log.")
+    else:
+        print(f"[{stamp}] {name} could not run: {result.get('error')}")
+    if "race" in result:
+        outcomes = ", ".join(f"{strategy} {outcome['status']}" for strategy, outcome in result["race"].items())
+        print(f"    race won by {result['type'] if result['status'] == 'ok' else 'nobody'}: {outcomes}")
+    if "profile" in record:
+        report_profile(record["profile"])
+
+
+def report_profile(profile):
+    for stage, timing in profile["stages"].items():
+        print(f"    {stage:<12} {timing['wall']:10.3f}s wall {timing['cpu']:10.3f}s cpu")
+    if profile["sizes"]:
+        print("    sizes: " + ", ".join(f"{name}={value}" for name, value in profile["sizes"].items()))
+
+
+def run_test(test_name, gen_type, shape, rank, constraints, m2_filename):
+    print(f"[{time.strftime('%H:%M:%S')}] --- Starting {test_name} ---")
+    job = make_job(test_name, gen_type, shape, rank, constraints, out=m2_filename)
+    report(run_job(job))
+    print()
+
+
+def parse_budgets(budgets):
+    if not budgets:
+        return None
+    return {strategy: float(seconds) for strategy, seconds in (item.split('=') for item in budgets.split(','))}
+
+
+def run_command(args, cache, store, model=None):
+    job = make_job(args.name or f"{args.type}_{args.shape.replace(',', 'x')}_r{args.rank}", args.type,
+                   args.shape, args.rank, args.constraints, field=args.field)
+    print(f"[{time.strftime('%H:%M:%S')}] --- Starting {job['name']} ---")
+    job["engine"] = args.engine
+    options = {}
+    if args.points > 1:
+        options["points"] = args.points
+    if args.incremental:
+        options["incremental"] = True
+    if args.bipartitions:
+        options["bipartitions"] = parse_bipartitions(args.bipartitions)
+    if args.slices:
+        options["slices"] = args.slices
+    if args.slice_count:
+        options["slice_count"] = args.slice_count
+    if args.stream_minors:
+        options["stream_minors"] = True
+    if args.block_order or args.degree_limit or args.linear_section:
+        options["elimination"] = elimination_options(args)
+    if args.jacobian == "evaluated":
+        options["jacobian"] = "evaluated"
+    if args.seed is not None:
+        if args.engine == "native":
+            job["seed"] = args.seed
+        elif args.type == "terracini":
+            options["jacobian_seed"] = args.seed
+        elif args.slices == "random":
+            options["slice_seed"] = args.seed
+    if args.profile:
+        options["profile"] = True
+    if options:
+        job["options"] = options
+    if args.primes > 1:
+        multiprime_command(args, job, cache, store, model)
+        return
+
+    reason = model.refusal(job, args.timeout, args.mem_limit) if model else None
+    if reason:
+        result = dict(job, status="refused", error=reason)
+    elif args.type == "auto":
+        result = race(job, strategies=args.strategies.split(',') if args.strategies else None, width=args.width,
+                      budgets=parse_budgets(args.budgets), log_dir=args.log_dir, timeout=args.timeout,
+                      mem_limit_mb=args.mem_limit, cache=cache)
+    else:
+        result = run_job(job, log_dir=args.log_dir, timeout=args.timeout, mem_limit_mb=args.mem_limit, cache=cache)
+    store.append(result)
+    report(result)
+
+
+def multiprime_command(args, job, cache, store, model=None):
+    results, check = run_multiprime(job, args.primes, points=args.points, seed=args.seed, log_dir=args.log_dir,
+                                    timeout=args.timeout, mem_limit_mb=args.mem_limit, cache=cache,
+                                    persistent=args.persistent, model=model)
+    for result in sorted(results, key=lambda r: r["prime"]):
+        store.append(result)
+        report(result)
+
+    if check["consensus"] is None:
+        print("No prime produced an answer.")
+        return
+    if check["agree"]:
+        print(f"All {len(check['primes'])} primes agree.")
+    else:
+        if check["dissenting"]:
+            print(f"DISAGREEMENT: primes {check['dissenting']} differ from the consensus.")
+        if check["missing"]:
+            print(f"No answer from primes {check['missing']}.")
+    if "error_bound" in check:
+        print(f"Dimension {check['consensus']}; probability that the generic rank is higher: <= {check['error_bound']:.3g}")
+
+
+def cache_command(args, cache):
+    if args.action == "stats":
+        stats = cache.stats()
+        print(f"{stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f} MB of {stats['max_bytes'] / 1024 / 1024:.1f} MB in {stats['cache_dir']}")
+    elif args.action == "clear":
+        print(f"Removed {cache.clear()} entries.")
+    elif args.action == "invalidate":
+        filters = {}
+        if args.type:
+            filters["type"] = args.type
+        if args.shape:
+            filters["shape"] = list(map(int, args.shape.split(',')))
+        if args.rank is not None:
+            filters["rank"] = args.rank
+        if args.constraints is not None:
+            filters["constraints"] = parse_constraints(args.constraints)
+        if args.field:
+            filters["field"] = "".join(args.field.split())
+        if not filters:
+            raise SystemExit("invalidate needs at least one filter; use 'cache clear' to drop everything.")
+        print(f"Removed {cache.invalidate(**filters)} entries.")
+
+
+def results_command(args, store):
+    filters = {key: getattr(args, key) for key in ("name", "type", "shape", "status") if getattr(args, key)}
+    if args.rank is not None:
+        filters["rank"] = args.rank
+    records = store.latest(**filters) if args.latest else list(store.query(**filters))
+    for record in records:
+        if args.json:
+            print(json.dumps(record))
+            continue
+        elapsed = record.get("elapsed")
+        elapsed_str = f"{elapsed:.2f}s" if elapsed is not None else "-"
+        print(f"{record.get('name', ''):<36} {record.get('type', ''):<11} {record.get('shape', ''):<9} "
+              f"r={record.get('rank', '')} {record.get('status', ''):<8} {elapsed_str:>9}  {summarize(record)}")
+
+
+def parse_ranks(ranks):
+    if '-' in ranks:
+        low, high = map(int, ranks.split('-'))
+        return list(range(low, high + 1))
+    return list(map(int, ranks.split(',')))
+
+
+def estimate_command(args, model):
+    shape = list(map(int, args.shape.split(',')))
+    bipartitions = parse_bipartitions(args.bipartitions)
+    counts = estimate(args.type, shape, args.rank, parse_constraints(args.constraints), prune=not args.no_prune,
+                      bipartitions=bipartitions)
+    for key, value in counts.items():
+        if key != "type":
+            print(f"{key:<18} {value}")
+    job = make_job("estimate", args.type, args.shape, args.rank, args.constraints, field=args.field)
+    job["options"] = {"prune": False} if args.no_prune else {}
+    if args.bipartitions:
+        job["options"]["bipartitions"] = bipartitions
+    prediction = model.predict(job) if model else None
+    if prediction is None:
+        print(f"No runtime prediction: fewer than {MIN_RECORDS} successful runs in the results store.")
+    else:
+        print(f"predicted runtime   {prediction['seconds']:.2f}s (optimistic {prediction['seconds_low']:.2f}s)")
+        print(f"predicted peak RSS  {prediction['rss_kb'] / 1024:.1f} MB (optimistic {prediction['rss_kb_low'] / 1024:.1f} MB)")
+
+
+def report_resume(journal, label):
+    counts = journal.counts()
+    if any(counts.values()):
+        print(f"[{time.strftime('%H:%M:%S')}] Resuming {label} from {journal.path}: " +
+              ", ".join(f"{count} {state}" for state, count in counts.items() if count))
+
+
+def sweep_command(args, cache, model=None, journal=None):
+    if args.engine == "native" and args.type != "terracini":
+        raise SystemExit("--engine native is only available for --type terracini")
+    if args.engine == "native" and (args.timeout or args.mem_limit):
+        raise SystemExit("--timeout and --mem-limit only apply to M2 runs, not --engine native")
+    if args.engine == "native" and args.profile:
+        raise SystemExit("--profile times the stages of M2 scripts and cannot be combined with --engine native")
+    if (args.points > 1 or args.seed is not None) and args.type != "terracini":
+        raise SystemExit("--points and --seed are only available for --type terracini")
+    shape = list(map(int, args.shape.split(',')))
+    jobs = sweep_jobs(args.type, shape, parse_ranks(args.ranks), args.max_zeros, field=args.field,
+                      engine=args.engine, symmetries=generator_symmetries(args.type), points=args.points,
+                      seed=args.seed)
+    if args.profile:
+        jobs = (dict(job, options=dict(job.get("options", {}), profile=True)) for job in jobs)
+
+    if journal:
+        report_resume(journal, "sweep")
+        jobs = journal.resume(jobs)
+
+    print(f"[{time.strftime('%H:%M:%S')}] --- Sweeping {args.type} over {args.shape}, ranks {args.ranks}, up to {args.max_zeros} zeros -> {args.out} ---")
+    counts = {}
+    ordered = cost_ordered(jobs, cost=model.cost, window=args.window) if model else cost_ordered(jobs, window=args.window)
+    if args.serve:
+        broker = Broker(ordered, host=args.host, port=args.port, heartbeat_timeout=args.heartbeat_timeout,
+                        timeout=args.timeout, mem_limit_mb=args.mem_limit, model=model, journal=journal)
+        broker.start()
+        print(f"[{time.strftime('%H:%M:%S')}] Serving jobs on {broker.host}:{broker.port}; start workers with "
+              f"'orchestrator.py worker --host {broker.host} --port {broker.port}'")
+        results = record_results(broker.run(), args.out)
+    else:
+        results = run_sweep(ordered, args.out, workers=args.workers, log_dir=args.log_dir, timeout=args.timeout,
+                            mem_limit_mb=args.mem_limit, cache=cache, persistent=args.persistent, model=model,
+                            journal=journal)
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if args.serve:
+            print(f"[{time.strftime('%H:%M:%S')}] {result['name']}: {result['status']} on {result.get('worker', '-')}")
+    print(f"[{time.strftime('%H:%M:%S')}] Finished {sum(counts.values())} jobs: {counts}")
+
+
+def worker_command(args, cache):
+    print(f"[{time.strftime('%H:%M:%S')}] --- Worker pulling jobs from {args.host}:{args.port} ---")
+    counts = {}
+    try:
+        for result in run_worker(args.host, args.port, worker=args.id, timeout=args.timeout, mem_limit_mb=args.mem_limit,
+                                 cache=cache, persistent=args.persistent):
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            report(result)
+    except OSError as e:
+        raise SystemExit(f"Could not reach the broker at {args.host}:{args.port}: {e}")
+    print(f"[{time.strftime('%H:%M:%S')}] Broker finished; ran {sum(counts.values())} jobs: {counts}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run generator jobs in parallel.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument('--timeout', type=float, default=None, help="Wall-clock limit per M2 job, in seconds")
+    parser.add_argument('--mem-limit', type=float, default=None, help="Address-space cap per M2 job, in MB")
+    parser.add_argument('--log-dir', type=str, default="results", help="Directory for M2 logs")
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR, help="Result cache directory")
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, help="Result cache size bound, in MB")
+    parser.add_argument('--no-cache', action='store_true', help="Always rerun M2 and do not store results")
+    parser.add_argument('--results', type=str, default=DEFAULT_RESULTS_PATH, help="JSONL results store run records are appended to")
+    parser.add_argument('--persistent', action='store_true', help="Run jobs on long-lived M2 interpreters instead of one M2 process per job")
+    parser.add_argument('--cost-model', action='store_true', help="Fit a runtime model on the results store; order sweeps by predicted cost and refuse jobs predicted to exceed --timeout or --mem-limit")
+    parser.add_argument('--profile', action='store_true', help="Time each stage of the M2 scripts and report the breakdown (test jobs, run and sweep)")
+    parser.add_argument('--journal', type=str, default=None, help="Journal file of job states; rerunning the same command resumes unfinished jobs")
+    parser.add_argument('--max-attempts', type=int, default=1, help="With --journal, how many times a failed, timed-out, cancelled or interrupted job is started in total")
+
+    subparsers = parser.add_subparsers(dest="command")
+    cache_parser = subparsers.add_parser("cache", help="Inspect or invalidate the result cache")
+    cache_parser.add_argument('action', choices=['stats', 'clear', 'invalidate'])
+    cache_parser.add_argument('--type', type=str, default=None)
+    cache_parser.add_argument('--shape', type=str, default=None)
+    cache_parser.add_argument('--rank', type=int, default=None)
+    cache_parser.add_argument('--constraints', type=str, default=None)
+    cache_parser.add_argument('--field', type=str, default=None)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Run every constraint pattern up to symmetry")
+    sweep_parser.add_argument('--type', type=str, required=True, choices=GENERATOR_TYPES)
+    sweep_parser.add_argument('--engine', type=str, default='m2', choices=['m2', 'native'])
+    sweep_parser.add_argument('--shape', type=str, required=True, help="Tensor dimensions, e.g., '3,3,3'")
+    sweep_parser.add_argument('--ranks', type=str, required=True, help="Rank range '1-4' or list '2,3'")
+    sweep_parser.add_argument('--max-zeros', type=int, required=True, help="Maximum number of zeroed factor entries")
+    sweep_parser.add_argument('--field', type=str, default="ZZ/32003")
+    sweep_parser.add_argument('--out', type=str, default=os.path.join("results", "sweep.jsonl"), help="JSONL file results are appended to")
+    sweep_parser.add_argument('--window', type=int, default=10000, help="Lookahead window for cheapest-first ordering")
+    sweep_parser.add_argument('--points', type=int, default=1, help="Random points per pattern for the Terracini Jacobian rank; the maximum rank is kept")
+    sweep_parser.add_argument('--seed', type=int, default=None, help="Seed the per-job Terracini points are spawned from (default: fresh entropy)")
+    sweep_parser.add_argument('--serve', action='store_true', help="Hand the jobs out to remote workers through a broker instead of running them locally")
+    sweep_parser.add_argument('--host', type=str, default=DEFAULT_HOST, help="Address the broker binds to (with --serve)")
+    sweep_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port the broker listens on (with --serve)")
+    sweep_parser.add_argument('--heartbeat-timeout', type=float, default=HEARTBEAT_TIMEOUT, help="Seconds of silence before a worker is declared dead and its jobs requeued")
+
+    worker_parser = subparsers.add_parser("worker", help="Pull jobs from a sweep broker and run them on this node")
+    worker_parser.add_argument('--host', type=str, default=DEFAULT_HOST, help="Broker address")
+    worker_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Broker port")
+    worker_parser.add_argument('--id', type=str, default=None, help="Worker name reported to the broker (default: host-pid)")
+
+    run_parser = subparsers.add_parser("run", help="Run a single problem, or race generators on it with --type auto")
+    run_parser.add_argument('--type', type=str, required=True, choices=GENERATOR_TYPES + ['auto'])
+    run_parser.add_argument('--shape', type=str, required=True, help="Tensor dimensions, e.g., '3,3,3'")
+    run_parser.add_argument('--rank', type=int, required=True)
+    run_parser.add_argument('--constraints', type=str, default="", help="Semicolon-separated 'mode,row,col' triples")
+    run_parser.add_argument('--field', type=str, default="ZZ/32003")
+    run_parser.add_argument('--name', type=str, default=None)
+    run_parser.add_argument('--strategies', type=str, default=None, help="Comma-separated generators to race (default: all sound ones)")
+    run_parser.add_argument('--width', type=int, default=None, help="Race only the N historically best strategies")
+    run_parser.add_argument('--engine', type=str, default='m2', choices=['m2', 'native'])
+    run_parser.add_argument('--primes', type=int, default=1, help="Run over this many primes (from 32003 up) in parallel and compare the answers")
+    run_parser.add_argument('--points', type=int, default=1, help="Random points per prime for the Terracini Jacobian rank")
+    run_parser.add_argument('--seed', type=int, default=None, help="Seed for the Terracini random points (spread over the primes with --primes), or for --slices random (default: fresh entropy)")
+    run_parser.add_argument('--jacobian', type=str, default='symbolic', choices=['symbolic', 'evaluated'], help="Evaluate the Terracini Jacobian mod p in Python so M2 only computes its rank")
+    run_parser.add_argument('--incremental', action='store_true', help="Report the Terracini dimension for every rank up to --rank in one pass (native engine)")
+    run_parser.add_argument('--bipartitions', type=str, default=None, help="Flattenings to use: principal, balanced, cheapest, all, or row modes such as '0,1;0,2' (flattening only)")
+    run_parser.add_argument('--slices', type=str, default=None, choices=['all', 'covering', 'minimal', 'random'], help="Which 2D slices to take minors of (slicing only)")
+    run_parser.add_argument('--slice-count', type=int, default=None, help="Number of slices for --slices random")
+    run_parser.add_argument('--stream-minors', action='store_true', help="Add slice minors one slice at a time into a deduplicated set (slicing only)")
+    run_parser.add_argument('--block-order', action='store_true', help="Eliminate with an explicit Groebner basis in a block elimination order (not terracini)")
+    run_parser.add_argument('--degree-limit', type=int, default=None, help="Only compute generators up to this degree (implies --block-order)")
+    run_parser.add_argument('--linear-section', type=int, default=0, help="Cut by this many random hyperplanes before eliminating (implies --block-order)")
+    run_parser.add_argument('--budgets', type=str, default=None, help="Per-strategy time budgets, e.g. 'full=60,flattening=600'")
+
+    estimate_parser = subparsers.add_parser("estimate", help="Count what a job will build and predict its cost, without running it")
+    estimate_parser.add_argument('--type', type=str, required=True, choices=GENERATOR_TYPES)
+    estimate_parser.add_argument('--shape', type=str, required=True, help="Tensor dimensions, e.g., '3,3,3'")
+    estimate_parser.add_argument('--rank', type=int, required=True)
+    estimate_parser.add_argument('--constraints', type=str, default="", help="Semicolon-separated 'mode,row,col' triples")
+    estimate_parser.add_argument('--field', type=str, default="ZZ/32003")
+    estimate_parser.add_argument('--no-prune', action='store_true')
+    estimate_parser.add_argument('--bipartitions', type=str, default=None, help="Flattenings to count for --type flattening")
+
+    results_parser = subparsers.add_parser("results", help="Query the results store")
+    results_parser.add_argument('--name', type=str, default=None)
+    results_parser.add_argument('--type', type=str, default=None)
+    results_parser.add_argument('--shape', type=str, default=None)
+    results_parser.add_argument('--rank', type=int, default=None)
+    results_parser.add_argument('--status', type=str, default=None)
+    results_parser.add_argument('--latest', action='store_true', help="Only the most recent record per job name")
+    results_parser.add_argument('--json', action='store_true', help="Print raw JSON records")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.results)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+
+    if args.command == "cache":
+        if cache is None:
+            parser.error("cache commands cannot be combined with --no-cache")
+        cache_command(args, cache)
+        raise SystemExit(0)
+
+    model = RuntimeModel.fit(store.records()) if args.cost_model or args.command == "estimate" else None
+    journal = JobJournal(args.journal, max_attempts=args.max_attempts) if args.journal else None
+
+    if args.command == "estimate":
+        estimate_command(args, model)
+        raise SystemExit(0)
+
+    if args.command == "run":
+        if args.type == "auto" and args.primes > 1:
+            parser.error("--primes cannot be combined with --type auto")
+        if args.engine == "native" and args.type != "terracini":
+            parser.error("--engine native is only available for --type terracini")
+        if args.engine == "native" and (args.timeout or args.mem_limit):
+            parser.error("--timeout and --mem-limit only apply to M2 runs, not --engine native")
+        if args.engine == "native" and args.profile:
+            parser.error("--profile times the stages of M2 scripts and cannot be combined with --engine native")
+        if args.points > 1 and args.type != "terracini":
+            parser.error("--points is only available for --type terracini")
+        if args.jacobian != "symbolic" and (args.type != "terracini" or args.engine != "m2"):
+            parser.error("--jacobian is only available for --type terracini with --engine m2")
+        if args.incremental and (args.engine != "native" or args.points > 1 or args.primes > 1):
+            parser.error("--incremental needs --engine native and cannot be combined with --points or --primes")
+        if args.bipartitions and args.type != "flattening":
+            parser.error("--bipartitions is only available for --type flattening")
+        if (args.block_order or args.degree_limit or args.linear_section) and args.type == "terracini":
+            parser.error("--block-order, --degree-limit and --linear-section are not available for --type terracini")
+        if (args.slices or args.slice_count or args.stream_minors) and args.type != "slicing":
+            parser.error("--slices, --slice-count and --stream-minors are only available for --type slicing")
+        if args.seed is not None and args.type != "terracini" and args.slices != "random":
+            parser.error("--seed is only used with --type terracini or --slices random")
+        if args.slice_count and args.slices != "random":
+            parser.error("--slice-count is only used with --slices random")
+        run_command(args, cache, store, model)
+        raise SystemExit(0)
+
+    if args.command == "results":
+        results_command(args, store)
+        raise SystemExit(0)
+
+    if args.command == "worker":
+        worker_command(args, cache)
+        raise SystemExit(0)
+
+    if args.command == "sweep":
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        sweep_command(args, cache, model, journal)
+        raise SystemExit(0)
+
+    jobs = JOBS
+    if args.profile:
+        jobs = [dict(job, options=dict(job.get("options", {}), profile=True)) for job in JOBS]
+    if journal:
+        report_resume(journal, "test jobs")
+        jobs = list(journal.resume(jobs))
+
+    print(f"[{time.strftime('%H:%M:%S')}] --- Running {len(jobs)} jobs on {args.workers} workers ---")
+    for result in run_jobs(jobs, workers=args.workers, log_dir=args.log_dir, timeout=args.timeout,
+                           mem_limit_mb=args.mem_limit, cache=cache, persistent=args.persistent, model=model,
+                           journal=journal):
+        store.append(result)
+        report(result)
+
+    print("Done.")
@@ -1,121 +1,101 @@
 '''
 Generates M2 script to compute the defining ideal of a graph-constrained secant variety.
 
-Constructs the principal tensor flattenings and derives the ideal from the rank conditions on these flattenings, while respecting the specified constraints.
+Constructs tensor flattenings and derives the ideal from the rank conditions on these flattenings, while respecting the specified constraints. By default these are the principal flattenings; bipartitions= selects other bipartitions of the modes (see _utils._flattenings).
 '''
 
-import itertools
+from _utils._base import SecantGenerator
+from _utils._elimination import elimination_strategy
+from _utils._flattenings import select_bipartitions
+from _utils._profile import stage_begin, stage_end
 
 
-class ConstrainedSecantGenerator:
+GENERATOR_VERSION = 2
+SYMMETRIES = ("cols", "rows", "modes")
 
-    def __init__(self, shape, rank, constraints=None, field="QQ"):
-        self.shape = shape
-        self.rank = rank
-        self.constraints = set(constraints) if constraints else set()
-        self.field = field
 
-    def get_factor_var(self, mode, row, col):
-        if (mode, row, col) in self.constraints:
-            return "0"
-        return f"v_({mode},{row},{col})"
+class ConstrainedSecantGenerator(SecantGenerator):
 
-    def get_tensor_var(self, indices):
-        idx_str = ",".join(map(str, indices))
-        return f"t_({idx_str})"
+    TITLE = "Graph-Constrained Secant Variety Generator"
+    ELIMINATION_COMMENT = "implicit equations by elimination of factor variables"
 
-    def _generate_flattenings(self):
-        m2_code = "-- Constructing Principal Tensor Flattenings\n"
-        flattening_names = []
-        
-        for mode in range(len(self.shape)):
-            rows = self.shape[mode]
-            col_dims = [self.shape[i] for i in range(len(self.shape)) if i != mode]
-            col_ranges = [range(dim) for dim in col_dims]
-            
-            matrix_rows = []
-            for r in range(rows):
-                row_elements = []
-                for col_indices in itertools.product(*col_ranges):
-                    full_indices = list(col_indices)
-                    full_indices.insert(mode, r)
-                    row_elements.append(self.get_tensor_var(full_indices))
-                matrix_rows.append("{" + ", ".join(row_elements) + "}")
-            
-            mat_name = f"F_{mode}"
-            flattening_names.append(mat_name)
-            m2_code += f"{mat_name} = matrix{{\n    "
-            m2_code += ",\n    ".join(matrix_rows)
-            m2_code += "\n}\n\n"
-            
-        return m2_code, flattening_names
-
-    def generate_m2_script(self):
-        m2_code = f"-- Graph-Constrained Secant Variety Generator\n"
-        m2_code += f"-- Tensor Shape: {self.shape}, CP Rank: {self.rank}\n\n"
-        
-        # non-zero factors (latent components)
-        factor_vars = []
-        for mode, dim in enumerate(self.shape):
-            for row in range(dim):
-                for col in range(self.rank):
-                    if (mode, row, col) not in self.constraints:
-                        factor_vars.append(self.get_factor_var(mode, row, col))
-        
-        # observable tensor variables
-        tensor_vars = []
-        ranges = [range(dim) for dim in self.shape]
-        for indices in itertools.product(*ranges):
-            tensor_vars.append(self.get_tensor_var(indices))
-
-        # polynomial ring
-        all_vars = factor_vars + tensor_vars
-        m2_code += f"kk = {self.field}\n"
-        m2_code += f"R = kk[{', '.join(all_vars)}]\n\n"
-
-        # constrained CP ideal
-        m2_code += "I_cp = ideal(\n"
-        generators = []
-        for indices in itertools.product(*ranges):
-            t_var = self.get_tensor_var(indices)
-            cp_sum_terms = []
-            
-            for j in range(self.rank):
-                term_factors = []
-                for mode, row_idx in enumerate(indices):
-                    term_factors.append(self.get_factor_var(mode, row_idx, j))
-                
-                if "0" not in term_factors:
-                    cp_sum_terms.append("*".join(term_factors))
-            
-            cp_expr = " + ".join(cp_sum_terms) if cp_sum_terms else "0"
-            generators.append(f"    {t_var} - ({cp_expr})")
+    def __init__(self, shape, rank, constraints=None, field="QQ", prune=True, compact=False, profile=False,
+                 bipartitions="principal", elimination=None):
+        super().__init__(shape, rank, constraints, field, prune, compact, profile)
+        self.elimination = elimination_strategy(elimination)
+        # row modes of each flattening; the column modes are the rest
+        self.bipartitions = select_bipartitions(shape, rank, bipartitions)
+
+    def _is_principal(self):
+        return all(len(row_modes) == 1 for row_modes in self.bipartitions)
+
+    def _flattening_names(self):
+        return [f"F_{'_'.join(map(str, row_modes))}" for row_modes in self.bipartitions]
+
+    def _emit_flattenings(self):
+        if self._is_principal():
+            yield "-- Constructing Principal Tensor Flattenings\n"
+        else:
+            yield "-- Constructing Tensor Flattenings: " + ", ".join(
+                f"{set(row_modes)} vs rest" for row_modes in self.bipartitions) + "\n"
         
-        m2_code += ",\n".join(generators)
-        m2_code += "\n)\n\n"
+        for row_modes, mat_name in zip(self.bipartitions, self._flattening_names()):
+            col_modes = [i for i in range(len(self.shape)) if i not in row_modes]
+            rows = self.index.tensor_matrix(row_modes, col_modes, self.support is not None)
+            yield f"{mat_name} = matrix{{\n    "
+            for r, row_elements in enumerate(rows):
+                if r > 0:
+                    yield ",\n    "
+                yield "{" + ", ".join(row_elements) + "}"
+            yield "\n}\n\n"
+
+    def emit(self):
+        if self.compact:
+            yield from self._emit_compact()
+            return
+
+        yield from self._emit_ring_and_cp_ideal("I_cp")
 
         # tensor flattenings
-        flattening_code, f_names = self._generate_flattenings()
-        m2_code += flattening_code
+        yield from stage_begin(self.profile)
+        yield from self._emit_flattenings()
+        yield from stage_end(self.profile, "flattenings")
 
         # adding minors
         minor_size = self.rank + 1
-        m2_code += f"-- computing {minor_size}x{minor_size} minors of flattenings\n"
-        minors_terms = [f"minors({minor_size}, {name})" for name in f_names]
-        m2_code += f"minorsIdeal = {' + '.join(minors_terms)}\n\n"
-
-        # elimination
-        m2_code += f"-- implicit equations by elimination of factor variables\n"
-        m2_code += f"factorVars = {{{', '.join(factor_vars)}}}\n"
-        m2_code += f"J = eliminate(factorVars, I_cp + minorsIdeal)\n\n"
-        
-        m2_code += f"print \"Betti Table of the Generators\"\n"
-        m2_code += f"print net betti gens J\n\n"
+        yield f"-- computing {minor_size}x{minor_size} minors of flattenings\n"
+        minors_terms = [f"minors({minor_size}, {name})" for name in self._flattening_names()]
+        yield from stage_begin(self.profile)
+        yield f"minorsIdeal = {' + '.join(minors_terms) or 'ideal(0_R)'}\n\n"
+        yield from stage_end(self.profile, "minors", [("minorsIdeal", "numgens minorsIdeal")])
 
-        return m2_code
+        yield from self._emit_elimination("I_cp + minorsIdeal")
 
-    def export(self, filename="compute_secant.m2"):
-        script = self.generate_m2_script()
-        with open(filename, "w") as f:
-            f.write(script)
-        print(f"Compiled into {filename}")
\ No newline at end of file
+    def _emit_compact(self):
+        yield from self._emit_compact_ring_and_cp_ideal("I_cp")
+
+        minor_size = self.rank + 1
+        if self._is_principal():
+            yield "-- principal flattenings: rows indexed by one mode, columns by the remaining modes\n"
+            yield "flattening = m -> matrix apply(shape#m, r -> apply(select(allIndices, x -> x#m == 0),\n"
+            yield "    x -> tv toSequence apply(#shape, k -> if k == m then r else x#k)))\n\n"
+            modes = [row_modes[0] for row_modes in self.bipartitions]
+            if modes == list(range(len(self.shape))):
+                minors_expr = f"sum(#shape, m -> minors({minor_size}, flattening m))"
+            else:
+                minors_expr = " + ".join(f"minors({minor_size}, flattening {m})" for m in modes)
+        else:
+            yield "-- flattenings: rows indexed by the row modes, columns by the remaining modes\n"
+            yield "flattening = (rowModes, colModes) -> matrix apply(select(allIndices, x -> all(colModes, k -> x#k == 0)),\n"
+            yield "    r -> apply(select(allIndices, x -> all(rowModes, k -> x#k == 0)),\n"
+            yield "        x -> tv toSequence apply(#shape, k -> if member(k, rowModes) then r#k else x#k)))\n\n"
+            minors_expr = " + ".join(
+                f"minors({minor_size}, flattening({{{', '.join(map(str, row_modes))}}}, "
+                f"{{{', '.join(str(k) for k in range(len(self.shape)) if k not in row_modes)}}}))"
+                for row_modes in self.bipartitions)
+        yield f"-- computing {minor_size}x{minor_size} minors of flattenings\n"
+        yield from stage_begin(self.profile)
+        yield f"minorsIdeal = {minors_expr or 'ideal(0_R)'}\n\n"
+        yield from stage_end(self.profile, "minors", [("minorsIdeal", "numgens minorsIdeal")])
+
+        yield from self._emit_elimination("I_cp + minorsIdeal")
@@ -0,0 +1,101 @@
+'''
+Generates M2 script to compute the defining ideal of a graph-constrained secant variety.
+
+Uses the minors of a Koszul-Young flattening as a computational shortcut, generalizing Strassen's equations to other shapes and ranks. The flattening (modes, restriction and degree) is chosen automatically by _utils._koszul, and the matrix is assembled from sparse wedge blocks and tensor slices.
+'''
+
+import math
+
+from _utils._base import SecantGenerator
+from _utils._elimination import elimination_strategy
+from _utils._koszul import choose_configuration, wedge_entries
+from _utils._profile import stage_begin, stage_end
+
+
+GENERATOR_VERSION = 1
+# the flattening singles out modes and a restriction of one of them, so only rank components are interchangeable
+SYMMETRIES = ("cols",)
+
+
+class ConstrainedSecantGenerator(SecantGenerator):
+
+    def __init__(self, shape, rank, constraints=None, field="QQ", prune=True, compact=False, profile=False,
+                 koszul_degree=None, elimination=None):
+        super().__init__(shape, rank, constraints, field, prune, compact, profile)
+        self.elimination = elimination_strategy(elimination)
+        self.koszul = choose_configuration(shape, rank, koszul_degree)
+
+    def _emit_koszul_header(self):
+        config = self.koszul
+        b_modes = ", ".join(map(str, config["b_modes"]))
+        c_modes = ", ".join(map(str, config["c_modes"]))
+        yield f"-- Koszul-Young flattening of degree {config['degree']}: A = mode {config['a_mode']} "
+        yield f"(first {config['a_dim']} coordinates), B = modes {{{b_modes}}}, C = modes {{{c_modes}}}\n"
+        yield f"-- {config['rows']} x {config['cols']} matrix; its {config['minor_size']}x{config['minor_size']} minors vanish up to rank {self.rank}\n"
+
+    def _emit_wedges(self):
+        config = self.koszul
+        a_dim, p = config["a_dim"], config["degree"]
+        yield f"-- wedging with e_i, Lambda^{p} -> Lambda^{p + 1} of the restricted A\n"
+        for i in range(a_dim):
+            entries = ", ".join(f"({row}, {col}) => {sign}" for row, col, sign in wedge_entries(a_dim, p, i))
+            yield f"W_{i} = map(ZZ^{math.comb(a_dim, p)}, ZZ^{math.comb(a_dim, p + 1)}, {{{entries}}})\n"
+        yield "\n"
+
+    def _emit_koszul_ideal(self, slice_expr):
+        config = self.koszul
+        yield f"koszulMatrix = sum({config['a_dim']}, i -> sub(W_i, R) ** {slice_expr})\n"
+        yield f"koszulIdeal = minors({config['minor_size']}, koszulMatrix)\n\n"
+
+    def _emit_koszul_shortcut(self):
+        if self.koszul is None:
+            yield "-- No Koszul flattening gives nontrivial equations at this shape and rank.\nkoszulIdeal = ideal(0_R)\n\n"
+            return
+
+        config = self.koszul
+        yield from self._emit_koszul_header()
+        yield from self._emit_wedges()
+        yield "-- tensor slices: rows indexed by B, columns by C\n"
+        for i in range(config["a_dim"]):
+            rows = ["{" + ", ".join(row_vars) + "}" for row_vars in
+                    self.index.tensor_matrix(config["b_modes"], config["c_modes"], self.support is not None,
+                                             {config["a_mode"]: i})]
+            yield f"X_{i} = matrix{{\n    " + ",\n    ".join(rows) + "\n}\n"
+        yield "\n"
+        yield from self._emit_koszul_ideal("X_i")
+
+    def emit(self):
+        if self.compact:
+            yield from self._emit_compact()
+            return
+
+        yield from self._emit_ring_and_cp_ideal("I_cp")
+
+        yield from stage_begin(self.profile)
+        yield from self._emit_koszul_shortcut()
+        yield from stage_end(self.profile, "koszul", [("koszulIdeal", "numgens koszulIdeal")])
+
+        yield from self._emit_elimination("I_cp + koszulIdeal")
+
+    def _emit_compact(self):
+        yield from self._emit_compact_ring_and_cp_ideal("I_cp")
+
+        yield from stage_begin(self.profile)
+        if self.koszul is None:
+            yield from self._emit_koszul_shortcut()
+        else:
+            config = self.koszul
+            a_mode = config["a_mode"]
+            b_modes = "{" + ", ".join(map(str, config["b_modes"])) + "}"
+            c_modes = "{" + ", ".join(map(str, config["c_modes"])) + "}"
+            yield from self._emit_koszul_header()
+            yield from self._emit_wedges()
+            yield "-- tensor slices: rows indexed by B, columns by C\n"
+            yield f"koszulSlice = i -> matrix apply(select(allIndices, x -> x#{a_mode} == 0 and all({c_modes}, k -> x#k == 0)),\n"
+            yield f"    r -> apply(select(allIndices, x -> x#{a_mode} == 0 and all({b_modes}, k -> x#k == 0)),\n"
+            yield f"        x -> tv toSequence apply(#shape, k -> if k == {a_mode} then i else if member(k, {b_modes}) then r#k else x#k)))\n"
+            yield "\n"
+            yield from self._emit_koszul_ideal("koszulSlice i")
+        yield from stage_end(self.profile, "koszul", [("koszulIdeal", "numgens koszulIdeal")])
+
+        yield from self._emit_elimination("I_cp + koszulIdeal")
@@ -1,106 +1,127 @@
 '''
 Generates M2 script to compute the defining ideal of a graph-constrained secant variety.
 
-Extracts all possible 2D matrix slices from an N-way tensor by fixing N-2 modes, and injects their minors into the ideal.
+Extracts 2D matrix slices from an N-way tensor by fixing N-2 modes, and injects their minors into the ideal. By default every slice is used; slices= selects a subset (see _utils._slices), and stream_minors=True adds the minors one slice at a time into a set of nonzero generators instead of summing one large ideal.
 '''
 
-import itertools
+from _utils._base import SecantGenerator
+from _utils._elimination import elimination_strategy
+from _utils._emit import joined
+from _utils._profile import stage_begin, stage_end
+from _utils._slices import select_slices
 
 
-class ConstrainedSecantGenerator:
+GENERATOR_VERSION = 2
+SYMMETRIES = ("cols", "rows", "modes")
 
-    def __init__(self, shape, rank, constraints=None, field="QQ", slice_minor_size=3):
-        self.shape = shape
-        self.rank = rank
-        self.constraints = set(constraints) if constraints else set()
-        self.field = field
+
+class ConstrainedSecantGenerator(SecantGenerator):
+
+    BETTI_TITLE = "--- Betti Table of the Generators ---"
+
+    def __init__(self, shape, rank, constraints=None, field="QQ", slice_minor_size=3, prune=True, compact=False, profile=False,
+                 slices="all", slice_count=None, slice_seed=None, stream_minors=False, elimination=None):
+        super().__init__(shape, rank, constraints, field, prune, compact, profile)
         self.slice_minor_size = slice_minor_size
+        self.elimination = elimination_strategy(elimination)
+        self.slices = slices
+        self.slice_list = select_slices(shape, slice_minor_size, slices, self.support, slice_count, slice_seed)
+        self.stream_minors = stream_minors
+
+    def _slice_name(self, a, b, base):
+        fixed_indices = [base[m] for m in range(len(self.shape)) if m not in (a, b)]
+        fixed_str = "_".join(map(str, fixed_indices)) if fixed_indices else "all"
+        return f"S_{a}_{b}_fixed_{fixed_str}"
 
-    def get_factor_var(self, mode, row, col):
-        if (mode, row, col) in self.constraints:
-            return "0"
-        return f"v_({mode},{row},{col})"
+    def _slice_literal(self, a, b, base):
+        rows = ("{" + ", ".join(row) + "}" for row in self.index.tensor_matrix([a], [b], self.support is not None, base))
+        return "matrix{\n    " + ",\n    ".join(rows) + "\n}"
 
-    def get_tensor_var(self, indices):
-        idx_str = ",".join(map(str, indices))
-        return f"t_({idx_str})"
+    def _emit_slice_header(self):
+        if self.slices == "all":
+            yield "-- Constructing all 2D Slices for an N-way tensor\n"
+        else:
+            yield f"-- Constructing {len(self.slice_list)} 2D Slices ({self.slices} selection)\n"
 
-    def _generate_slice_minors(self):
-        m2_code = "-- Constructing all 2D Slices for an N-way tensor\n"
+    def _emit_minor_collector(self):
+        size = self.slice_minor_size
+        yield f"-- {size}x{size} minors of each slice, added one slice at a time and deduplicated up to scalars\n"
+        yield "sliceGens = new MutableHashTable\n"
+        yield f"addSliceMinors = S -> scan(flatten entries gens minors({size}, S),\n"
+        yield "    f -> if f != 0 then sliceGens#((1 / leadCoefficient f) * f) = true)\n"
+
+    def _emit_collected_ideal(self):
+        yield "sliceIdeal = if #sliceGens == 0 then ideal(0_R) else ideal keys sliceGens\n"
+        yield "sliceGens = null\n\n"
+
+    def _emit_slice_minors(self):
+        yield from self._emit_slice_header()
+        if self.stream_minors:
+            yield from stage_begin(self.profile)
+            yield from self._emit_minor_collector()
+            for a, b, base in self.slice_list:
+                yield f"addSliceMinors {self._slice_literal(a, b, base)}\n"
+            yield from self._emit_collected_ideal()
+            yield from stage_end(self.profile, "minors", [("sliceIdeal", "numgens sliceIdeal")])
+            return
+
+        yield from stage_begin(self.profile)
         slice_matrices = []
-        N = len(self.shape)
-        
-        for mode_row, mode_col in itertools.combinations(range(N), 2):
-            fixed_modes = [m for m in range(N) if m not in (mode_row, mode_col)]
-            fixed_ranges = [range(self.shape[m]) for m in fixed_modes]
-            
-            for fixed_indices in itertools.product(*fixed_ranges):
-                rows = []
-                for i in range(self.shape[mode_row]):
-                    col_vars = []
-                    for j in range(self.shape[mode_col]):
-                        full_idx = [0] * N
-                        full_idx[mode_row] = i
-                        full_idx[mode_col] = j
-                        for m_idx, fixed_val in zip(fixed_modes, fixed_indices):
-                            full_idx[m_idx] = fixed_val
-                        
-                        col_vars.append(self.get_tensor_var(full_idx))
-                    rows.append("{" + ", ".join(col_vars) + "}")
-                
-                fixed_str = "_".join(map(str, fixed_indices)) if fixed_indices else "all"
-                mat_name = f"S_{mode_row}_{mode_col}_fixed_{fixed_str}"
-                m2_code += f"{mat_name} = matrix{{\n    " + ",\n    ".join(rows) + "\n}\n"
-                slice_matrices.append(mat_name)
-
-        m2_code += f"\n{self.slice_minor_size}x{self.slice_minor_size} minors of all 2D slices\n"
-        det_terms = [f"minors({self.slice_minor_size}, {name})" for name in slice_matrices]
-        m2_code += f"sliceIdeal = {' + '.join(det_terms)}\n\n"
-        return m2_code
-
-    def generate_m2_script(self):
-        m2_code = f"-- Graph-Constrained Secant Variety\n"
-        m2_code += f"-- Tensor Shape: {self.shape}, CP Rank: {self.rank}\n\n"
-        
-        factor_vars = []
-        for mode, dim in enumerate(self.shape):
-            for row in range(dim):
-                for col in range(self.rank):
-                    if (mode, row, col) not in self.constraints:
-                        factor_vars.append(self.get_factor_var(mode, row, col))
-        
-        tensor_vars = []
-        ranges = [range(dim) for dim in self.shape]
-        for indices in itertools.product(*ranges):
-            tensor_vars.append(self.get_tensor_var(indices))
-
-        all_vars = factor_vars + tensor_vars
-        m2_code += f"kk = {self.field}\n"
-        m2_code += f"R = kk[{', '.join(all_vars)}]\n\n"
-
-        m2_code += "I_cp = ideal(\n"
-        generators = []
-        for indices in itertools.product(*ranges):
-            t_var = self.get_tensor_var(indices)
-            cp_sum_terms = []
-            for j in range(self.rank):
-                term_factors = [self.get_factor_var(mode, row_idx, j) for mode, row_idx in enumerate(indices)]
-                if "0" not in term_factors:
-                    cp_sum_terms.append("*".join(term_factors))
-            cp_expr = " + ".join(cp_sum_terms) if cp_sum_terms else "0"
-            generators.append(f"    {t_var} - ({cp_expr})")
-        m2_code += ",\n".join(generators) + "\n)\n\n"
-
-        m2_code += self._generate_slice_minors()
-
-        m2_code += f"-- Implicit equations by elimination\n"
-        m2_code += f"factorVars = {{{', '.join(factor_vars)}}}\n"
-        m2_code += f"J = eliminate(factorVars, I_cp + sliceIdeal)\n\n"
-        m2_code += f"print \"--- Betti Table of the Generators ---\"\n"
-        m2_code += f"print net betti gens J\n\n"
-        return m2_code
-
-    def export(self, filename="compute_secant.m2"):
-        with open(filename, "w") as f:
-            f.write(self.generate_m2_script())
-        print(f"Compiled into {filename}")
\ No newline at end of file
+        for a, b, base in self.slice_list:
+            mat_name = self._slice_name(a, b, base)
+            yield f"{mat_name} = {self._slice_literal(a, b, base)}\n"
+            slice_matrices.append(mat_name)
+        yield from stage_end(self.profile, "slices")
+
+        yield f"\n-- {self.slice_minor_size}x{self.slice_minor_size} minors of all 2D slices\n"
+        yield from stage_begin(self.profile)
+        yield "sliceIdeal = "
+        if slice_matrices:
+            yield from joined((f"minors({self.slice_minor_size}, {name})" for name in slice_matrices), " + ")
+        else:
+            yield "ideal(0_R)"
+        yield "\n\n"
+        yield from stage_end(self.profile, "minors", [("sliceIdeal", "numgens sliceIdeal")])
+
+    def emit(self):
+        if self.compact:
+            yield from self._emit_compact()
+            return
+
+        yield from self._emit_ring_and_cp_ideal("I_cp")
+
+        yield from self._emit_slice_minors()
+
+        yield from self._emit_elimination("I_cp + sliceIdeal")
+
+    def _emit_compact(self):
+        yield from self._emit_compact_ring_and_cp_ideal("I_cp")
+
+        yield "-- 2D slice through base index x along modes a and b\n"
+        yield "sliceMatrix = (a, b, x) -> matrix apply(shape#a, i -> apply(shape#b,\n"
+        yield "    j -> tv toSequence apply(#shape, m -> if m == a then i else if m == b then j else x#m)))\n\n"
+        if self.slices == "all" and not self.stream_minors:
+            yield f"-- {self.slice_minor_size}x{self.slice_minor_size} minors of all 2D slices\n"
+            yield from stage_begin(self.profile)
+            yield "sliceIdeal = sum flatten apply(subsets(#shape, 2), p ->\n"
+            yield "    apply(select(allIndices, x -> x#(p#0) == 0 and x#(p#1) == 0),\n"
+            yield f"        x -> minors({self.slice_minor_size}, sliceMatrix(p#0, p#1, x))))\n\n"
+        else:
+            if self.slices == "all":
+                yield "sliceSpecs = flatten apply(subsets(#shape, 2), p ->\n"
+                yield "    apply(select(allIndices, x -> x#(p#0) == 0 and x#(p#1) == 0), x -> (p#0, p#1, x)))\n\n"
+            else:
+                yield f"-- {len(self.slice_list)} slices ({self.slices} selection) as (a, b, base index)\n"
+                specs = ", ".join(f"({a}, {b}, ({', '.join(map(str, base))}))" for a, b, base in self.slice_list)
+                yield f"sliceSpecs = {{{specs}}}\n\n"
+            yield from stage_begin(self.profile)
+            if self.stream_minors:
+                yield from self._emit_minor_collector()
+                yield "scan(sliceSpecs, s -> addSliceMinors sliceMatrix s)\n"
+                yield from self._emit_collected_ideal()
+            else:
+                yield f"-- {self.slice_minor_size}x{self.slice_minor_size} minors of the selected 2D slices\n"
+                yield f"sliceIdeal = if #sliceSpecs == 0 then ideal(0_R) else sum(sliceSpecs, s -> minors({self.slice_minor_size}, sliceMatrix s))\n\n"
+        yield from stage_end(self.profile, "minors", [("sliceIdeal", "numgens sliceIdeal")])
+
+        yield from self._emit_elimination("I_cp + sliceIdeal")
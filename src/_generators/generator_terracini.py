@@ -2,75 +2,220 @@
 Generates M2 script to compute the dimension of a graph-constrained secant variety.
 
 Uses Terracini's Lemma to evaluate the Jacobian rank at a random point, providing an exact dimension computation without Gröbner bases.
+The same check can also be run natively in Python over ZZ/p, without starting M2.
+With jacobian="evaluated", Python draws the random points (from jacobian_seed, or from fresh entropy when it is None) and evaluates the sparse Jacobian mod p itself. The script then only holds the nonzero entries as maps over kk and asks M2 for their rank, which skips the symbolic CP map, differentiation and substitution. In the symbolic mode a jacobian_seed is passed to M2's setRandomSeed before the points are drawn.
 '''
 
-import itertools
-
-
-class ConstrainedSecantGenerator:
-    
-    def __init__(self, shape, rank, constraints=None, field="QQ"):
-        self.shape = shape
-        self.rank = rank
-        self.constraints = set(constraints) if constraints else set()
-        self.field = field
-
-    def get_factor_var(self, mode, row, col):
-        if (mode, row, col) in self.constraints:
-            return "0"
-        return f"v_({mode},{row},{col})"
-
-    def generate_m2_script(self):
-        m2_code = f"-- Graph-Constrained Secant Variety\n"
-        m2_code += f"-- Tensor Shape: {self.shape}, CP Rank: {self.rank}\n\n"
-        
-        factor_vars = []
-        for mode, dim in enumerate(self.shape):
-            for row in range(dim):
-                for col in range(self.rank):
-                    if (mode, row, col) not in self.constraints:
-                        factor_vars.append(self.get_factor_var(mode, row, col))
-        
-        m2_code += f"kk = {self.field}\n"
-        m2_code += f"R = kk[{', '.join(factor_vars)}]\n\n"
-
-        m2_code += "-- The CP Parameterization Map\n"
-        ranges = [range(dim) for dim in self.shape]
-        
-        cp_expressions = []
-        for indices in itertools.product(*ranges):
-            cp_sum_terms = []
-            for j in range(self.rank):
-                term_factors = [self.get_factor_var(mode, row_idx, j) for mode, row_idx in enumerate(indices)]
-                if "0" not in term_factors:
-                    cp_sum_terms.append("*".join(term_factors))
-            cp_expr = " + ".join(cp_sum_terms) if cp_sum_terms else "0"
-            cp_expressions.append(cp_expr)
-
-        m2_code += f"F = matrix{{{{ {', '.join(cp_expressions)} }}}}\n\n"
-
-        m2_code += "-- Compute the symbolic Jacobian\n"
-        m2_code += "J = jacobian F\n\n"
-
-        m2_code += "-- Evaluate the Jacobian at a random numerical point\n"
-        m2_code += "randomVals = apply(gens R, v -> v => random kk)\n"
-        m2_code += "Jeval = sub(J, randomVals)\n\n"
-
-        num_params = len(factor_vars)
+import numpy as np
+
+from _utils._base import SecantGenerator
+from _utils._compact import emit_compact_data, has_live_entries
+from _utils._emit import joined
+from _utils._modp import field_prime
+from _utils._profile import stage_begin, stage_end
+from _utils._terracini import incremental_jacobian_ranks, jacobian_ranks, random_point, sparse_cp_jacobian
+
+
+GENERATOR_VERSION = 2
+SYMMETRIES = ("cols", "rows", "modes")
+JACOBIANS = ("symbolic", "evaluated")
+
+
+class ConstrainedSecantGenerator(SecantGenerator):
+
+    def __init__(self, shape, rank, constraints=None, field="QQ", prune=True, compact=False, profile=False, points=1,
+                 jacobian="symbolic", jacobian_seed=None):
+        super().__init__(shape, rank, constraints, field, prune, compact, profile)
+        self.points = points
+        if jacobian not in JACOBIANS:
+            raise ValueError(f"Unknown Jacobian mode: {jacobian}")
+        if jacobian == "evaluated" and not field.replace(" ", "").startswith("ZZ/"):
+            raise ValueError("A pre-evaluated Jacobian needs a prime field ZZ/p")
+        self.jacobian = jacobian
+        self.jacobian_seed = jacobian_seed
+
+    def _num_free_factors(self):
+        return sum(int(free.sum()) for free in self.index.free)
+
+    def _dimension_counts(self, num_params):
         scaling_redundancies = self.rank * (len(self.shape) - 1)
-        expected_dim = num_params - scaling_redundancies
-
-        m2_code += f"print \"--- Geometric Identifiability\"\n"
-        m2_code += f"print \"Total Free Parameters (Vertices): {num_params}\"\n"
-        m2_code += f"print \"Scaling Redundancies: {scaling_redundancies}\"\n"
-        m2_code += f"print \"Expected Dimension (if identifiable): {expected_dim}\"\n"
-        m2_code += f"print \"\"\n"
-        m2_code += f"print \"Actual Dimension of Constrained Variety (Jacobian Rank):\"\n"
-        m2_code += f"print rank Jeval\n"
-
-        return m2_code
-
-    def export(self, filename="compute_secant.m2"):
-        with open(filename, "w") as f:
-            f.write(self.generate_m2_script())
-        print(f"Compiled into {filename}")
\ No newline at end of file
+        return num_params, scaling_redundancies, num_params - scaling_redundancies
+
+    def emit(self):
+        if self.jacobian == "evaluated":
+            yield from self._emit_evaluated()
+            return
+        if self.compact:
+            yield from self._emit_compact()
+            return
+
+        yield from self._emit_header()
+        if self.support:
+            yield from self.support.emit_report()
+
+        yield from stage_begin(self.profile)
+        yield f"kk = {self.field}\n"
+        yield f"R = kk[{', '.join(self._factor_vars())}]\n\n"
+        yield from stage_end(self.profile, "ring", [("R", "numgens R")])
+
+        yield "-- The CP Parameterization Map\n"
+
+        yield from stage_begin(self.profile)
+        yield "F = matrix{{ "
+        yield from joined(self._cp_expressions(), ", ")
+        yield " }}\n\n"
+        yield from stage_end(self.profile, "cp_map", [("F", "numcols F")])
+
+        yield from self._emit_jacobian_rank()
+
+    def _emit_jacobian_rank(self):
+        yield "-- Compute the symbolic Jacobian\n"
+        yield from stage_begin(self.profile)
+        yield "J = jacobian F\n\n"
+        yield from stage_end(self.profile, "jacobian", [("J_rows", "numrows J"), ("J_cols", "numcols J")])
+
+        if self.jacobian_seed is not None:
+            yield f"setRandomSeed {self.jacobian_seed}\n"
+        if self.points > 1:
+            # the rank only drops at a point if every point is unlucky, so the maximum is the generic rank
+            yield f"-- Evaluate the Jacobian rank at {self.points} random numerical points\n"
+            yield from stage_begin(self.profile)
+            yield f"pointRanks = apply({self.points}, i -> rank sub(J, apply(gens R, v -> v => random kk)))\n\n"
+            yield from stage_end(self.profile, "rank")
+        else:
+            yield "-- Evaluate the Jacobian at a random numerical point\n"
+            yield from stage_begin(self.profile)
+            yield "randomVals = apply(gens R, v -> v => random kk)\n"
+            yield "Jeval = sub(J, randomVals)\n\n"
+            yield from stage_end(self.profile, "evaluate")
+
+        yield from self._emit_rank_report()
+
+    def _emit_rank_report(self):
+        if self.profile and self.points == 1:
+            yield from stage_begin(self.profile)
+            yield "jacobianRank = rank Jeval\n"
+            yield from stage_end(self.profile, "rank")
+
+        # pruned factors still count as parameters of the model
+        num_params, scaling_redundancies, expected_dim = self._dimension_counts(self._num_free_factors())
+
+        yield f"print \"--- Geometric Identifiability\"\n"
+        yield f"print \"Total Free Parameters (Vertices): {num_params}\"\n"
+        yield f"print \"Scaling Redundancies: {scaling_redundancies}\"\n"
+        yield f"print \"Expected Dimension (if identifiable): {expected_dim}\"\n"
+        yield f"print \"\"\n"
+        if self.points > 1:
+            yield "print(\"Jacobian Ranks at Random Points: \" | toString pointRanks)\n"
+        yield f"print \"Actual Dimension of Constrained Variety (Jacobian Rank):\"\n"
+        if self.points > 1:
+            yield "print max pointRanks\n"
+        else:
+            yield "print jacobianRank\n" if self.profile else f"print rank Jeval\n"
+
+    def _evaluated_rows(self, rows, cols, values):
+        # one line per Jacobian row that has nonzero entries
+        bounds = np.flatnonzero(np.diff(rows)) + 1
+        for row, row_cols, row_values in zip(rows[np.concatenate(([0], bounds))].tolist(), np.split(cols, bounds),
+                                             np.split(values, bounds)):
+            yield "    " + ", ".join(f"({row}, {c}) => {v}" for c, v in zip(row_cols.tolist(), row_values.tolist()))
+
+    def _emit_evaluated(self):
+        yield from self._emit_header("pre-evaluated Jacobian")
+        if self.support:
+            yield from self.support.emit_report()
+        yield f"kk = {self.field}\n\n"
+
+        p = field_prime(self.field)
+        rng = np.random.default_rng(self.jacobian_seed)
+        yield from stage_begin(self.profile)
+        for point in range(self.points):
+            name = "Jeval" if self.points == 1 else f"Jeval_{point}"
+            factors = random_point(self.index, p, rng)
+            rows, cols, values, (n_rows, n_cols) = sparse_cp_jacobian(self.index, factors, p, self.support is not None)
+            yield f"-- Jacobian at a random point, evaluated mod {p} before emission ({len(values)} nonzero entries)\n"
+            if len(values):
+                yield f"{name} = map(kk^{n_rows}, kk^{n_cols}, {{\n"
+                yield from joined(self._evaluated_rows(rows, cols, values), ",\n")
+                yield "\n})\n\n"
+            else:
+                yield f"{name} = map(kk^{n_rows}, kk^{n_cols}, {{}})\n\n"
+        yield from stage_end(self.profile, "evaluate")
+
+        if self.points > 1:
+            # the rank only drops at a point if every point is unlucky, so the maximum is the generic rank
+            yield from stage_begin(self.profile)
+            yield f"pointRanks = apply({self.points}, i -> rank Jeval_i)\n\n"
+            yield from stage_end(self.profile, "rank")
+        yield from self._emit_rank_report()
+
+    def _emit_compact(self):
+        yield from self._emit_header("compact emission")
+        yield from stage_begin(self.profile)
+        yield from emit_compact_data(self, include_tensor=False)
+        yield from stage_end(self.profile, "ring", [("R", "numgens R")])
+
+        yield "-- The CP Parameterization Map\n"
+        yield from stage_begin(self.profile)
+        if has_live_entries(self):
+            yield "F = matrix{apply(tensorIndices, i -> cp i)}\n\n"
+        else:
+            yield "F = matrix{{0_R}}\n\n"
+        yield from stage_end(self.profile, "cp_map", [("F", "numcols F")])
+
+        yield from self._emit_jacobian_rank()
+
+    def compute_native(self, seed=None):
+        p = field_prime(self.field)
+        num_params, scaling_redundancies, expected_dim = self._dimension_counts(self._num_free_factors())
+        ranks = jacobian_ranks(self.index, p, self.points, seed=seed)
+        result = {
+            "free_parameters": num_params,
+            "scaling_redundancies": scaling_redundancies,
+            "expected_dimension": expected_dim,
+            "actual_dimension": max(ranks),
+        }
+        if self.points > 1:
+            result["point_ranks"] = ranks
+        return result
+
+    def run_native(self, seed=None):
+        result = self.compute_native(seed=seed)
+        print("--- Geometric Identifiability")
+        print(f"Total Free Parameters (Vertices): {result['free_parameters']}")
+        print(f"Scaling Redundancies: {result['scaling_redundancies']}")
+        print(f"Expected Dimension (if identifiable): {result['expected_dimension']}")
+        print("")
+        if "point_ranks" in result:
+            print(f"Jacobian Ranks at Random Points: {{{', '.join(map(str, result['point_ranks']))}}}")
+        print("Actual Dimension of Constrained Variety (Jacobian Rank):")
+        print(result["actual_dimension"])
+        return result
+
+    def compute_native_by_rank(self, seed=None):
+        p = field_prime(self.field)
+        ranks = incremental_jacobian_ranks(self.index, p, seed=seed)
+        ambient = 1
+        for dim in self.shape:
+            ambient *= dim
+
+        by_rank = []
+        for r, actual in enumerate(ranks, start=1):
+            num_params = sum(int(free[:, :r].sum()) for free in self.index.free)
+            expected_dim = num_params - r * (len(self.shape) - 1)
+            by_rank.append({"rank": r, "free_parameters": num_params, "expected_dimension": expected_dim,
+                            "actual_dimension": actual})
+        filling = next((entry["rank"] for entry in by_rank if entry["actual_dimension"] == ambient), None)
+        return {"by_rank": by_rank, "ambient_dimension": ambient, "filling_rank": filling}
+
+    def run_native_by_rank(self, seed=None):
+        result = self.compute_native_by_rank(seed=seed)
+        print("--- Geometric Identifiability by Rank")
+        for entry in result["by_rank"]:
+            print(f"Rank {entry['rank']}: Free Parameters {entry['free_parameters']}, "
+                  f"Expected Dimension {entry['expected_dimension']}, Actual Dimension {entry['actual_dimension']}")
+        print("")
+        print(f"Ambient Dimension: {result['ambient_dimension']}")
+        filling = result["filling_rank"]
+        print(f"First Rank Filling the Ambient Space: {filling if filling else f'none up to rank {self.rank}'}")
+        return result
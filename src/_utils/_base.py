@@ -0,0 +1,116 @@
+'''
+Shared base of the M2 script generators.
+
+SecantGenerator holds the problem (shape, rank, constraints, field), its CPSupport and the emission switches (prune, compact, profile), and writes the parts of a script that every generator writes the same way: the header, the polynomial ring and CP ideal in unrolled or compact form, the elimination with its Betti table report, and the export to a file. A generator subclasses it, implements emit(), and overrides TITLE, ELIMINATION_COMMENT or BETTI_TITLE where its scripts word these lines differently.
+'''
+
+import itertools
+
+from _utils._compact import emit_compact_cp_ideal, emit_compact_data, emit_compact_elimination
+from _utils._elimination import emit_elimination, emit_elimination_report
+from _utils._emit import joined, write_chunks
+from _utils._profile import stage_begin, stage_end
+from _utils._support import CPSupport
+
+
+class SecantGenerator:
+
+    TITLE = "Graph-Constrained Secant Variety"
+    ELIMINATION_COMMENT = "Implicit equations by elimination"
+    BETTI_TITLE = "Betti Table of the Generators"
+
+    def __init__(self, shape, rank, constraints=None, field="QQ", prune=True, compact=False, profile=False):
+        self.shape = shape
+        self.rank = rank
+        self.constraints = set(constraints) if constraints else set()
+        self.field = field
+        self.index = CPSupport(shape, rank, self.constraints)
+        self.support = self.index if prune else None
+        self.compact = compact
+        self.profile = profile
+
+    def get_tensor_var(self, indices):
+        return self.index.tensor_names(self.support is not None)[tuple(indices)]
+
+    def _factor_vars(self):
+        return self.index.factor_vars(self.support is not None)
+
+    def _cp_expressions(self):
+        emitted = False
+        for _, cp_expr in self.index.cp_expressions(self.support is not None):
+            yield cp_expr
+            emitted = True
+        if not emitted:
+            yield "0_R"
+
+    def _cp_generators(self):
+        emitted = False
+        for t_var, cp_expr in self.index.cp_expressions(self.support is not None):
+            yield f"    {t_var} - ({cp_expr})"
+            emitted = True
+        if not emitted:
+            yield "    0_R"
+
+    def _emit_header(self, variant=None):
+        yield f"-- {self.TITLE} ({variant})\n" if variant else f"-- {self.TITLE}\n"
+        yield f"-- Tensor Shape: {self.shape}, CP Rank: {self.rank}\n\n"
+
+    def _emit_ring_and_cp_ideal(self, name):
+        yield from self._emit_header()
+        if self.support:
+            yield from self.support.emit_report()
+
+        # non-zero factors (latent components)
+        factor_vars = self._factor_vars()
+
+        # observable tensor variables
+        tensor_vars = self.index.tensor_vars(self.support is not None)
+
+        # polynomial ring
+        yield from stage_begin(self.profile)
+        yield f"kk = {self.field}\n"
+        yield "R = kk["
+        yield from joined(itertools.chain(factor_vars, tensor_vars), ", ")
+        yield "]\n\n"
+        yield from stage_end(self.profile, "ring", [("R", "numgens R")])
+
+        # constrained CP ideal
+        yield from stage_begin(self.profile)
+        yield f"{name} = ideal(\n"
+        yield from joined(self._cp_generators(), ",\n")
+        yield "\n)\n\n"
+        yield from stage_end(self.profile, "cp_ideal", [(name, f"numgens {name}")])
+
+    def _emit_compact_ring_and_cp_ideal(self, name):
+        yield from self._emit_header("compact emission")
+        yield from stage_begin(self.profile)
+        yield from emit_compact_data(self)
+        yield from stage_end(self.profile, "ring", [("R", "numgens R")])
+        yield from stage_begin(self.profile)
+        yield from emit_compact_cp_ideal(self, name)
+        yield from stage_end(self.profile, "cp_ideal", [(name, f"numgens {name}")])
+
+    def _emit_elimination(self, ideal_expr):
+        yield f"-- {self.ELIMINATION_COMMENT}\n"
+        yield from stage_begin(self.profile)
+        if self.compact:
+            yield from emit_compact_elimination(self, ideal_expr)
+        else:
+            yield from emit_elimination(self, "{" + ", ".join(self._factor_vars()) + "}", ideal_expr)
+        yield from stage_end(self.profile, "eliminate", [("J", "numgens J")])
+        yield f"print \"{self.BETTI_TITLE}\"\n"
+        yield "print net betti gens J\n\n"
+        yield from emit_elimination_report(self)
+
+    def emit(self):
+        raise NotImplementedError
+
+    def generate_m2_script(self):
+        return "".join(self.emit())
+
+    def export(self, filename="compute_secant.m2"):
+        write_chunks(self.emit(), filename)
+        if isinstance(filename, str):
+            print(f"Compiled into {filename}")
+            if self.support and (self.support.zero_entries or self.support.unused_factors):
+                print(self.support.summary())
@@ -0,0 +1,220 @@
+'''
+Cross-generator benchmark suite with regression tracking.
+
+`run` takes every generator through a catalog of shapes, ranks and constraint patterns. For each combination it measures Python generation time, emitted script bytes, and M2 wall time, CPU time and peak RSS. Generation is timed as the median of --repeat runs. M2 runs once per combination under the scheduler's timeout and memory cap, unless M2 is missing or --no-m2 is given. Records are appended to a JSONL store, tagged with the current commit and whether the tree was dirty.
+
+`report` compares two commits (by default the two most recent in the store) and flags every metric that got worse by more than --threshold, relative to the base. Tiny absolute changes (below a per-metric floor) are ignored as noise, and a run that succeeded at the base but fails at the head is always flagged. With --fail, the report exits non-zero on any regression, so it can gate a change.
+'''
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from _utils._journal import append_line
+from _utils._scheduler import build_generator, make_job, run_job
+from generate import GENERATOR_TYPES
+
+
+DEFAULT_BENCH_PATH = os.path.join("results", "bench.jsonl")
+
+CATALOG = [
+    ("test1", "3,3,3", 2, "2,0,0"),
+    ("test2", "3,3,3", 3, "2,0,1;2,1,2"),
+    ("test3", "4,4,4", 3, "2,0,0;2,0,1;2,1,0;2,1,1"),
+    ("free_333_r2", "3,3,3", 2, ""),
+    ("diag_333_r3", "3,3,3", 3, "0,0,1;0,0,2;1,1,0;1,1,2;2,2,0;2,2,1"),
+    ("free_444_r2", "4,4,4", 2, ""),
+    ("chain_3333_r2", "3,3,3,3", 2, "0,0,1;3,2,0"),
+    ("free_2222_r3", "2,2,2,2", 3, ""),
+    ("wide_235_r2", "2,3,5", 2, "1,0,0"),
+    ("free_555_r4", "5,5,5", 4, ""),
+    ("free_3333_r3", "3,3,3,3", 3, ""),
+]
+
+# metric -> smallest absolute increase that can count as a regression
+METRICS = {
+    "generate_seconds": 0.05,
+    "script_bytes": 1024,
+    "m2_seconds": 0.5,
+    "m2_cpu_seconds": 0.5,
+    "m2_peak_rss_kb": 16 * 1024,
+}
+
+
+class _CountingSink:
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, chunk):
+        self.bytes += len(chunk.encode())
+
+    def flush(self):
+        pass
+
+
+def current_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def measure_generation(job, repeat=3):
+    times = []
+    for _ in range(repeat):
+        sink = _CountingSink()
+        start = time.perf_counter()
+        build_generator(job).export(sink)
+        times.append(time.perf_counter() - start)
+    return {"generate_seconds": statistics.median(times), "script_bytes": sink.bytes}
+
+
+def measure_m2(job, timeout=None, mem_limit_mb=None):
+    result = run_job(dict(job, scratch=True), timeout=timeout, mem_limit_mb=mem_limit_mb)
+    return {
+        "m2_status": result["status"],
+        "m2_seconds": result.get("elapsed"),
+        "m2_cpu_seconds": result.get("cpu_seconds"),
+        "m2_peak_rss_kb": result.get("peak_rss_kb"),
+    }
+
+
+def run_suite(path=DEFAULT_BENCH_PATH, types=GENERATOR_TYPES, cases=CATALOG, repeat=3, m2=True, timeout=None,
+              mem_limit_mb=None):
+    commit, dirty = current_commit()
+    for name, shape, rank, constraints in cases:
+        for gen_type in types:
+            record = {"commit": commit, "dirty": dirty, "timestamp": time.time(), "case": name, "type": gen_type,
+                      "shape": shape, "rank": rank, "constraints": constraints}
+            job = make_job(f"bench_{name}_{gen_type}", gen_type, shape, rank, constraints)
+            record.update(measure_generation(job, repeat))
+            if m2:
+                record.update(measure_m2(job, timeout, mem_limit_mb))
+            else:
+                record["m2_status"] = "skipped"
+            append_line(path, record)
+            yield record
+
+
+def load_records(path=DEFAULT_BENCH_PATH):
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def commits_in_order(records):
+    return list(dict.fromkeys(record["commit"] for record in records))
+
+
+def _latest_by_key(records, commit):
+    # a commit benchmarked twice keeps its latest measurement
+    return {(r["case"], r["type"]): r for r in records if r["commit"] == commit}
+
+
+def compare(records, base, head, threshold=0.2):
+    base_records, head_records = _latest_by_key(records, base), _latest_by_key(records, head)
+    rows = []
+    for key in sorted(base_records.keys() & head_records.keys()):
+        old, new = base_records[key], head_records[key]
+        if old.get("m2_status") == "ok" and new.get("m2_status") not in ("ok", "skipped"):
+            rows.append({"case": key[0], "type": key[1], "metric": "m2_status", "base": "ok",
+                         "head": new.get("m2_status"), "ratio": None, "regression": True})
+        for metric, floor in METRICS.items():
+            if old.get(metric) is None or new.get(metric) is None:
+                continue
+            ratio = new[metric] / old[metric] if old[metric] else None
+            regression = new[metric] - old[metric] > floor and (ratio is None or ratio > 1 + threshold)
+            rows.append({"case": key[0], "type": key[1], "metric": metric, "base": old[metric], "head": new[metric],
+                         "ratio": ratio, "regression": regression})
+    return rows
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def print_report(rows, base, head, threshold, show_all=False):
+    regressions = [row for row in rows if row["regression"]]
+    print(f"Benchmark {base} -> {head}: {len(regressions)} regressions beyond {threshold:.0%} "
+          f"over {len({(r['case'], r['type']) for r in rows})} case/generator pairs")
+    shown = rows if show_all else regressions
+    if not shown:
+        return regressions
+    print(f"{'case':<16} {'type':<11} {'metric':<16} {'base':>12} {'head':>12} {'ratio':>7}")
+    for row in shown:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<16} {row['type']:<11} {row['metric']:<16} {_fmt(row['base']):>12} "
+              f"{_fmt(row['head']):>12} {ratio:>7}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every generator and track regressions across commits.")
+    parser.add_argument('--store', type=str, default=DEFAULT_BENCH_PATH, help="JSONL file benchmark records are appended to")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Benchmark the current tree")
+    run_parser.add_argument('--types', type=str, default=",".join(GENERATOR_TYPES), help="Comma-separated generator types")
+    run_parser.add_argument('--cases', type=str, default=None, help="Comma-separated catalog case names (default: all)")
+    run_parser.add_argument('--repeat', type=int, default=3, help="Generation runs per case; the median is kept")
+    run_parser.add_argument('--no-m2', action='store_true', help="Only measure generation")
+    run_parser.add_argument('--timeout', type=float, default=600, help="Wall-clock limit per M2 run, in seconds")
+    run_parser.add_argument('--mem-limit', type=float, default=None, help="Address-space cap per M2 run, in MB")
+
+    report_parser = subparsers.add_parser("report", help="Compare two benchmarked commits")
+    report_parser.add_argument('--base', type=str, default=None, help="Base commit (default: second most recent)")
+    report_parser.add_argument('--head', type=str, default=None, help="Head commit (default: most recent)")
+    report_parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown that counts as a regression")
+    report_parser.add_argument('--all', action='store_true', help="Show every metric, not just regressions")
+    report_parser.add_argument('--fail', action='store_true', help="Exit non-zero if there are regressions")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        cases = CATALOG
+        if args.cases:
+            wanted = set(args.cases.split(','))
+            cases = [case for case in CATALOG if case[0] in wanted]
+        m2 = not args.no_m2
+        if m2 and shutil.which("M2") is None:
+            print("M2 not found on PATH; measuring generation only.", file=sys.stderr)
+            m2 = False
+        print(f"{'case':<16} {'type':<11} {'gen (s)':>8} {'bytes':>10} {'M2':<8} {'M2 (s)':>8} {'cpu (s)':>8} {'RSS (MB)':>9}")
+        for r in run_suite(args.store, args.types.split(','), cases, args.repeat, m2, args.timeout, args.mem_limit):
+            m2_cols = (f"{r['m2_seconds']:>8.2f} {r['m2_cpu_seconds'] or 0:>8.2f} {(r['m2_peak_rss_kb'] or 0) / 1024:>9.1f}"
+                       if r.get("m2_seconds") is not None else f"{'-':>8} {'-':>8} {'-':>9}")
+            print(f"{r['case']:<16} {r['type']:<11} {r['generate_seconds']:>8.4f} {r['script_bytes']:>10} "
+                  f"{r['m2_status']:<8} {m2_cols}")
+        raise SystemExit(0)
+
+    records = load_records(args.store)
+    commits = commits_in_order(records)
+    head = args.head or (commits[-1] if commits else None)
+    base = args.base or (commits[-2] if len(commits) > 1 else None)
+    if head is None or base is None:
+        raise SystemExit(f"Need benchmarks of two commits in {args.store} (found {len(commits)}).")
+    rows = compare(records, base, head, args.threshold)
+    regressions = print_report(rows, base, head, args.threshold, show_all=args.all)
+    raise SystemExit(1 if regressions and args.fail else 0)
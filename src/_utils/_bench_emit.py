@@ -0,0 +1,76 @@
+'''
+Benchmarks script emission: peak RSS and emit time against tensor size.
+
+Each measurement runs in a fresh child process so that ru_maxrss reflects a single emission. Compares the streaming export against building the whole script as one string.
+'''
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate import GENERATOR_TYPES, load_generator
+
+
+CASES = [
+    ([3, 3, 3], 2),
+    ([4, 4, 4], 3),
+    ([3, 3, 3, 3], 3),
+    ([4, 4, 4, 4], 3),
+    ([3, 3, 3, 3, 3], 3),
+    ([4, 4, 4, 4, 4], 4),
+    ([3, 3, 3, 3, 3, 3], 4),
+]
+
+
+def measure(gen_type, shape, rank, mode):
+    gen = load_generator(gen_type)(shape=shape, rank=rank, field="ZZ/32003")
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as sink:
+        if mode == "stream":
+            gen.export(sink)
+        else:
+            sink.write(gen.generate_m2_script())
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"emit_seconds": elapsed, "peak_rss_kb": peak_kb, "delta_rss_kb": peak_kb - baseline_kb}
+
+
+def run_child(gen_type, shape, rank, mode):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child",
+           "--type", gen_type, "--shape", ",".join(map(str, shape)), "--rank", str(rank), "--mode", mode]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark M2 script emission.")
+    parser.add_argument('--types', type=str, default="flattening,slicing", help="Comma-separated generator types")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--type', type=str, choices=GENERATOR_TYPES, help=argparse.SUPPRESS)
+    parser.add_argument('--shape', type=str, help=argparse.SUPPRESS)
+    parser.add_argument('--rank', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--mode', type=str, choices=['stream', 'string'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        shape = list(map(int, args.shape.split(',')))
+        print(json.dumps(measure(args.type, shape, args.rank, args.mode)))
+        raise SystemExit(0)
+
+    print(f"{'type':<11} {'shape':<14} {'rank':>4} {'mode':<7} {'emit (s)':>9} {'peak RSS (MB)':>14} {'delta (MB)':>11}")
+    for gen_type in args.types.split(','):
+        for shape, rank in CASES:
+            for mode in ['string', 'stream']:
+                r = run_child(gen_type, shape, rank, mode)
+                shape_str = "x".join(map(str, shape))
+                print(f"{gen_type:<11} {shape_str:<14} {rank:>4} {mode:<7} {r['emit_seconds']:>9.3f} "
+                      f"{r['peak_rss_kb'] / 1024:>14.1f} {r['delta_rss_kb'] / 1024:>11.1f}")
@@ -0,0 +1,285 @@
+'''
+Work distribution across hosts through a small TCP broker.
+
+A Broker hands out generator jobs to any number of workers and collects their results. Workers can run on this machine or on other nodes. The protocol is newline-delimited JSON over one TCP connection per worker, always request then reply:
+
+    hello      {"op": "hello", "worker": id}                   -> heartbeat interval, timeout and memory cap to use
+    pull       {"op": "pull", "worker": id}                    -> {"id": ..., "job": {...}}, or no job with "retry" or "done"
+    heartbeat  {"op": "heartbeat", "worker": id}               -> {"ok": true}
+    result     {"op": "result", "worker": id, "id": ..., "result": {...}}
+
+A worker builds the script in-process from the job, runs it on its own M2 in a scratch directory (no src/M2 needed), and sends back the structured result with the M2 output. A background thread heartbeats while the job runs. A worker whose connection drops, or that is silent for longer than heartbeat_timeout, is declared dead, and its jobs are put back at the front of the queue. A job lost max_attempts times is reported with status "lost". If a worker declared dead still delivers a result later, the first result for each job wins and later copies are dropped.
+
+The broker binds to localhost by default. Workers run whatever scripts the broker's jobs describe, so only expose it on a trusted network.
+'''
+
+import collections
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+from _utils._journal import job_id
+from _utils._scheduler import run_job
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47300
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0
+POLL_INTERVAL = 1.0
+# how long a worker keeps trying to reach a broker that is not up yet
+CONNECT_WAIT = 60.0
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        broker = self.server.broker
+        worker = None
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                worker = message.get("worker", worker)
+                reply = broker.handle(message)
+                self.wfile.write((json.dumps(reply, default=str) + "\n").encode())
+                self.wfile.flush()
+        except (OSError, ValueError, KeyError):
+            pass
+        finally:
+            if worker is not None:
+                broker.disconnect(worker)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Broker:
+
+    def __init__(self, jobs, host=DEFAULT_HOST, port=DEFAULT_PORT, heartbeat_timeout=HEARTBEAT_TIMEOUT, max_attempts=3,
+                 timeout=None, mem_limit_mb=None, model=None, journal=None):
+        self.jobs = iter(jobs)
+        self.host = host
+        self.port = port
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.mem_limit_mb = mem_limit_mb
+        self.model = model
+        self.journal = journal
+
+        self.lock = threading.Lock()
+        # jobs taken back from dead workers go out before new ones
+        self.requeued = collections.deque()
+        # job id -> {"job", "worker"}
+        self.leases = {}
+        self.attempts = collections.Counter()
+        # job id -> job, for every job handed out so far
+        self.issued = {}
+        self.finished = set()
+        # worker -> time of its last message
+        self.workers = {}
+        self.exhausted = False
+        self.results = queue.Queue()
+        self.server = None
+
+    def _next_job(self):
+        while self.requeued:
+            key, job = self.requeued.popleft()
+            if key not in self.finished:
+                return key, job
+        while not self.exhausted:
+            job = next(self.jobs, None)
+            if job is None:
+                self.exhausted = True
+                break
+            # a fitted RuntimeModel turns away jobs that would certainly blow the timeout or memory cap
+            reason = self.model.refusal(job, self.timeout, self.mem_limit_mb) if self.model else None
+            if reason:
+                self._finish(job_id(job), job, dict(job, status="refused", error=reason))
+                continue
+            return job_id(job), job
+        return None, None
+
+    def _done(self):
+        return self.exhausted and not self.requeued and not self.leases
+
+    def _finish(self, key, job, result):
+        self.finished.add(key)
+        self.leases.pop(key, None)
+        if self.journal:
+            self.journal.finish(job, result)
+        self.results.put(result)
+
+    def _requeue(self, key, reason):
+        lease = self.leases.pop(key)
+        self.attempts[key] += 1
+        if self.attempts[key] >= self.max_attempts:
+            self._finish(key, lease["job"], dict(lease["job"], status="lost", error=reason))
+        else:
+            self.requeued.appendleft((key, lease["job"]))
+
+    def _drop_worker(self, worker, reason):
+        self.workers.pop(worker, None)
+        for key in [key for key, lease in self.leases.items() if lease["worker"] == worker]:
+            self._requeue(key, f"worker {worker} {reason}")
+
+    def handle(self, message):
+        op, worker = message.get("op"), message.get("worker")
+        with self.lock:
+            self.workers[worker] = time.time()
+            if op == "hello":
+                return {"ok": True, "heartbeat": self.heartbeat_timeout / 4, "timeout": self.timeout,
+                        "mem_limit_mb": self.mem_limit_mb}
+            if op == "heartbeat":
+                return {"ok": True}
+            if op == "pull":
+                key, job = self._next_job()
+                if job is None:
+                    return {"job": None, "done": self._done(), "retry": POLL_INTERVAL}
+                self.leases[key] = {"job": job, "worker": worker}
+                self.issued[key] = job
+                if self.journal:
+                    self.journal.start(job)
+                return {"id": key, "job": job}
+            if op == "result":
+                key = message["id"]
+                # a worker declared dead may still answer; its result counts if nobody else finished the job first
+                if key in self.issued and key not in self.finished:
+                    self._finish(key, self.issued.pop(key), dict(message["result"], worker=worker))
+                return {"ok": True}
+        return {"ok": False, "error": f"unknown op {op}"}
+
+    def disconnect(self, worker):
+        with self.lock:
+            if worker in self.workers:
+                self._drop_worker(worker, "disconnected")
+
+    def reap(self):
+        now = time.time()
+        with self.lock:
+            for worker, last_seen in list(self.workers.items()):
+                if now - last_seen > self.heartbeat_timeout:
+                    self._drop_worker(worker, f"missed heartbeats for {now - last_seen:.0f}s")
+
+    def start(self):
+        self.server = _Server((self.host, self.port), _Handler)
+        self.server.broker = self
+        # port 0 binds an ephemeral port; report the real one
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def run(self):
+        if self.server is None:
+            self.start()
+        try:
+            while True:
+                try:
+                    yield self.results.get(timeout=min(POLL_INTERVAL, self.heartbeat_timeout / 4))
+                    continue
+                except queue.Empty:
+                    pass
+                self.reap()
+                with self.lock:
+                    if self._done() and self.results.empty():
+                        break
+            # let polling workers see that the queue is done before the server goes away
+            time.sleep(POLL_INTERVAL)
+        finally:
+            self.shutdown()
+
+
+class BrokerClient:
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, connect_timeout=10.0):
+        self.sock = socket.create_connection((host, port), timeout=connect_timeout)
+        self.sock.settimeout(None)
+        self.file = self.sock.makefile("rwb")
+        self.lock = threading.Lock()
+
+    def request(self, message):
+        with self.lock:
+            self.file.write((json.dumps(message, default=str) + "\n").encode())
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise ConnectionError("broker closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        try:
+            self.file.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def _connect(host, port, wait):
+    deadline = time.time() + wait
+    while True:
+        try:
+            return BrokerClient(host, port)
+        except OSError:
+            if time.time() >= deadline:
+                raise
+            time.sleep(POLL_INTERVAL)
+
+
+def _heartbeats(client, worker, interval, stop):
+    while not stop.wait(interval):
+        try:
+            client.request({"op": "heartbeat", "worker": worker})
+        except (OSError, ValueError):
+            return
+
+
+def run_worker(host=DEFAULT_HOST, port=DEFAULT_PORT, worker=None, timeout=None, mem_limit_mb=None, cache=None,
+               persistent=False, connect_wait=CONNECT_WAIT):
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    client = _connect(host, port, connect_wait)
+    hello = client.request({"op": "hello", "worker": worker})
+    # local limits win over the broker's defaults
+    timeout = timeout if timeout is not None else hello.get("timeout")
+    mem_limit_mb = mem_limit_mb if mem_limit_mb is not None else hello.get("mem_limit_mb")
+
+    stop = threading.Event()
+    threading.Thread(target=_heartbeats, args=(client, worker, hello.get("heartbeat", HEARTBEAT_INTERVAL), stop),
+                     daemon=True).start()
+    try:
+        while True:
+            try:
+                reply = client.request({"op": "pull", "worker": worker})
+            except (OSError, ValueError):
+                # the broker shuts down once every job is in
+                return
+            if reply.get("done"):
+                return
+            job = reply.get("job")
+            if job is None:
+                time.sleep(reply.get("retry", POLL_INTERVAL))
+                continue
+            try:
+                result = run_job(dict(job, scratch=True), timeout=timeout, mem_limit_mb=mem_limit_mb, cache=cache,
+                                 persistent=persistent)
+            except Exception as e:
+                result = dict(job, status="error", error=str(e))
+            result.pop("scratch", None)
+            try:
+                client.request({"op": "result", "worker": worker, "id": reply["id"], "result": result})
+            except (OSError, ValueError):
+                return
+            yield result
+    finally:
+        stop.set()
+        client.close()
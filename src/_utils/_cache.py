@@ -0,0 +1,218 @@
+'''
+Content-addressed on-disk cache of generator runs.
+
+Entries are keyed on a canonical hash of (generator type, shape, rank, constraints, field, generator version, options) and hold the emitted script, the M2 output and timings. Constraints are reduced to their orbit representative under the generator's symmetries, so isomorphic problems share one entry. Options that refer to particular modes, rows or factor variables pin those labels, and key_symmetries drops the symmetries that would move them: explicit or tie-broken bipartitions and covering or minimal slices name modes, random slices and linear sections draw from lists ordered by mode and row, and seeded Terracini points assign their values to factor variables by label. Terracini runs without a jacobian_seed and random slices without a slice_seed are not reproducible, so they are never cached.
+The cache is bounded in size and evicts least-recently-used entries; a hit refreshes the entry's mtime.
+Each ResultCache keeps a running estimate of the cache size and only scans the directory when a put pushes that estimate over max_bytes, or when the last scan is older than RESCAN_INTERVAL (other processes write to the same directory). Eviction frees space down to EVICT_TO of the bound, so a full cache is not rescanned on every put either.
+'''
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from _utils._symmetry import ALL_SYMMETRIES, canonical_form
+from generate import generator_symmetries, generator_version, parse_constraints
+
+
+DEFAULT_CACHE_DIR = os.environ.get("DAGIDEAL_CACHE", os.path.join("results", "cache"))
+DEFAULT_MAX_BYTES = 1 << 30
+RESCAN_INTERVAL = 60.0
+EVICT_TO = 0.9
+# bipartition selections that are closed under permuting modes of equal dimension
+INVARIANT_BIPARTITIONS = ("principal", "balanced", "all")
+
+
+def unseeded_random(job):
+    options = job.get("options", {})
+    if job["type"] == "terracini" and options.get("jacobian_seed") is None:
+        return True
+    return options.get("slices") == "random" and options.get("slice_seed") is None
+
+
+def key_symmetries(job):
+    if job["type"] == "terracini":
+        return ()
+    options = job.get("options", {})
+    symmetries = set(generator_symmetries(job["type"]))
+    bipartitions = options.get("bipartitions", "principal")
+    if not (isinstance(bipartitions, str) and bipartitions in INVARIANT_BIPARTITIONS):
+        symmetries.discard("modes")
+    slices = options.get("slices", "all")
+    if slices in ("covering", "minimal"):
+        symmetries.discard("modes")
+    elif slices == "random":
+        symmetries -= {"modes", "rows"}
+    if (options.get("elimination") or {}).get("linear_section"):
+        symmetries -= {"modes", "rows"}
+    return tuple(s for s in ALL_SYMMETRIES if s in symmetries)
+
+
+def canonical_problem(job):
+    shape = job["shape"]
+    if isinstance(shape, str):
+        shape = list(map(int, shape.split(',')))
+    shape = [int(d) for d in shape]
+    constraints = job["constraints"]
+    if isinstance(constraints, str):
+        constraints = parse_constraints(constraints)
+    symmetries = key_symmetries(job)
+    constraints, _ = canonical_form(shape, int(job["rank"]), constraints, symmetries)
+    return {
+        "type": job["type"],
+        "symmetries": list(symmetries),
+        "shape": shape,
+        "rank": int(job["rank"]),
+        "constraints": [list(c) for c in constraints],
+        "field": "".join(job.get("field", "ZZ/32003").split()),
+        "version": generator_version(job["type"]),
+        "options": job.get("options", {}),
+    }
+
+
+def cache_key(job):
+    payload = json.dumps(canonical_problem(job), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _matches(problem, filters):
+    for key, value in filters.items():
+        if key == "constraints":
+            canonical, _ = canonical_form(problem["shape"], problem["rank"], value, key_symmetries(problem))
+            value = [list(c) for c in canonical]
+        if problem.get(key) != value:
+            return False
+    return True
+
+
+class ResultCache:
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # bytes in the cache as of the last scan, plus what this instance wrote since
+        self._bytes = None
+        self._scanned = 0.0
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir) or prefix.startswith("."):
+                continue
+            for key in os.listdir(prefix_dir):
+                yield os.path.join(prefix_dir, key)
+
+    def get(self, job):
+        if unseeded_random(job):
+            return None
+        entry_dir = self._entry_dir(cache_key(job))
+        meta_path = os.path.join(entry_dir, "entry.json")
+        try:
+            with open(meta_path) as f:
+                entry = json.load(f)
+            with open(os.path.join(entry_dir, "script.m2")) as f:
+                entry["script"] = f.read()
+            with open(os.path.join(entry_dir, "output.log")) as f:
+                entry["output"] = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(meta_path)
+        return entry
+
+    def put(self, job, script, output, timings, record=None):
+        if unseeded_random(job):
+            return None
+        key = cache_key(job)
+        entry = {
+            "key": key,
+            "problem": canonical_problem(job),
+            "timings": timings,
+            "record": record,
+            "created": time.time(),
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        with open(os.path.join(tmp_dir, "script.m2"), "w") as f:
+            f.write(script)
+        with open(os.path.join(tmp_dir, "output.log"), "w") as f:
+            f.write(output)
+        with open(os.path.join(tmp_dir, "entry.json"), "w") as f:
+            json.dump(entry, f, indent=2)
+        size = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir))
+
+        entry_dir = self._entry_dir(key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # another worker stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        # a replaced entry is counted twice until the next scan, which only makes that scan come sooner
+        if self._bytes is not None:
+            self._bytes += size
+        if self._bytes is None or self._bytes > self.max_bytes or time.time() - self._scanned > RESCAN_INTERVAL:
+            self.evict()
+        return key
+
+    def _usage(self):
+        usage = []
+        for entry_dir in self._entries():
+            try:
+                size = sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+                last_used = os.path.getmtime(os.path.join(entry_dir, "entry.json"))
+            except FileNotFoundError:
+                continue
+            usage.append((last_used, size, entry_dir))
+        return usage
+
+    def evict(self):
+        usage = sorted(self._usage())
+        total = sum(size for _, size, _ in usage)
+        evicted = 0
+        target = self.max_bytes * EVICT_TO if total > self.max_bytes else self.max_bytes
+        for _, size, entry_dir in usage:
+            if total <= target:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            evicted += 1
+        self._bytes = total
+        self._scanned = time.time()
+        return evicted
+
+    def invalidate(self, **filters):
+        removed = 0
+        for entry_dir in list(self._entries()):
+            try:
+                with open(os.path.join(entry_dir, "entry.json")) as f:
+                    problem = json.load(f)["problem"]
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                problem = None
+            if problem is not None and not _matches(problem, filters):
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            removed += 1
+        self._bytes = None
+        return removed
+
+    def clear(self):
+        return self.invalidate()
+
+    def stats(self):
+        usage = self._usage()
+        return {
+            "entries": len(usage),
+            "bytes": sum(size for _, size, _ in usage),
+            "max_bytes": self.max_bytes,
+            "cache_dir": self.cache_dir,
+        }
@@ -0,0 +1,56 @@
+'''
+Compact M2 emission shared by the generators.
+
+Instead of unrolling every variable, CP sum and matrix entry, the compact scripts pass the shape, rank and constraint set as data and build the ring, the CP ideal and the matrices with M2's index ranges, apply, select and sum. Script size is then essentially independent of the tensor shape.
+'''
+
+import math
+
+from _utils._elimination import emit_elimination
+
+
+def _m2_set(triples):
+    return "set {" + ", ".join("(" + ",".join(map(str, t)) + ")" for t in triples) + "}"
+
+
+def emit_compact_data(gen, include_tensor=True):
+    zero_entries = gen.support.zero_entries if gen.support else []
+    unused_factors = gen.support.unused_factors if gen.support else []
+
+    yield f"kk = {gen.field}\n"
+    yield f"shape = {{{', '.join(map(str, gen.shape))}}}\n"
+    yield f"cpRank = {gen.rank}\n"
+    yield f"constraints = {_m2_set(sorted(gen.constraints))}\n"
+    yield f"zeroEntries = {_m2_set(zero_entries)}\n"
+    yield f"unusedFactors = {_m2_set(unused_factors)}\n\n"
+
+    yield "factorIndices = select(flatten flatten apply(#shape, m -> apply(shape#m, r -> apply(cpRank, c -> (m, r, c)))),\n"
+    yield "    i -> not member(i, constraints) and not member(i, unusedFactors))\n"
+    yield "allIndices = toList(toSequence((#shape):0) .. toSequence apply(shape, d -> d - 1))\n"
+    yield "tensorIndices = select(allIndices, i -> not member(i, zeroEntries))\n"
+    if include_tensor:
+        yield "R = kk[apply(factorIndices, i -> v_i) | apply(tensorIndices, i -> t_i)]\n\n"
+    else:
+        yield "R = kk[apply(factorIndices, i -> v_i)]\n\n"
+
+    yield "fv = (m, r, c) -> if member((m, r, c), constraints) or member((m, r, c), unusedFactors) then 0_R else v_(m, r, c)\n"
+    if include_tensor:
+        yield "tv = i -> if member(i, zeroEntries) then 0_R else t_i\n"
+    yield "cp = i -> sum(cpRank, c -> product(#shape, m -> fv(m, i#m, c)))\n\n"
+
+
+def has_live_entries(gen):
+    if gen.support is None:
+        return True
+    return len(gen.support.zero_entries) < math.prod(gen.shape)
+
+
+def emit_compact_cp_ideal(gen, name):
+    if has_live_entries(gen):
+        yield f"{name} = ideal apply(tensorIndices, i -> t_i - cp i)\n\n"
+    else:
+        yield f"{name} = ideal(0_R)\n\n"
+
+
+def emit_compact_elimination(gen, ideal_expr):
+    yield from emit_elimination(gen, "apply(factorIndices, i -> v_i)", ideal_expr)
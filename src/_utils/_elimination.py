@@ -0,0 +1,79 @@
+'''
+Elimination strategies shared by the elimination generators.
+
+By default a script ends with eliminate(factorVars, ...) and M2 picks its own strategy. An elimination spec (a dict) takes over that last stage:
+
+    order           "block": Groebner basis in a block elimination order, with the factor variables as the first block
+    degree_limit    d: stop the Groebner basis once every generator of the elimination ideal up to degree d is found
+    linear_section  c: add c random hyperplanes in the tensor variables first, to get degree and Hilbert function data cheaply
+    section_seed    seed for the hyperplanes (default 0, so scripts stay reproducible)
+
+Any of these switches to the explicit route. It copies R with MonomialOrder => Eliminate #factorVars, and grades the factor variables 1 and the tensor variables N. Every ideal the generators build is homogeneous in that grading: t - cp(v), minors in t, and hyperplanes in t. So the Groebner basis runs degree by degree, and a DegreeLimit of N*d is complete up to tensor degree d. The elimination ideal is read off the first block's complement and moved to a standard-graded ring in the tensor variables, so Betti tables are comparable with the default route.
+
+Hilbert function values are printed up to the degree limit (or degree 4), where they are exact. Degree and dimension are printed for linear sections computed without a degree limit.
+'''
+
+
+ORDERS = ("default", "block")
+DEFAULT_HILBERT_DEGREE = 4
+
+
+def elimination_strategy(spec):
+    if not spec:
+        return None
+    unknown = set(spec) - {"order", "degree_limit", "linear_section", "section_seed"}
+    if unknown:
+        raise ValueError(f"Unknown elimination options: {sorted(unknown)}")
+    if spec.get("order", "block") not in ORDERS:
+        raise ValueError(f"Unknown elimination order: {spec['order']}")
+    strategy = {
+        "order": "block",
+        "degree_limit": spec.get("degree_limit"),
+        "linear_section": spec.get("linear_section") or 0,
+        "section_seed": spec.get("section_seed", 0),
+    }
+    if spec.get("order") == "default" and not strategy["degree_limit"] and not strategy["linear_section"]:
+        return None
+    return strategy
+
+
+def emit_elimination(gen, factor_vars_expr, ideal_expr):
+    strategy = gen.elimination
+    yield f"factorVars = {factor_vars_expr}\n"
+    if strategy is None:
+        yield f"J = eliminate(factorVars, {ideal_expr})\n\n"
+        return
+
+    n_modes = len(gen.shape)
+    yield f"-- block elimination order, factor variables in degree 1 and tensor variables in degree {n_modes}\n"
+    yield "eliminationRing = newRing(R, MonomialOrder => Eliminate #factorVars,\n"
+    yield f"    Degrees => toList(#factorVars:1) | toList((numgens R - #factorVars):{n_modes}))\n"
+    yield f"I_elim = sub({ideal_expr}, eliminationRing)\n"
+    yield "tensorVars = drop(gens eliminationRing, #factorVars)\n"
+    if strategy["linear_section"]:
+        yield f"-- section by {strategy['linear_section']} random hyperplanes\n"
+        yield f"setRandomSeed {strategy['section_seed']}\n"
+        yield f"I_elim = I_elim + ideal apply({strategy['linear_section']}, i -> sum(tensorVars, x -> random(kk) * x))\n"
+    if strategy["degree_limit"]:
+        yield f"-- generators up to degree {strategy['degree_limit']} in the tensor variables\n"
+        yield f"G = gb(I_elim, DegreeLimit => {n_modes * strategy['degree_limit']})\n"
+    else:
+        yield "G = gb I_elim\n"
+    yield "tensorRing = kk[tensorVars]\n"
+    yield "J = sub(ideal selectInSubring(1, gens G), tensorRing)\n\n"
+
+
+def emit_elimination_report(gen):
+    strategy = gen.elimination
+    if strategy is None:
+        return
+    top = strategy["degree_limit"] or DEFAULT_HILBERT_DEGREE
+    if strategy["degree_limit"]:
+        yield f"print \"Degree Limit: {strategy['degree_limit']}\"\n"
+    if strategy["linear_section"]:
+        yield f"print \"Linear Section: {strategy['linear_section']} hyperplanes\"\n"
+    yield f"print(\"Hilbert Function: \" | toString apply({top + 1}, d -> hilbertFunction(d, tensorRing / J)))\n"
+    if strategy["linear_section"] and not strategy["degree_limit"]:
+        yield "print(\"Section Degree: \" | toString degree J)\n"
+        yield "print(\"Section Dimension: \" | toString dim J)\n"
+    yield "\n"
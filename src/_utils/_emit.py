@@ -0,0 +1,39 @@
+'''
+Streaming output for the M2 script generators.
+
+Generators yield the script as a sequence of text chunks; these helpers join or write them without building the whole script in memory.
+'''
+
+BUFFER_SIZE = 1 << 16
+
+
+def joined(items, sep):
+    first = True
+    for item in items:
+        if not first:
+            yield sep
+        yield item
+        first = False
+
+
+def write_chunks(chunks, out):
+    if hasattr(out, "write"):
+        _write_batched(chunks, out)
+        return
+    with open(out, "w", buffering=BUFFER_SIZE) as f:
+        _write_batched(chunks, f)
+
+
+def _write_batched(chunks, f):
+    batch = []
+    size = 0
+    for chunk in chunks:
+        batch.append(chunk)
+        size += len(chunk)
+        if size >= BUFFER_SIZE:
+            f.write("".join(batch))
+            batch.clear()
+            size = 0
+    if batch:
+        f.write("".join(batch))
+    f.flush()
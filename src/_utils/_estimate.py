@@ -0,0 +1,172 @@
+'''
+Pre-flight cost estimates for generator jobs.
+
+estimate() counts exactly what a script will ask M2 to build, without running anything. That covers the ring variables left after constraints and pruning, the number, degree and terms of the I_cp generators, the minors (or Strassen equations) added on top, and the Jacobian dimensions for Terracini.
+
+RuntimeModel fits log wall time and log peak RSS against those counts by least squares over past results. It fits per generator when there is enough history and falls back to a model pooled over all generators otherwise. The scheduler uses its predictions to order jobs and to refuse jobs whose optimistic prediction still exceeds the timeout or memory cap.
+'''
+
+import itertools
+import math
+
+import numpy as np
+
+from _utils._flattenings import minor_count, select_bipartitions
+from _utils._koszul import choose_configuration
+from _utils._portfolio import sound_strategies
+from _utils._slices import select_slices
+from _utils._support import CPSupport
+from generate import parse_constraints
+
+
+MIN_RECORDS = 8
+# how many residual standard deviations below the prediction a job must still exceed a limit by to be refused
+REFUSE_SIGMAS = 2.0
+
+
+def _minor_count(rows, cols, size):
+    return math.comb(rows, size) * math.comb(cols, size)
+
+
+def estimate(gen_type, shape, rank, constraints, prune=True, slice_minor_size=3, bipartitions="principal", slices="all",
+             slice_count=None, slice_seed=None, koszul_degree=None):
+    constraints = set(constraints)
+    index = CPSupport(shape, rank, constraints)
+    support = index if prune else None
+
+    factor_vars = len(index.factor_vars(prune))
+    cp_generators = math.prod(shape) - (len(index.zero_entries) if prune else 0)
+    cp_terms = int(index.live.sum())
+
+    counts = {
+        "type": gen_type,
+        "factor_variables": factor_vars,
+        "tensor_variables": 0 if gen_type == "terracini" else cp_generators,
+        "cp_generators": cp_generators,
+        "cp_terms": cp_terms,
+        "cp_degree": len(shape),
+        "equations": 0,
+        "equation_degree": 0,
+        "jacobian_rows": 0,
+        "jacobian_cols": 0,
+    }
+    counts["ring_variables"] = counts["factor_variables"] + counts["tensor_variables"]
+
+    if gen_type == "flattening":
+        size = rank + 1
+        counts["equations"] = sum(minor_count(shape, row_modes, size)
+                                  for row_modes in select_bipartitions(shape, rank, bipartitions))
+        counts["equation_degree"] = size
+    elif gen_type == "slicing":
+        size = slice_minor_size
+        counts["equations"] = sum(_minor_count(shape[a], shape[b], size)
+                                  for a, b, _ in select_slices(shape, size, slices, support, slice_count, slice_seed))
+        counts["equation_degree"] = size
+    elif gen_type == "strassen" and shape == [3, 3, 3]:
+        # entries of X_0 adj(X_1) X_2 - X_2 adj(X_1) X_0
+        counts["equations"] = 9
+        counts["equation_degree"] = 4
+    elif gen_type == "koszul":
+        config = choose_configuration(shape, rank, koszul_degree)
+        if config is not None:
+            counts["equations"] = config["minor_count"]
+            counts["equation_degree"] = config["minor_size"]
+    elif gen_type == "terracini":
+        counts["jacobian_rows"] = factor_vars
+        counts["jacobian_cols"] = cp_generators
+    return counts
+
+
+def estimate_job(job):
+    shape = list(map(int, job["shape"].split(','))) if isinstance(job["shape"], str) else list(job["shape"])
+    options = job.get("options", {})
+    return estimate(job["type"], shape, job["rank"], parse_constraints(job["constraints"]),
+                    prune=options.get("prune", True), bipartitions=options.get("bipartitions", "principal"),
+                    slices=options.get("slices", "all"), slice_count=options.get("slice_count"),
+                    slice_seed=options.get("slice_seed"), koszul_degree=options.get("koszul_degree"))
+
+
+def features(counts):
+    return np.array([
+        1.0,
+        math.log1p(counts["ring_variables"]),
+        math.log1p(counts["cp_terms"]),
+        math.log1p(counts["equations"]) * max(counts["equation_degree"], 1),
+        math.log1p(counts["jacobian_rows"] * counts["jacobian_cols"]),
+    ])
+
+
+def _fit(X, y):
+    # a little ridge keeps the fit defined when some features never vary in the history
+    ridge = 1e-3 * np.eye(X.shape[1])
+    coef = np.linalg.solve(X.T @ X + ridge, X.T @ y)
+    residuals = y - X @ coef
+    sigma = float(np.sqrt(residuals @ residuals / max(len(y) - X.shape[1], 1)))
+    return coef, sigma
+
+
+class RuntimeModel:
+
+    def __init__(self, models):
+        # models[type or "*"][target] = (coefficients, residual sigma), both in log space
+        self.models = models
+
+    @classmethod
+    def fit(cls, records):
+        rows = {}
+        for record in records:
+            if record.get("status") != "ok" or record.get("cached") or record.get("engine", "m2") != "m2":
+                continue
+            if not record.get("elapsed") or not record.get("peak_rss_kb"):
+                continue
+            try:
+                x = features(estimate_job(record))
+            except (KeyError, ValueError):
+                continue
+            y = (math.log(record["elapsed"]), math.log(record["peak_rss_kb"]))
+            rows.setdefault(record["type"], []).append((x, y))
+
+        pooled = [row for type_rows in rows.values() for row in type_rows]
+        models = {}
+        for key, type_rows in itertools.chain(rows.items(), [("*", pooled)]):
+            if len(type_rows) < MIN_RECORDS:
+                continue
+            X = np.array([x for x, _ in type_rows])
+            Y = np.array([y for _, y in type_rows])
+            models[key] = {"seconds": _fit(X, Y[:, 0]), "rss_kb": _fit(X, Y[:, 1])}
+        return cls(models)
+
+    def __bool__(self):
+        return bool(self.models)
+
+    def predict(self, job):
+        if job["type"] == "auto":
+            shape = list(map(int, job["shape"].split(','))) if isinstance(job["shape"], str) else list(job["shape"])
+            predictions = [self.predict(dict(job, type=s)) for s in sound_strategies(shape, job["rank"])]
+            predictions = [p for p in predictions if p]
+            return min(predictions, key=lambda p: p["seconds"]) if predictions else None
+
+        model = self.models.get(job["type"]) or self.models.get("*")
+        if model is None:
+            return None
+        x = features(estimate_job(job))
+        prediction = {}
+        for target, (coef, sigma) in model.items():
+            mean = float(x @ coef)
+            prediction[target] = math.exp(mean)
+            prediction[f"{target}_low"] = math.exp(mean - REFUSE_SIGMAS * sigma)
+        return prediction
+
+    def cost(self, job):
+        prediction = self.predict(job)
+        return prediction["seconds"] if prediction else math.inf
+
+    def refusal(self, job, timeout=None, mem_limit_mb=None):
+        prediction = self.predict(job)
+        if prediction is None:
+            return None
+        if timeout and prediction["seconds_low"] > timeout:
+            return f"predicted {prediction['seconds']:.0f}s exceeds the {timeout:.0f}s timeout"
+        if mem_limit_mb and prediction["rss_kb_low"] / 1024 > mem_limit_mb:
+            return f"predicted {prediction['rss_kb'] / 1024:.0f} MB exceeds the {mem_limit_mb:.0f} MB memory cap"
+        return None
@@ -0,0 +1,77 @@
+'''
+Choice of tensor flattenings.
+
+A bipartition of the modes into row modes and column modes flattens the tensor into a matrix whose rank is at most the CP rank, so its (rank+1)-minors vanish on the secant variety. A bipartition and its complement give transposed matrices with the same minors, so each one is identified by a single row side: the side with fewer modes, or the side containing mode 0 when both have the same number.
+
+Principal flattenings (one mode against the rest) are thin matrices. For four or more modes, balanced bipartitions such as {0,1} vs {2,3} give squarer matrices with a stronger rank condition and smaller minors. select_bipartitions() turns a selection name or an explicit list of row sides into a deduplicated list of row sides:
+
+    principal  one mode against the rest (the default)
+    balanced   the informative bipartitions with the largest smaller side, cheapest first
+    cheapest   the single informative bipartition with the fewest minors
+    all        every bipartition
+
+A bipartition is informative when both sides of its matrix exceed the rank, i.e. it has at least one (rank+1)-minor. balanced and cheapest fall back to the principal flattenings when no bipartition is informative.
+'''
+
+import itertools
+import math
+
+
+SELECTIONS = ("principal", "balanced", "cheapest", "all")
+
+
+def canonical_side(n_modes, modes):
+    side = tuple(sorted(set(modes)))
+    complement = tuple(m for m in range(n_modes) if m not in side)
+    if not side or not complement:
+        raise ValueError(f"Bipartition side {list(modes)} must be a nonempty proper subset of the {n_modes} modes")
+    if len(side) != len(complement):
+        return min(side, complement, key=len)
+    return side if 0 in side else complement
+
+
+def all_bipartitions(n_modes):
+    sides = []
+    for size in range(1, n_modes // 2 + 1):
+        for side in itertools.combinations(range(n_modes), size):
+            if canonical_side(n_modes, side) == side:
+                sides.append(side)
+    return sides
+
+
+def flattening_size(shape, row_modes):
+    rows = math.prod(shape[m] for m in row_modes)
+    return rows, math.prod(shape) // rows
+
+
+def minor_count(shape, row_modes, size):
+    rows, cols = flattening_size(shape, row_modes)
+    return math.comb(rows, size) * math.comb(cols, size)
+
+
+def parse_bipartitions(spec):
+    # a selection name, or semicolon-separated row sides such as '0,1;0,2'
+    if not spec or spec in SELECTIONS:
+        return spec or "principal"
+    return [tuple(map(int, side.split(','))) for side in spec.split(';')]
+
+
+def select_bipartitions(shape, rank, spec="principal"):
+    n_modes = len(shape)
+    principal = [canonical_side(n_modes, (m,)) for m in range(n_modes)] if n_modes > 1 else []
+    if spec == "principal":
+        return list(dict.fromkeys(principal))
+    if spec == "all":
+        return all_bipartitions(n_modes)
+    if spec in ("balanced", "cheapest"):
+        informative = [side for side in all_bipartitions(n_modes) if min(flattening_size(shape, side)) > rank]
+        if not informative:
+            return list(dict.fromkeys(principal))
+        informative.sort(key=lambda side: minor_count(shape, side, rank + 1))
+        if spec == "cheapest":
+            return informative[:1]
+        best = max(min(flattening_size(shape, side)) for side in informative)
+        return [side for side in informative if min(flattening_size(shape, side)) == best]
+    if isinstance(spec, str):
+        raise ValueError(f"Unknown flattening selection: {spec}")
+    return list(dict.fromkeys(canonical_side(n_modes, side) for side in spec))
@@ -39,5 +39,5 @@ if __name__ == "__main__":
     for i, (shape, rank, const) in enumerate([(test1_shape, test1_rank, test1_const), 
                                               (test2_shape, test2_rank, test2_const), 
                                               (test3_shape, test3_rank, test3_const)]):
-        for gen in ['flattening', 'full', 'slicing', 'strassen', 'terracini']:
+        for gen in ['flattening', 'full', 'koszul', 'slicing', 'strassen', 'terracini']:
             gen_test(gen, shape, rank, const, f"test{i+1}_{gen}.m2")
\ No newline at end of file
@@ -0,0 +1,146 @@
+'''
+Crash-safe journal of job states, so interrupted runs and sweeps can resume.
+
+The journal is an append-only JSONL file of state transitions: queued, running, done, failed, timeout, cancelled, refused, lost. Each line is flushed and fsynced before the run moves on. A job is identified by a hash of its name and problem, so the same command line maps to the same ids on restart. Replaying the file gives each job's latest state and how many times it was started. resume() then yields only the jobs that still need running:
+
+    never seen or queued                                        run
+    running when the previous run died                          run again until max_attempts starts, then journaled as lost
+    done                                                        skipped
+    refused by the runtime model, or lost                       skipped
+    failed, timeout or cancelled                                retried until max_attempts starts
+
+A job is only journaled as running once it actually starts: scheduler workers append that line themselves (start_in_worker), so jobs that were merely queued for the pool when a run died are not counted as attempts.
+A process killed mid-write leaves at most one truncated last line. Replay skips it, and the next append starts on a fresh line. Logs and scripts are written to a temporary file and renamed into place (write_atomic), so a log that exists is complete.
+'''
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+STATES = ("queued", "running", "done", "failed", "timeout", "cancelled", "refused", "lost")
+RETRYABLE = ("failed", "timeout", "cancelled")
+
+
+def append_line(path, record):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "ab") as f:
+        # a truncated last line from a killed writer must not swallow this record
+        if f.tell() > 0:
+            with open(path, "rb") as tail:
+                tail.seek(-1, os.SEEK_END)
+                if tail.read(1) != b"\n":
+                    f.write(b"\n")
+        f.write((json.dumps(record) + "\n").encode())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_atomic(path, text):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".partial")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def job_id(job):
+    problem = {key: job.get(key) for key in ("name", "type", "shape", "rank", "constraints", "field", "engine", "options")}
+    return hashlib.sha256(json.dumps(problem, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def result_state(result):
+    status = result.get("status")
+    if status == "ok":
+        return "done"
+    if status in ("timeout", "cancelled", "refused", "lost"):
+        return status
+    return "failed"
+
+
+def _event(job, state, attempt, **extra):
+    return dict({"id": job_id(job), "name": job.get("name"), "state": state, "attempt": attempt,
+                 "timestamp": time.time()}, **extra)
+
+
+def start_in_worker(path, job, attempt):
+    # called in the process that runs the job, with the attempt number claimed by the parent's JobJournal
+    append_line(path, _event(job, "running", attempt))
+
+
+class JobJournal:
+
+    def __init__(self, path, max_attempts=1):
+        self.path = path
+        self.max_attempts = max_attempts
+        # job id -> {"name", "state", "attempts"}
+        self.entries = {}
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entry = self.entries.setdefault(event["id"], {"name": event.get("name"), "attempts": 0})
+                entry["state"] = event["state"]
+                entry["attempts"] = event.get("attempt", entry["attempts"])
+
+    def record(self, job, state, **extra):
+        key = job_id(job)
+        entry = self.entries.setdefault(key, {"name": job.get("name"), "attempts": 0})
+        if state == "running":
+            entry["attempts"] += 1
+        entry["state"] = state
+        append_line(self.path, _event(job, state, entry["attempts"], **extra))
+
+    def needs_run(self, job):
+        entry = self.entries.get(job_id(job))
+        if entry is None or entry["state"] == "queued":
+            return True
+        return entry["state"] in RETRYABLE + ("running",) and entry["attempts"] < self.max_attempts
+
+    def resume(self, jobs):
+        for job in jobs:
+            if not self.needs_run(job):
+                entry = self.entries.get(job_id(job))
+                if entry["state"] == "running":
+                    # a job that keeps taking the whole run down with it is not started again
+                    self.record(job, "lost", error=f"run died while the job was running ({entry['attempts']} attempts)")
+                continue
+            if job_id(job) not in self.entries:
+                self.record(job, "queued")
+            yield job
+
+    def start(self, job):
+        self.record(job, "running")
+
+    def claim(self, job):
+        # count the attempt here, but leave the running line to the worker (start_in_worker)
+        entry = self.entries.setdefault(job_id(job), {"name": job.get("name"), "attempts": 0, "state": "queued"})
+        entry["attempts"] += 1
+        return entry["attempts"]
+
+    def finish(self, job, result):
+        extra = {"error": result["error"]} if result.get("error") else {}
+        self.record(job, result_state(result), **extra)
+
+    def counts(self):
+        counts = dict.fromkeys(STATES, 0)
+        for entry in self.entries.values():
+            counts[entry["state"]] += 1
+        return counts
@@ -0,0 +1,59 @@
+'''
+Koszul-Young flattenings.
+
+Split the modes into A (one mode), B and C (the remaining modes, each side flattened), and restrict A to its first a' coordinates. The Koszul flattening of degree p maps Lambda^p A' (x) B* -> Lambda^(p+1) A' (x) C. As a block matrix it is sum_i W_i (x) X_i, where X_i is the B x C slice of the tensor at A-index i and W_i is wedging with e_i, a signed 0/1 matrix from p-subsets to (p+1)-subsets of A'.
+
+For a rank-one tensor the flattening has rank C(a'-1, p), so for CP rank at most r its minors of size r * C(a'-1, p) + 1 vanish. p = 0 gives the ordinary flattening, and a = b = c = 3 with p = 1 gives the 9 x 9 matrix behind Strassen's equations. A configuration is informative when that minor size fits in the matrix. choose_configuration() picks the informative configuration with the lowest-degree minors, and the fewest of them among those.
+'''
+
+import itertools
+import math
+
+
+def configuration(shape, rank, a_mode, b_modes, a_dim, p):
+    c_modes = [m for m in range(len(shape)) if m != a_mode and m not in b_modes]
+    rows = math.comb(a_dim, p) * math.prod(shape[m] for m in b_modes)
+    cols = math.comb(a_dim, p + 1) * math.prod(shape[m] for m in c_modes)
+    minor_size = rank * math.comb(a_dim - 1, p) + 1
+    return {
+        "a_mode": a_mode,
+        "b_modes": list(b_modes),
+        "c_modes": c_modes,
+        "a_dim": a_dim,
+        "degree": p,
+        "rows": rows,
+        "cols": cols,
+        "minor_size": minor_size,
+        "minor_count": math.comb(rows, minor_size) * math.comb(cols, minor_size) if minor_size <= min(rows, cols) else 0,
+    }
+
+
+def configurations(shape, rank, degree=None):
+    if len(shape) < 3:
+        return
+    for a_mode in range(len(shape)):
+        rest = [m for m in range(len(shape)) if m != a_mode]
+        for size in range(1, len(rest)):
+            for b_modes in itertools.combinations(rest, size):
+                for p in ([degree] if degree else range(1, (shape[a_mode] - 1) // 2 + 1)):
+                    for a_dim in range(2 * p + 1, shape[a_mode] + 1):
+                        yield configuration(shape, rank, a_mode, b_modes, a_dim, p)
+
+
+def choose_configuration(shape, rank, degree=None):
+    informative = [config for config in configurations(shape, rank, degree) if config["minor_count"]]
+    if not informative:
+        return None
+    return min(informative, key=lambda config: (config["minor_size"], config["minor_count"]))
+
+
+def wedge_entries(a_dim, p, i):
+    # nonzero entries of e_i wedge -: Lambda^p -> Lambda^(p+1), with subsets indexed in lexicographic order
+    targets = {subset: index for index, subset in enumerate(itertools.combinations(range(a_dim), p + 1))}
+    entries = []
+    for row, subset in enumerate(itertools.combinations(range(a_dim), p)):
+        if i in subset:
+            continue
+        sign = -1 if sum(1 for s in subset if s < i) % 2 else 1
+        entries.append((row, targets[tuple(sorted(subset + (i,)))], sign))
+    return entries
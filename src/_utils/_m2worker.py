@@ -0,0 +1,223 @@
+'''
+Long-lived M2 interpreters that run many scripts each.
+
+Starting M2 and loading its packages costs more than the math for our small jobs. An M2Worker keeps one interpreter running on a driver script and feeds it jobs over stdin. Each job's output is framed by BEGIN/END sentinels. After every job the driver erases all user symbols and clears the output history, so every script starts from a fresh ring with no leaked globals.
+
+Timeouts kill the interpreter, and the next job starts a new one. The memory cap is an RLIMIT_AS on the interpreter. Per-job CPU time and peak RSS come from /proc: the RSS high-water mark is reset through clear_refs before each job.
+'''
+
+import atexit
+import json
+import os
+import re
+import resource
+import select
+import signal
+import subprocess
+import tempfile
+import time
+
+
+DRIVER = '''-- dagideal persistent worker driver: jobs arrive on stdin as dagidealRun/dagidealEnd lines
+debuggingMode = false
+printWidth = 0
+dagidealStatus = "ok"
+dagidealRun = (path, tag) -> (
+    stdio << "<<<DAGIDEAL-BEGIN " << tag << ">>>" << endl << flush;
+    dagidealStatus = "error";
+    load path;
+    dagidealStatus = "ok";
+    )
+dagidealEnd = tag -> (
+    stdio << "<<<DAGIDEAL-END " << tag << " " << dagidealStatus << ">>>" << endl << flush;
+    scan(userSymbols(), s -> if not member(s, dagidealKeep) then erase s);
+    clearOutput();
+    collectGarbage();
+    )
+dagidealKeep = set {symbol dagidealStatus, symbol dagidealRun, symbol dagidealEnd, symbol dagidealKeep}
+stdio << "<<<DAGIDEAL-READY>>>" << endl << flush;
+'''
+
+READY = re.compile(r"<<<DAGIDEAL-READY>>>\n")
+BEGIN = "<<<DAGIDEAL-BEGIN {tag}>>>\n"
+END = "<<<DAGIDEAL-END {tag} (ok|error)>>>\n"
+DEFAULT_MAX_JOBS = 200
+STARTUP_TIMEOUT = 120
+
+
+class WorkerDied(Exception):
+    pass
+
+
+class WorkerTimeout(Exception):
+    pass
+
+
+def limit_memory(mem_limit_mb):
+    def apply():
+        limit = int(mem_limit_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return apply
+
+
+def _cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # fields after the parenthesised command name; utime and stime are the 12th and 13th
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _peak_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss(pid):
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+class M2Worker:
+
+    def __init__(self, mem_limit_mb=None, max_jobs=DEFAULT_MAX_JOBS):
+        self.mem_limit_mb = mem_limit_mb
+        self.max_jobs = max_jobs
+        self.process = None
+        self.jobs_run = 0
+        self._buffer = ""
+        self._driver_path = None
+
+    def start(self):
+        if self._driver_path is None:
+            fd, self._driver_path = tempfile.mkstemp(prefix="dagideal-driver-", suffix=".m2")
+            with os.fdopen(fd, "w") as f:
+                f.write(DRIVER)
+        preexec = limit_memory(self.mem_limit_mb) if self.mem_limit_mb else None
+        self.process = subprocess.Popen(["M2", "--silent", "--no-prompts", "--no-readline", self._driver_path],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        preexec_fn=preexec, start_new_session=True)
+        self.jobs_run = 0
+        self._buffer = ""
+        try:
+            self._read_until(READY, time.time() + STARTUP_TIMEOUT)
+        except (WorkerDied, WorkerTimeout):
+            output = self._buffer
+            self._kill()
+            raise RuntimeError(f"M2 worker failed to start:\n{output}")
+        self._buffer = ""
+
+    def close(self):
+        if self.process is not None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+            self.process = None
+        if self._driver_path is not None:
+            os.unlink(self._driver_path)
+            self._driver_path = None
+
+    def _kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.wait()
+        returncode = self.process.returncode
+        self.process = None
+        return returncode
+
+    def _read_until(self, pattern, deadline):
+        fd = self.process.stdout.fileno()
+        while True:
+            match = pattern.search(self._buffer)
+            if match:
+                self._buffer = self._buffer[match.end():]
+                return match
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                raise WorkerTimeout()
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                raise WorkerTimeout()
+            data = os.read(fd, 1 << 16)
+            if not data:
+                raise WorkerDied()
+            self._buffer += data.decode(errors="replace")
+
+    def run(self, script_path, log_filepath, timeout=None):
+        if self.process is None or self.jobs_run >= self.max_jobs:
+            if self.process is not None:
+                self._kill()
+            self.start()
+
+        self.jobs_run += 1
+        tag = self.jobs_run
+        pid = self.process.pid
+        _reset_peak_rss(pid)
+        cpu_before = _cpu_seconds(pid)
+        start_time = time.time()
+        deadline = start_time + timeout if timeout else None
+
+        returncode, timed_out, output = 0, False, ""
+        try:
+            try:
+                self.process.stdin.write(f"dagidealRun({json.dumps(script_path)}, {tag});\ndagidealEnd {tag};\n".encode())
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                raise WorkerDied()
+            frame = re.escape(BEGIN.format(tag=tag)) + "(.*?)" + END.format(tag=tag)
+            match = self._read_until(re.compile(frame, re.DOTALL), deadline)
+            output = match.group(1)
+            returncode = 0 if match.group(2) == "ok" else 1
+        except WorkerTimeout:
+            timed_out = True
+            returncode = self._kill()
+        except WorkerDied:
+            # the interpreter exited mid-job, e.g. on hitting its memory cap
+            returncode = self._kill() or 1
+
+        # a killed interpreter leaves its partial output in the buffer
+        if self.process is None:
+            output, self._buffer = self._buffer.split(BEGIN.format(tag=tag), 1)[-1], ""
+            cpu_seconds, peak_rss_kb = None, None
+        else:
+            cpu_after = _cpu_seconds(pid)
+            cpu_seconds = None if cpu_before is None else cpu_after - cpu_before
+            peak_rss_kb = _peak_rss_kb(pid)
+
+        with open(log_filepath, "w") as log_file:
+            log_file.write(output)
+
+        return {
+            "returncode": returncode,
+            "timed_out": timed_out,
+            "elapsed": time.time() - start_time,
+            "peak_rss_kb": peak_rss_kb,
+            "cpu_seconds": cpu_seconds,
+        }
+
+
+_shared = {}
+
+
+def shared_worker(mem_limit_mb=None):
+    # one interpreter per scheduler process, reused across all the jobs that process runs
+    worker = _shared.get(mem_limit_mb)
+    if worker is None:
+        worker = _shared[mem_limit_mb] = M2Worker(mem_limit_mb)
+        atexit.register(worker.close)
+    return worker
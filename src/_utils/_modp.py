@@ -0,0 +1,175 @@
+'''
+Modular linear algebra over prime fields ZZ/p on NumPy integer arrays.
+
+Entries are kept reduced in [0, p) as int64, so every product of two entries fits without overflow for p < 2^31.
+Matrix products are summed in chunks small enough to stay below 2^63 before each reduction.
+'''
+
+import re
+
+import numpy as np
+
+
+# used when the requested field is QQ: ranks at a random point mod a large prime agree with QQ with high probability
+LARGE_PRIME = 2147483647
+
+
+def field_prime(field):
+    match = re.fullmatch(r"\s*ZZ\s*/\s*(\d+)\s*", field)
+    if match:
+        p = int(match.group(1))
+        if p >= 2**31:
+            raise ValueError(f"Prime {p} is too large for int64 modular arithmetic.")
+        return p
+    if field.strip() == "QQ":
+        return LARGE_PRIME
+    raise ValueError(f"Unsupported field for native computation: {field}")
+
+
+def is_prime(n):
+    if n < 2:
+        return False
+    for d in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % d == 0:
+            return n == d
+    # deterministic Miller-Rabin for n < 3.3e24 with these bases
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_primes(start, count):
+    primes = []
+    n = start
+    while len(primes) < count:
+        if is_prime(n):
+            primes.append(n)
+        n += 1
+    return primes
+
+
+def rank_mod_p(matrix, p):
+    A = np.array(matrix, dtype=np.int64) % p
+    if A.ndim != 2 or A.size == 0:
+        return 0
+    # eliminate along the shorter side
+    if A.shape[1] > A.shape[0]:
+        A = np.ascontiguousarray(A.T)
+
+    n_rows, n_cols = A.shape
+    rank = 0
+    for col in range(n_cols):
+        if rank == n_rows:
+            break
+        nonzero = np.flatnonzero(A[rank:, col])
+        if nonzero.size == 0:
+            continue
+        pivot = rank + nonzero[0]
+        if pivot != rank:
+            A[[rank, pivot]] = A[[pivot, rank]]
+
+        inv = pow(int(A[rank, col]), -1, p)
+        A[rank, col:] = A[rank, col:] * inv % p
+
+        rows = rank + 1 + np.flatnonzero(A[rank + 1:, col])
+        if rows.size:
+            update = np.outer(A[rows, col], A[rank, col:]) % p
+            A[rows, col:] = (A[rows, col:] - update) % p
+        rank += 1
+
+    return rank
+
+
+def matmul_mod_p(A, B, p):
+    # products are < p^2, so only this many of them can be summed in int64 before reducing
+    chunk = max(1, (2**63 - 1) // ((p - 1) ** 2))
+    out = np.zeros((A.shape[0], B.shape[1]), dtype=np.int64)
+    for start in range(0, A.shape[1], chunk):
+        out = (out + A[:, start:start + chunk] @ B[start:start + chunk]) % p
+    return out
+
+
+def rref_mod_p(matrix, p):
+    A = np.array(matrix, dtype=np.int64) % p
+    A = A[A.any(axis=1)]
+    pivots = []
+    rank = 0
+    while rank < A.shape[0]:
+        # jump straight to the next pivot column instead of scanning columns one at a time
+        live = np.flatnonzero(A[rank:].any(axis=0))
+        if live.size == 0:
+            break
+        col = live[0]
+        pivot = rank + np.flatnonzero(A[rank:, col])[0]
+        if pivot != rank:
+            A[[rank, pivot]] = A[[pivot, rank]]
+
+        inv = pow(int(A[rank, col]), -1, p)
+        A[rank] = A[rank] * inv % p
+
+        rows = np.flatnonzero(A[:, col])
+        rows = rows[rows != rank]
+        if rows.size:
+            A[rows] = (A[rows] - np.outer(A[rows, col], A[rank]) % p) % p
+        pivots.append(col)
+        rank += 1
+
+    return A[:rank], pivots
+
+
+# row space over ZZ/p kept in reduced row echelon form, grown one block of vectors at a time
+class IncrementalSpan:
+
+    def __init__(self, length, p):
+        self.p = p
+        self.basis = np.zeros((0, length), dtype=np.int64)
+        self.pivots = []
+
+    @property
+    def rank(self):
+        return len(self.pivots)
+
+    @property
+    def full(self):
+        return self.rank == self.basis.shape[1]
+
+    def extended(self, vectors):
+        # returns the span with the vectors added, leaving this one untouched (or itself if nothing is new)
+        if self.full:
+            return self
+        V = np.array(vectors, dtype=np.int64) % self.p
+        if V.size == 0:
+            return self
+        # with the basis fully reduced, one product removes every component it already spans
+        if self.pivots:
+            V = (V - matmul_mod_p(V[:, self.pivots], self.basis, self.p)) % self.p
+        new, new_pivots = rref_mod_p(V, self.p)
+        if not new_pivots:
+            return self
+        basis = self.basis
+        if self.pivots:
+            basis = (basis - matmul_mod_p(basis[:, new_pivots], new, self.p)) % self.p
+
+        basis = np.concatenate([basis, new])
+        pivots = self.pivots + new_pivots
+        order = np.argsort(pivots)
+        span = IncrementalSpan(basis.shape[1], self.p)
+        span.basis = basis[order]
+        span.pivots = [pivots[i] for i in order]
+        return span
+
+    def add(self, vectors):
+        span = self.extended(vectors)
+        self.basis, self.pivots = span.basis, span.pivots
+        return self.rank
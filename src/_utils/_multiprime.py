@@ -0,0 +1,81 @@
+'''
+Multi-prime runs with consistency checking.
+
+An unlucky prime can change a Betti table, and an unlucky prime or point can lower a Jacobian rank. run_multiprime() fans one problem out over K primes as independent jobs, run in parallel on the scheduler, and compares the structured answers.
+
+Betti tables are decided by majority and every dissenting prime is flagged. For Terracini the rank can only drop by bad luck, so the maximum over all primes and points is taken. It comes with a Schwartz-Zippel bound on the observed Jacobian rank k being too low. If the generic rank is larger, some (k+1) x (k+1) minor of the Jacobian is a nonzero polynomial of degree at most (k+1)(N-1) in the factor variables, and every such minor vanishes at the point, which happens with probability at most (k+1)(N-1)/p. The bound assumes the minor does not vanish identically mod p, and the agreement across primes guards against that. The bounds of different primes only multiply if their points are independent, so every prime draws its points from its own seed, spawned from the run's seed (fresh entropy when none is given).
+'''
+
+import json
+import math
+from collections import Counter
+
+import numpy as np
+
+from _utils._modp import next_primes
+from _utils._scheduler import _parse_shape, run_jobs
+
+
+DEFAULT_START = 32003
+
+
+def prime_jobs(job, primes, points=1, seed=None):
+    seeds = np.random.SeedSequence(seed).spawn(len(primes))
+    for p, child in zip(primes, seeds):
+        sub_job = dict(job, field=f"ZZ/{p}", name=f"{job['name']}_p{p}", out=f"{job['name']}_p{p}.m2", prime=p)
+        if job["type"] == "terracini":
+            sub_seed = int(child.generate_state(1)[0])
+            options = dict(job.get("options", {}))
+            if points > 1:
+                options["points"] = points
+            if job.get("engine") == "native":
+                sub_job["seed"] = sub_seed
+            else:
+                options["jacobian_seed"] = sub_seed
+            sub_job["options"] = options
+        yield sub_job
+
+
+def answer(result):
+    if result.get("status") != "ok":
+        return None
+    parsed = result.get("parsed") or result.get("result") or {}
+    if "actual_dimension" in parsed:
+        return parsed["actual_dimension"]
+    if "betti" in parsed:
+        return {"columns": parsed["betti"]["columns"], "rows": {str(k): v for k, v in parsed["betti"]["rows"].items()}}
+    return None
+
+
+def rank_error_bound(shape, observed_rank, primes, points):
+    # an observed Jacobian rank k is only too low if a nonzero (k+1)-minor vanishes at every point
+    degree = (observed_rank + 1) * (len(shape) - 1)
+    return math.prod(min(1.0, degree / p) ** points for p in primes)
+
+
+def compare(job, results, points=1):
+    answers = {result["prime"]: answer(result) for result in results}
+    valid = {p: a for p, a in answers.items() if a is not None}
+    report = {
+        "primes": sorted(answers),
+        "answers": {str(p): a for p, a in sorted(answers.items())},
+        "missing": sorted(p for p, a in answers.items() if a is None),
+    }
+    if not valid:
+        return dict(report, consensus=None, dissenting=[], agree=False)
+
+    if job["type"] == "terracini":
+        consensus = max(valid.values())
+        report["error_bound"] = rank_error_bound(_parse_shape(job["shape"]), consensus, sorted(valid), points)
+    else:
+        votes = Counter(json.dumps(a, sort_keys=True) for a in valid.values())
+        consensus = json.loads(votes.most_common(1)[0][0])
+    dissenting = sorted(p for p, a in valid.items() if a != consensus)
+    return dict(report, consensus=consensus, dissenting=dissenting, agree=not dissenting and not report["missing"])
+
+
+def run_multiprime(job, count, points=1, start=DEFAULT_START, seed=None, **scheduler_options):
+    primes = next_primes(start, count)
+    scheduler_options.setdefault("workers", count)
+    results = list(run_jobs(prime_jobs(job, primes, points, seed), **scheduler_options))
+    return results, compare(job, results, points)
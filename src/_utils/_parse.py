@@ -0,0 +1,115 @@
+'''
+Parses the output our M2 scripts print into structured data.
+
+Understands the `net betti gens J` table printed by the elimination generators (with the degree limit, linear section and Hilbert function lines of explicit elimination strategies), the Terracini identifiability report and the PROFILE lines of profiled scripts.
+'''
+
+import re
+
+from _utils._profile import parse_profile
+
+
+TERRACINI_FIELDS = {
+    "free_parameters": re.compile(r"Total Free Parameters \(Vertices\):\s*(-?\d+)"),
+    "scaling_redundancies": re.compile(r"Scaling Redundancies:\s*(-?\d+)"),
+    "expected_dimension": re.compile(r"Expected Dimension \(if identifiable\):\s*(-?\d+)"),
+}
+POINT_RANKS = re.compile(r"Jacobian Ranks at Random Points:\s*\{([^}]*)\}")
+ACTUAL_DIMENSION = re.compile(r"Actual Dimension of Constrained Variety \(Jacobian Rank\):\s*\n\s*(-?\d+)")
+RANK_ROW = re.compile(r"^Rank (\d+): Free Parameters (\d+), Expected Dimension (-?\d+), Actual Dimension (\d+)$", re.MULTILINE)
+FILLING_RANK = re.compile(r"First Rank Filling the Ambient Space: (\d+)")
+ELIMINATION_FIELDS = {
+    "degree_limit": re.compile(r"^Degree Limit: (\d+)$", re.MULTILINE),
+    "linear_section": re.compile(r"^Linear Section: (\d+) hyperplanes$", re.MULTILINE),
+    "section_degree": re.compile(r"^Section Degree: (\d+)$", re.MULTILINE),
+    "section_dimension": re.compile(r"^Section Dimension: (-?\d+)$", re.MULTILINE),
+}
+HILBERT_FUNCTION = re.compile(r"^Hilbert Function: \{([^}]*)\}$", re.MULTILINE)
+BETTI_ROW = re.compile(r"^\s*(-?\d+|total):\s*(.*)$")
+
+
+def parse_betti(output):
+    lines = output.splitlines()
+    for idx, line in enumerate(lines):
+        match = BETTI_ROW.match(line)
+        if not match or match.group(1) != "total" or idx == 0:
+            continue
+
+        columns = [int(c) for c in lines[idx - 1].split()]
+        totals = [int(v) for v in match.group(2).split()]
+        rows = {}
+        for row_line in lines[idx + 1:]:
+            row_match = BETTI_ROW.match(row_line)
+            if not row_match or row_match.group(1) == "total":
+                break
+            rows[int(row_match.group(1))] = [0 if v == "." else int(v) for v in row_match.group(2).split()]
+
+        # row d, column i counts generators of degree d + i
+        generators_by_degree = {}
+        if 1 in columns:
+            col = columns.index(1)
+            for row, entries in rows.items():
+                if col < len(entries) and entries[col]:
+                    generators_by_degree[row + 1] = entries[col]
+
+        return {
+            "columns": columns,
+            "totals": totals,
+            "rows": rows,
+            "generators_by_degree": generators_by_degree,
+            "num_generators": sum(generators_by_degree.values()),
+        }
+    return None
+
+
+def parse_terracini(output):
+    report = {}
+    for key, pattern in TERRACINI_FIELDS.items():
+        match = pattern.search(output)
+        if match:
+            report[key] = int(match.group(1))
+    match = ACTUAL_DIMENSION.search(output)
+    if match:
+        report["actual_dimension"] = int(match.group(1))
+    match = POINT_RANKS.search(output)
+    if match:
+        report["point_ranks"] = [int(v) for v in match.group(1).split(",") if v.strip()]
+    return report or None
+
+
+def parse_rank_sweep(output):
+    by_rank = [{"rank": int(r), "free_parameters": int(n), "expected_dimension": int(e), "actual_dimension": int(a)}
+               for r, n, e, a in RANK_ROW.findall(output)]
+    if not by_rank:
+        return None
+    match = FILLING_RANK.search(output)
+    return {"by_rank": by_rank, "filling_rank": int(match.group(1)) if match else None}
+
+
+def parse_elimination(output):
+    report = {key: int(match.group(1)) for key, pattern in ELIMINATION_FIELDS.items()
+              if (match := pattern.search(output))}
+    match = HILBERT_FUNCTION.search(output)
+    if match:
+        report["hilbert_function"] = [int(v) for v in match.group(1).split(",") if v.strip()]
+    return report or None
+
+
+def parse_output(output):
+    parsed = {}
+    betti = parse_betti(output)
+    if betti:
+        parsed["betti"] = betti
+    terracini = parse_terracini(output)
+    if terracini:
+        parsed.update(terracini)
+    elimination = parse_elimination(output)
+    if elimination:
+        parsed.update(elimination)
+    rank_sweep = parse_rank_sweep(output)
+    if rank_sweep:
+        parsed.update(rank_sweep)
+    profile = parse_profile(output)
+    if profile:
+        parsed["profile"] = profile
+    return parsed
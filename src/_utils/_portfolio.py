@@ -0,0 +1,151 @@
+'''
+Portfolio racing for jobs of type "auto".
+
+All elimination generators describe the same ideal; they differ only in which vanishing minors they hand to the Groebner basis, and which one finishes first depends heavily on the instance. race() runs every sound strategy for a problem in parallel, each under its time budget. The first Betti table to arrive wins and the other M2 children are killed.
+
+Every race is appended to a JSONL history. Later races try the strategies that won on the same shape and rank (and, failing that, on the same number of modes and rank) first, and can be narrowed to the most promising few with width=.
+'''
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from _utils._journal import write_atomic
+from _utils._koszul import choose_configuration
+from _utils._parse import parse_output
+from _utils._scheduler import SRC_DIR, _parse_shape, run_m2
+
+
+# terracini answers a different question (dimension, not the ideal) and never takes part
+STRATEGIES = ("flattening", "koszul", "strassen", "slicing", "full")
+SLICE_MINOR_SIZE = 3
+
+
+def sound_strategies(shape, rank):
+    strategies = []
+    for strategy in STRATEGIES:
+        # slice minors of size 3 only vanish on the secant variety while rank < 3
+        if strategy == "slicing" and rank >= SLICE_MINOR_SIZE:
+            continue
+        # the commutator equations hold up to rank 3, and only exist for 3x3x3
+        if strategy == "strassen" and (shape != [3, 3, 3] or rank > 3):
+            continue
+        # Koszul minors always vanish, but without an informative flattening the script is just "full"
+        if strategy == "koszul" and choose_configuration(shape, rank) is None:
+            continue
+        strategies.append(strategy)
+    return strategies
+
+
+class PortfolioHistory:
+
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, job, winner, outcomes):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        entry = {
+            "shape": _parse_shape(job["shape"]),
+            "rank": job["rank"],
+            "constraints": job["constraints"],
+            "winner": winner,
+            "outcomes": outcomes,
+            "timestamp": time.time(),
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def entries(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def rank_strategies(self, shape, rank, strategies):
+        scores = dict.fromkeys(strategies, 0)
+        for entry in self.entries():
+            winner = entry.get("winner")
+            if winner not in scores or entry["rank"] != rank:
+                continue
+            if entry["shape"] == shape:
+                scores[winner] += 10
+            elif len(entry["shape"]) == len(shape):
+                scores[winner] += 1
+        return sorted(strategies, key=lambda s: (-scores[s], strategies.index(s)))
+
+
+def _cached(job, strategies, cache):
+    for strategy in strategies:
+        entry = cache.get(dict(job, type=strategy))
+        if entry is not None:
+            return strategy, entry
+    return None, None
+
+
+def race(job, strategies=None, width=None, budgets=None, log_dir="results", timeout=None, mem_limit_mb=None,
+         cache=None, history=None):
+    shape = _parse_shape(job["shape"])
+    history = history or PortfolioHistory(os.path.join(log_dir, "portfolio.jsonl"))
+    strategies = history.rank_strategies(shape, job["rank"], strategies or sound_strategies(shape, job["rank"]))
+    if width:
+        strategies = strategies[:width]
+    budgets = budgets or {}
+    scratch = job.get("scratch", False)
+
+    if cache:
+        strategy, entry = _cached(job, strategies, cache)
+        if entry is not None:
+            parsed = entry.get("record") or parse_output(entry["output"])
+            return dict(job, type=strategy, strategy="auto", status="ok", cached=True, returncode=0, timed_out=False,
+                        output=entry["output"], parsed=parsed, **entry["timings"])
+
+    start_time = time.time()
+    cancel = threading.Event()
+    outcomes = {}
+    winner = None
+    with tempfile.TemporaryDirectory(prefix="dagideal-race-") as tmp_dir:
+        with ThreadPoolExecutor(max_workers=len(strategies)) as pool:
+            futures = {}
+            for strategy in strategies:
+                sub_job = dict(job, type=strategy, name=f"{job['name']}_{strategy}", out=f"{strategy}.m2")
+                futures[pool.submit(run_m2, sub_job, os.path.join(tmp_dir, f"{strategy}.m2"),
+                                    os.path.join(tmp_dir, f"{strategy}.log"),
+                                    timeout=budgets.get(strategy, timeout), mem_limit_mb=mem_limit_mb,
+                                    cache=cache, cancel=cancel)] = strategy
+            for future in as_completed(futures):
+                strategy = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    outcomes[strategy] = {"status": "error", "error": str(e)}
+                    continue
+                outcomes[strategy] = {"status": result["status"], "elapsed": result["elapsed"]}
+                if winner is None and result["status"] == "ok" and "betti" in result["parsed"]:
+                    winner = result
+                    cancel.set()
+        cancel.set()
+
+        if winner is not None and not scratch:
+            shutil.copyfile(os.path.join(tmp_dir, f"{winner['type']}.m2"), os.path.join(SRC_DIR, "M2", job["out"]))
+
+    history.record(job, winner["type"] if winner else None, outcomes)
+    if winner is None:
+        statuses = {outcome["status"] for outcome in outcomes.values()}
+        status = "timeout" if statuses == {"timeout"} else "failed"
+        return dict(job, strategy="auto", status=status, cached=False, returncode=None,
+                    timed_out=status == "timeout", elapsed=time.time() - start_time, race=outcomes)
+
+    result = dict(winner, name=job["name"], out=job["out"], strategy="auto", race=outcomes)
+    if not scratch:
+        os.makedirs(log_dir, exist_ok=True)
+        result["log"] = os.path.join(log_dir, f"{job['name']}.log")
+        write_atomic(result["log"], winner["output"])
+    return result
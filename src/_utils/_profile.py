@@ -0,0 +1,46 @@
+'''
+Per-stage timing instrumentation for the emitted M2 scripts.
+
+With profiling on, every stage (ring, CP ideal, matrices, minors, elimination, ...) is evaluated as a block under `elapsedTiming` and followed by machine-readable lines:
+
+    PROFILE stage=<name> wall=<seconds> cpu=<seconds>
+    PROFILE size=<name> value=<integer>
+
+so a run reports where its time went and how large the intermediate ideals were. With profiling off the helpers emit nothing and scripts are unchanged.
+'''
+
+import re
+
+
+PROFILE_TAG = "PROFILE"
+STAGE_LINE = re.compile(rf"^{PROFILE_TAG} stage=(\S+) wall=(\S+) cpu=(\S+)\s*$", re.MULTILINE)
+SIZE_LINE = re.compile(rf"^{PROFILE_TAG} size=(\S+) value=(-?\d+)\s*$", re.MULTILINE)
+
+
+def stage_begin(enabled):
+    if not enabled:
+        return
+    yield "profileCpu = cpuTime()\n"
+    # the block is evaluated from a string so multi-statement stages time as one
+    yield "profileTiming = elapsedTiming value ///\n"
+
+
+def stage_end(enabled, stage, sizes=()):
+    if not enabled:
+        return
+    yield "///\n"
+    yield (f'print("{PROFILE_TAG} stage={stage} wall=" | toString(profileTiming#0)'
+           f' | " cpu=" | toString(cpuTime() - profileCpu))\n')
+    for name, expr in sizes:
+        yield f'print("{PROFILE_TAG} size={name} value=" | toString({expr}))\n'
+    yield "\n"
+
+
+def parse_profile(output):
+    stages = {}
+    for stage, wall, cpu in STAGE_LINE.findall(output):
+        stages[stage] = {"wall": float(wall), "cpu": float(cpu)}
+    sizes = {name: int(value) for name, value in SIZE_LINE.findall(output)}
+    if not stages and not sizes:
+        return None
+    return {"stages": stages, "sizes": sizes}
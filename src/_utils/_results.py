@@ -0,0 +1,85 @@
+'''
+Append-only JSONL store of structured run records.
+
+Each record carries the problem (generator, shape, rank, constraints, field, options), how the run went (status, exit code, elapsed and CPU time, peak RSS, cache hit) and what it found (Betti table and generator counts by degree, or the Terracini dimension report).
+'''
+
+import json
+import os
+import time
+
+from _utils._journal import append_line
+from _utils._parse import parse_output
+
+
+DEFAULT_RESULTS_PATH = os.path.join("results", "results.jsonl")
+
+PROBLEM_KEYS = ("name", "type", "strategy", "shape", "rank", "constraints", "field", "engine", "seed", "options")
+RUN_KEYS = ("status", "returncode", "timed_out", "cached", "elapsed", "cpu_seconds", "peak_rss_kb", "error", "race")
+
+
+def make_record(result):
+    record = {key: result[key] for key in PROBLEM_KEYS + RUN_KEYS if key in result}
+    record["engine"] = result.get("engine", "m2")
+    record["options"] = result.get("options", {})
+    record["timestamp"] = time.time()
+
+    if "parsed" in result:
+        record.update(result["parsed"])
+    elif "result" in result:
+        record.update(result["result"])
+    elif "output" in result:
+        record.update(parse_output(result["output"]))
+    return record
+
+
+def summarize(record):
+    if "by_rank" in record:
+        dims = ", ".join(str(entry["actual_dimension"]) for entry in record["by_rank"])
+        filling = record.get("filling_rank")
+        return f"dims by rank [{dims}]" + (f", fills the ambient space at rank {filling}" if filling else "")
+    if "actual_dimension" in record:
+        return f"dim {record['actual_dimension']} (expected {record.get('expected_dimension', '?')})"
+    if "betti" in record:
+        degrees = record["betti"]["generators_by_degree"]
+        parts = ", ".join(f"{count} of degree {degree}" for degree, count in sorted(degrees.items(), key=lambda kv: int(kv[0])))
+        return f"{record['betti']['num_generators']} generators" + (f" ({parts})" if parts else "")
+    return ""
+
+
+def _matches(record, filters):
+    return all(record.get(key) == value for key, value in filters.items())
+
+
+class ResultsStore:
+
+    def __init__(self, path=DEFAULT_RESULTS_PATH):
+        self.path = path
+
+    def append(self, result):
+        record = make_record(result)
+        append_line(self.path, record)
+        return record
+
+    def records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # a run killed mid-write leaves at most one truncated line
+                    continue
+
+    def query(self, **filters):
+        return (record for record in self.records() if _matches(record, filters))
+
+    def latest(self, **filters):
+        latest = {}
+        for record in self.query(**filters):
+            latest[record.get("name")] = record
+        return list(latest.values())
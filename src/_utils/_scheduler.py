@@ -0,0 +1,244 @@
+'''
+Runs generation + M2 jobs across a pool of worker processes.
+
+Each M2 child gets a wall-clock timeout and an RLIMIT_AS memory cap. Peak RSS is read from the rusage of that specific child (os.wait4), so it is exact per job even when a worker runs many jobs.
+Jobs of type "auto" race several generators on the same problem (see _portfolio).
+Scripts are generated in-process. With persistent=True each worker process feeds its jobs to one long-lived M2 interpreter (see _m2worker) instead of starting `M2 --script` per job.
+When a ResultCache is given, solved problems are served from the result cache without running M2. Jobs with engine "native" are computed in-process by the worker, so they record CPU time but no peak RSS (the worker's high-water mark covers every job it ran), and are not subject to timeouts or memory caps.
+Scripts and logs are written to a temporary file and renamed into place, so a log that exists is complete. With a JobJournal, run_jobs records how each job ends, and the worker that picks a job up records when it starts (see _journal).
+'''
+
+import os
+import resource
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from _utils._journal import start_in_worker, write_atomic
+from _utils._m2worker import limit_memory, shared_worker
+from _utils._parse import parse_output
+from generate import load_generator, parse_constraints
+
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_job(name, gen_type, shape, rank, constraints, field="ZZ/32003", out=None):
+    return {
+        "name": name,
+        "type": gen_type,
+        "shape": shape,
+        "rank": rank,
+        "constraints": constraints,
+        "field": field,
+        "out": out or f"{name}.m2",
+    }
+
+
+def run_child(cmd, log_file, timeout=None, mem_limit_mb=None, cancel=None):
+    preexec = limit_memory(mem_limit_mb) if mem_limit_mb else None
+    start_time = time.time()
+    process = subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT,
+                               preexec_fn=preexec, start_new_session=True)
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+
+    # a cancelled child (e.g. the loser of a portfolio race) is killed without counting as a timeout
+    exited = threading.Event()
+    cancelled = threading.Event()
+
+    def watch():
+        while not exited.is_set():
+            if cancel.wait(0.1) and not exited.is_set():
+                cancelled.set()
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True) if cancel is not None else None
+    if watcher:
+        watcher.start()
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    finally:
+        exited.set()
+        if timer:
+            timer.cancel()
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    return {
+        "returncode": process.returncode,
+        "timed_out": timed_out.is_set(),
+        "cancelled": cancelled.is_set(),
+        "elapsed": time.time() - start_time,
+        "peak_rss_kb": usage.ru_maxrss,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+    }
+
+
+def job_status(child):
+    if child["timed_out"]:
+        return "timeout"
+    if child.get("cancelled"):
+        return "cancelled"
+    return "ok" if child["returncode"] == 0 else "failed"
+
+
+TIMING_KEYS = ("elapsed", "peak_rss_kb", "cpu_seconds")
+
+
+def _parse_shape(shape):
+    return list(map(int, shape.split(','))) if isinstance(shape, str) else list(shape)
+
+
+GENERATOR_OPTIONS = ("prune", "compact", "profile", "points", "bipartitions", "koszul_degree", "slices", "slice_count",
+                     "slice_seed", "stream_minors", "elimination", "jacobian", "jacobian_seed")
+
+
+def build_generator(job):
+    options = job.get("options", {})
+    kwargs = {key: options[key] for key in GENERATOR_OPTIONS if key in options}
+    return load_generator(job["type"])(shape=_parse_shape(job["shape"]), rank=job["rank"],
+                                       constraints=parse_constraints(job["constraints"]), field=job["field"], **kwargs)
+
+
+def run_native(job):
+    gen = build_generator(job)
+
+    start_time = time.time()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    if job.get("options", {}).get("incremental"):
+        result = gen.compute_native_by_rank(seed=job.get("seed"))
+    else:
+        result = gen.compute_native(seed=job.get("seed"))
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    # ru_maxrss of a pool worker is its high-water mark over every job it ran, not this job's usage
+    return dict(job, status="ok", cached=False, returncode=0, timed_out=False,
+                elapsed=time.time() - start_time,
+                peak_rss_kb=None,
+                cpu_seconds=(usage.ru_utime + usage.ru_stime) - (usage_before.ru_utime + usage_before.ru_stime),
+                result=result)
+
+
+def run_m2(job, m2_filepath, log_filepath, timeout=None, mem_limit_mb=None, cache=None, persistent=False, cancel=None):
+    partial_script = m2_filepath + ".partial"
+    with open(partial_script, "w") as script_file:
+        build_generator(job).export(script_file)
+    os.replace(partial_script, m2_filepath)
+
+    # M2 streams into the partial log; the log only appears under its real name once the run is over
+    partial_log = log_filepath + ".partial"
+    if persistent:
+        child = shared_worker(mem_limit_mb).run(m2_filepath, partial_log, timeout=timeout)
+    else:
+        with open(partial_log, "w") as log_file:
+            child = run_child(["M2", "--script", m2_filepath], log_file, timeout=timeout, mem_limit_mb=mem_limit_mb,
+                              cancel=cancel)
+    os.replace(partial_log, log_filepath)
+
+    status = job_status(child)
+    with open(log_filepath) as f:
+        output = f.read()
+    parsed = parse_output(output)
+    if cache and status == "ok":
+        with open(m2_filepath) as f:
+            script = f.read()
+        cache.put(job, script, output, {k: child[k] for k in TIMING_KEYS}, record=parsed)
+
+    return dict(job, status=status, cached=False, output=output, parsed=parsed, **child)
+
+
+def run_job(job, log_dir="results", timeout=None, mem_limit_mb=None, cache=None, persistent=False):
+    # native jobs finish in milliseconds in-process; timeouts and caching only apply to M2 children
+    if job.get("engine") == "native":
+        return run_native(job)
+    if job["type"] == "auto":
+        from _utils._portfolio import race
+        return race(job, log_dir=log_dir, timeout=timeout, mem_limit_mb=mem_limit_mb, cache=cache)
+
+    scratch = job.get("scratch", False)
+    if cache:
+        entry = cache.get(job)
+        if entry is not None:
+            parsed = entry.get("record") or parse_output(entry["output"])
+            result = dict(job, status="ok", cached=True, returncode=0, timed_out=False,
+                          output=entry["output"], parsed=parsed, **entry["timings"])
+            if not scratch:
+                os.makedirs(log_dir, exist_ok=True)
+                result["log"] = os.path.join(log_dir, f"{job['name']}.log")
+                write_atomic(result["log"], entry["output"])
+            return result
+
+    # scratch jobs (sweeps) keep only the returned output, not per-job scripts and logs
+    if scratch:
+        with tempfile.TemporaryDirectory(prefix="dagideal-") as tmp_dir:
+            return run_m2(job, os.path.join(tmp_dir, job["out"]), os.path.join(tmp_dir, "output.log"),
+                          timeout=timeout, mem_limit_mb=mem_limit_mb, cache=cache, persistent=persistent)
+
+    os.makedirs(log_dir, exist_ok=True)
+    log_filepath = os.path.join(log_dir, f"{job['name']}.log")
+    result = run_m2(job, os.path.join(SRC_DIR, "M2", job["out"]), log_filepath,
+                    timeout=timeout, mem_limit_mb=mem_limit_mb, cache=cache, persistent=persistent)
+    return dict(result, log=log_filepath)
+
+
+def _run_journaled(job, journal_path, attempt, log_dir, timeout, mem_limit_mb, cache, persistent):
+    if journal_path:
+        start_in_worker(journal_path, job, attempt)
+    return run_job(job, log_dir, timeout, mem_limit_mb, cache, persistent)
+
+
+def run_jobs(jobs, workers=None, log_dir="results", timeout=None, mem_limit_mb=None, cache=None, persistent=False,
+             model=None, journal=None):
+    workers = workers or os.cpu_count()
+    jobs = iter(jobs)
+    # keep a bounded number of jobs in flight so that lazily generated queues are never materialized
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        while True:
+            while len(pending) < max_pending:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                # a fitted RuntimeModel turns away jobs that would certainly blow the timeout or memory cap
+                reason = model.refusal(job, timeout, mem_limit_mb) if model else None
+                if reason:
+                    result = dict(job, status="refused", error=reason)
+                    if journal:
+                        journal.finish(job, result)
+                    yield result
+                    continue
+                # the job is only journaled as running once a worker picks it up
+                attempt = journal.claim(job) if journal else None
+                pending[pool.submit(_run_journaled, job, journal.path if journal else None, attempt, log_dir, timeout,
+                                    mem_limit_mb, cache, persistent)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = dict(job, status="error", error=str(e))
+                if journal:
+                    journal.finish(job, result)
+                yield result
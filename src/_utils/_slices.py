@@ -0,0 +1,79 @@
+'''
+Selection of 2D slices for the slicing generator.
+
+A slice (a, b, base) fixes every mode except a and b to the entries of base. Its k x k minors vanish on the secant variety for k > rank, and any subset of them is a valid seed for the elimination. Slices too small for a k x k minor, or whose pruned zero pattern admits no k x k minor with a nonzero term, contribute only zeros and are always dropped. Nothing else needs deduplicating before emission: every monomial of a k x k minor (k >= 2) takes k entries from k distinct rows and columns of its slice, while two different slices share at most one line of entries, so two different minors, of one slice or of two, have no monomial in common and never agree, even up to a scalar. The only repeats left are minors of kept slices that vanish identically because of pruned zero entries, and stream_minors skips those when collecting.
+
+    all       every slice
+    covering  all slices along ceil(N/2) mode pairs that together cover every mode
+    minimal   all slices along the single mode pair with the squarest slices; these partition the tensor
+    random    count slices sampled uniformly (default: as many as minimal selects)
+'''
+
+import itertools
+import random
+
+
+SELECTIONS = ("all", "covering", "minimal", "random")
+
+
+def _term_rank(pattern):
+    # maximum matching between rows and columns of the nonzero pattern (Kuhn's augmenting paths)
+    match = {}
+
+    def augment(row, visited):
+        for col in pattern[row]:
+            if col in visited:
+                continue
+            visited.add(col)
+            if col not in match or augment(match[col], visited):
+                match[col] = row
+                return True
+        return False
+
+    return sum(1 for row in range(len(pattern)) if augment(row, set()))
+
+
+def has_nonzero_minor(shape, a, b, base, size, support=None):
+    if min(shape[a], shape[b]) < size:
+        return False
+    if support is None:
+        return True
+    nonzero = ~support.zero_mask[tuple(slice(None) if m in (a, b) else base[m] for m in range(len(shape)))]
+    pattern = [row.nonzero()[0].tolist() for row in nonzero]
+    return _term_rank(pattern) >= size
+
+
+def _pair_slices(shape, a, b):
+    fixed_modes = [m for m in range(len(shape)) if m not in (a, b)]
+    for fixed_indices in itertools.product(*(range(shape[m]) for m in fixed_modes)):
+        base = [0] * len(shape)
+        for m, value in zip(fixed_modes, fixed_indices):
+            base[m] = value
+        yield a, b, tuple(base)
+
+
+def _covering_pairs(n_modes):
+    pairs = [(m, m + 1) for m in range(0, n_modes - 1, 2)]
+    if n_modes % 2 and n_modes > 1:
+        pairs.append((0, n_modes - 1))
+    return pairs
+
+
+def select_slices(shape, size, selection="all", support=None, count=None, seed=None):
+    pairs = list(itertools.combinations(range(len(shape)), 2))
+    if selection == "covering":
+        pairs = _covering_pairs(len(shape))
+    elif selection in ("minimal", "random"):
+        usable = [pair for pair in pairs if min(shape[pair[0]], shape[pair[1]]) >= size]
+        minimal = [max(usable, key=lambda pair: (min(shape[pair[0]], shape[pair[1]]), -pairs.index(pair)))] if usable else []
+        if selection == "minimal":
+            pairs = minimal
+    elif selection != "all":
+        raise ValueError(f"Unknown slice selection: {selection}")
+
+    slices = [s for a, b in pairs for s in _pair_slices(shape, a, b) if has_nonzero_minor(shape, *s, size, support)]
+    if selection == "random":
+        if count is None:
+            count = sum(1 for a, b in minimal for s in _pair_slices(shape, a, b))
+        slices = sorted(random.Random(seed).sample(slices, min(count, len(slices))))
+    return slices
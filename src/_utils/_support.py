@@ -0,0 +1,113 @@
+'''
+Structural support of the constrained CP parameterization.
+
+Finds the tensor coordinates whose CP expression is identically zero (every rank-one term contains a zeroed factor) and the free factor variables that never appear in any nonzero term. Generators drop both from the ring and substitute zeros for them in their matrices.
+
+The support is held as NumPy arrays: free[m] marks the unconstrained factors of mode m (dim x rank), and live marks, for every tensor entry and component, whether that rank-one term survives the constraints. Every generator emits its ring variables, CP sums and tensor matrices from these arrays (factor_vars, tensor_vars, tensor_matrix, cp_expressions) instead of formatting and scanning factor names per entry. Passing prune=False to those keeps the zero entries and unused factors in the ring, as generators do without pruning.
+'''
+
+import numpy as np
+
+
+class CPSupport:
+
+    def __init__(self, shape, rank, constraints):
+        self.shape = shape
+        self.rank = rank
+        self.constraints = set(constraints)
+
+        self.free = [np.ones((dim, rank), dtype=bool) for dim in shape]
+        for mode, row, col in self.constraints:
+            if 0 <= mode < len(shape) and 0 <= row < shape[mode] and 0 <= col < rank:
+                self.free[mode][row, col] = False
+
+        # live[indices + (col,)]: component col has no zeroed factor at this tensor entry
+        self.live = np.ones(tuple(shape) + (rank,), dtype=bool)
+        for mode, mask in enumerate(self.free):
+            self.live &= mask.reshape(tuple(dim if m == mode else 1 for m, dim in enumerate(shape)) + (rank,))
+        self.zero_mask = ~self.live.any(axis=-1)
+
+        # alive[m, j]: component j has at least one free row in mode m
+        alive = np.array([mask.any(axis=0) for mask in self.free])
+        self.unused_mask = [mask & ~np.delete(alive, mode, axis=0).all(axis=0) for mode, mask in enumerate(self.free)]
+
+        self.unused_factors = [(mode, row, col) for mode, mask in enumerate(self.unused_mask)
+                               for row, col in np.argwhere(mask).tolist()]
+        self.zero_entries = [tuple(indices) for indices in np.argwhere(self.zero_mask).tolist()]
+        self._factor_names = None
+        self._tensor_names = {}
+
+    def is_live(self, indices, col):
+        return bool(self.live[tuple(indices) + (col,)])
+
+    def is_zero_entry(self, indices):
+        return bool(self.zero_mask[tuple(indices)])
+
+    def is_unused_factor(self, mode, row, col):
+        return bool(self.unused_mask[mode][row, col])
+
+    def factor_names(self):
+        if self._factor_names is None:
+            self._factor_names = [np.array([[f"v_({mode},{row},{col})" for col in range(self.rank)] for row in range(dim)],
+                                           dtype=object).reshape(dim, self.rank) for mode, dim in enumerate(self.shape)]
+        return self._factor_names
+
+    def factor_vars(self, prune=True):
+        names = self.factor_names()
+        return [name for mode, free in enumerate(self.free)
+                for name in names[mode][free & ~self.unused_mask[mode] if prune else free].tolist()]
+
+    def tensor_names(self, prune=True):
+        # names of every tensor entry, with 0_R for the pruned zero entries
+        if prune not in self._tensor_names:
+            names = np.array([f"t_({','.join(map(str, indices))})" for indices in np.ndindex(*self.shape)],
+                             dtype=object).reshape(self.shape)
+            if prune:
+                names[self.zero_mask] = "0_R"
+            self._tensor_names[prune] = names
+        return self._tensor_names[prune]
+
+    def tensor_vars(self, prune=True):
+        names = self.tensor_names(prune)
+        return names[~self.zero_mask].tolist() if prune else names.ravel().tolist()
+
+    def tensor_matrix(self, row_modes, col_modes, prune=True, fixed=None):
+        # rows of tensor names indexed by row_modes x col_modes, with every other mode m fixed at fixed[m]
+        other_modes = [m for m in range(len(self.shape)) if m not in row_modes and m not in col_modes]
+        names = self.tensor_names(prune).transpose(list(row_modes) + list(col_modes) + other_modes)
+        names = names[(Ellipsis,) + tuple(fixed[m] for m in other_modes)]
+        return names.reshape(-1, int(np.prod([self.shape[m] for m in col_modes]))).tolist()
+
+    def cp_expressions(self, prune=True):
+        # (tensor variable, CP sum) for every entry in the ring, in row-major order, one leading-mode block at a time
+        names = self.factor_names()
+        tensor = self.tensor_names(prune)
+        for first in range(self.shape[0]):
+            live = self.live[first].reshape(-1, self.rank)
+            entry, col = np.nonzero(live)
+            coords = np.unravel_index(entry, self.shape[1:])
+            terms = names[0][first, col]
+            for mode in range(1, len(self.shape)):
+                terms = terms + "*" + names[mode][coords[mode - 1], col]
+            terms = terms.tolist()
+            bounds = np.concatenate(([0], np.cumsum(live.sum(axis=1)))).tolist()
+            zero = self.zero_mask[first].ravel().tolist()
+            for e, t_var in enumerate(tensor[first].ravel().tolist()):
+                if prune and zero[e]:
+                    continue
+                yield t_var, " + ".join(terms[bounds[e]:bounds[e + 1]]) or "0"
+
+    def emit_report(self):
+        if not self.zero_entries and not self.unused_factors:
+            return
+        yield "-- Structural zeros pruned from the ring\n"
+        if self.zero_entries:
+            names = ", ".join(f"t_({','.join(map(str, indices))})" for indices in self.zero_entries)
+            yield f"-- {len(self.zero_entries)} identically-zero tensor entries: {names}\n"
+        if self.unused_factors:
+            names = ", ".join(f"v_({mode},{row},{col})" for mode, row, col in self.unused_factors)
+            yield f"-- {len(self.unused_factors)} unused factor variables: {names}\n"
+        yield "\n"
+
+    def summary(self):
+        return f"Pruned {len(self.zero_entries)} zero tensor entries and {len(self.unused_factors)} unused factor variables."
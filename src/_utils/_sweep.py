@@ -0,0 +1,102 @@
+'''
+Exhaustive sweeps over constraint patterns.
+
+Patterns are enumerated lazily, one orbit representative at a time, by canonical augmentation: every representative with k+1 zeros is obtained by adding one zero to a representative with k zeros and is kept only if its canonical form is new. Only the representatives of two consecutive levels are held in memory.
+Jobs are scheduled cheapest-first within a bounded lookahead window, and structured records are appended to a JSONL file as they finish.
+Terracini sweeps can check every pattern at several random points. With a seed, each job draws its points from its own seed, spawned from the sweep's seed in job order, so a rerun of the same sweep sees the same points.
+'''
+
+import heapq
+import itertools
+import math
+
+import numpy as np
+
+from _utils._journal import append_line
+from _utils._results import make_record
+from _utils._scheduler import make_job, run_jobs
+from _utils._symmetry import ALL_SYMMETRIES, canonical_form
+from generate import parse_constraints
+
+
+def enumerate_patterns(shape, rank, max_zeros, symmetries=ALL_SYMMETRIES):
+    entries = [(m, r, c) for m, dim in enumerate(shape) for r in range(dim) for c in range(rank)]
+    level = [()]
+    yield []
+    for _ in range(min(max_zeros, len(entries))):
+        seen = set()
+        next_level = []
+        for rep in level:
+            zeroed = set(rep)
+            for entry in entries:
+                if entry in zeroed:
+                    continue
+                canonical, _ = canonical_form(shape, rank, zeroed | {entry}, symmetries)
+                key = tuple(canonical)
+                if key in seen:
+                    continue
+                seen.add(key)
+                next_level.append(key)
+                yield canonical
+        level = next_level
+
+
+def constraints_string(constraints):
+    return ";".join(",".join(map(str, c)) for c in constraints)
+
+
+def job_cost(job):
+    shape = list(map(int, job["shape"].split(',')))
+    free_factors = sum(shape) * job["rank"] - len(parse_constraints(job["constraints"]))
+    n_entries = math.prod(shape)
+    if job["type"] == "terracini":
+        return n_entries * free_factors
+    # elimination-based generators: ring size drives the Groebner basis cost
+    return free_factors + n_entries
+
+
+def sweep_jobs(gen_type, shape, ranks, max_zeros, field="ZZ/32003", engine="m2", symmetries=ALL_SYMMETRIES, points=1,
+               seed=None):
+    shape_str = ",".join(map(str, shape))
+    shape_tag = "x".join(map(str, shape))
+    counter = itertools.count()
+    seeds = np.random.SeedSequence(seed) if seed is not None else None
+    for rank in ranks:
+        for constraints in enumerate_patterns(shape, rank, max_zeros, symmetries):
+            name = f"sweep_{gen_type}_{shape_tag}_r{rank}_{next(counter):06d}"
+            job = make_job(name, gen_type, shape_str, rank, constraints_string(constraints), field=field)
+            job["engine"] = engine
+            job["scratch"] = True
+            if gen_type == "terracini":
+                options = {"points": points} if points > 1 else {}
+                if seeds is not None:
+                    job_seed = int(seeds.spawn(1)[0].generate_state(1)[0])
+                    if engine == "native":
+                        job["seed"] = job_seed
+                    else:
+                        options["jacobian_seed"] = job_seed
+                if options:
+                    job["options"] = options
+            yield job
+
+
+def cost_ordered(jobs, cost=job_cost, window=10000):
+    heap = []
+    counter = itertools.count()
+    for job in jobs:
+        heapq.heappush(heap, (cost(job), next(counter), job))
+        if len(heap) >= window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def record_results(results, out_path):
+    for result in results:
+        append_line(out_path, make_record(result))
+        yield result
+
+
+def run_sweep(jobs, out_path, **scheduler_options):
+    return record_results(run_jobs(jobs, **scheduler_options), out_path)
+
@@ -0,0 +1,159 @@
+'''
+Canonical forms of constraint patterns up to symmetry.
+
+A constraint set zeroes factor entries (mode, row, col). Permuting rank components (cols), permuting rows within a mode, and permuting modes of equal dimension all give isomorphic problems. canonical_form maps a pattern to a fixed orbit representative together with the permutation that maps it back.
+
+Column classes are first split by colour refinement, so only permutations within classes of indistinguishable components are searched; rows and modes are then canonicalized by sorting.
+'''
+
+import itertools
+
+
+ALL_SYMMETRIES = ("cols", "rows", "modes")
+
+
+def _zero_pattern(shape, rank, constraints):
+    zeros = [[[0] * rank for _ in range(dim)] for dim in shape]
+    for mode, row, col in constraints:
+        if mode < len(shape) and row < shape[mode] and col < rank:
+            zeros[mode][row][col] = 1
+    return zeros
+
+
+def _mode_groups(shape, permute_modes):
+    if not permute_modes:
+        return [[m] for m in range(len(shape))]
+    groups = {}
+    for m, dim in enumerate(shape):
+        groups.setdefault(dim, []).append(m)
+    return list(groups.values())
+
+
+def _relabel(signatures):
+    labels = {sig: i for i, sig in enumerate(sorted(set(signatures)))}
+    return [labels[sig] for sig in signatures]
+
+
+def _column_classes(zeros, shape, rank, group_of, permute_rows):
+    col_color = [0] * rank
+    n_classes = 1
+    for _ in range(rank + 1):
+        row_keys = []
+        for m, dim in enumerate(shape):
+            for r in range(dim):
+                cols = tuple(sorted(col_color[c] for c in range(rank) if zeros[m][r][c]))
+                row_keys.append((group_of[m], -1 if permute_rows else r, cols))
+        row_labels = iter(_relabel(row_keys))
+        row_color = [[next(row_labels) for _ in range(dim)] for dim in shape]
+
+        col_keys = []
+        for c in range(rank):
+            rows = tuple(sorted((group_of[m], row_color[m][r])
+                                for m, dim in enumerate(shape) for r in range(dim) if zeros[m][r][c]))
+            col_keys.append((col_color[c], rows))
+        col_color = _relabel(col_keys)
+
+        if len(set(col_color)) == n_classes:
+            break
+        n_classes = len(set(col_color))
+
+    classes = {}
+    for c in range(rank):
+        classes.setdefault(col_color[c], []).append(c)
+    return [classes[color] for color in sorted(classes)]
+
+
+def _distinct_orders(cls, twin_key):
+    # columns with identical zero sets are interchangeable, so only distinct arrangements of their keys matter
+    twins = {}
+    for c in cls:
+        twins.setdefault(twin_key[c], []).append(c)
+    keys = sorted(twins)
+    counts = [len(twins[key]) for key in keys]
+
+    def arrange(prefix):
+        if len(prefix) == len(cls):
+            used = {key: iter(twins[key]) for key in keys}
+            yield [next(used[key]) for key in prefix]
+            return
+        for i, key in enumerate(keys):
+            if counts[i]:
+                counts[i] -= 1
+                yield from arrange(prefix + [key])
+                counts[i] += 1
+
+    yield from arrange([])
+
+
+def _column_orders(classes, permute_cols, rank, twin_key):
+    if not permute_cols:
+        yield list(range(rank))
+        return
+    for parts in itertools.product(*(list(_distinct_orders(cls, twin_key)) for cls in classes)):
+        yield [c for part in parts for c in part]
+
+
+def _normalize(zeros, shape, groups, cols, permute_rows):
+    blocks = {}
+    row_maps = {}
+    for m in range(len(shape)):
+        vectors = [(tuple(zeros[m][r][c] for c in cols), r) for r in range(shape[m])]
+        if permute_rows:
+            vectors.sort()
+        blocks[m] = tuple(v for v, _ in vectors)
+        row_maps[m] = [r for _, r in vectors]
+
+    mode_map = [0] * len(shape)
+    form = []
+    for group in groups:
+        ordered = sorted(group, key=lambda m: blocks[m])
+        for position, m in zip(group, ordered):
+            mode_map[position] = m
+        form.append(tuple(blocks[m] for m in ordered))
+    return tuple(form), mode_map, row_maps
+
+
+def canonical_form(shape, rank, constraints, symmetries=ALL_SYMMETRIES):
+    '''
+    Returns (canonical_constraints, perm). perm maps canonical indices back to the originals:
+    (mode, row, col) in the canonical pattern corresponds to
+    (perm["modes"][mode], perm["rows"][mode][row], perm["cols"][col]) in the input.
+    '''
+    shape = list(shape)
+    zeros = _zero_pattern(shape, rank, constraints)
+    permute_rows = "rows" in symmetries
+    groups = _mode_groups(shape, "modes" in symmetries)
+    group_of = {m: i for i, group in enumerate(groups) for m in group}
+    classes = _column_classes(zeros, shape, rank, group_of, permute_rows)
+
+    twin_key = [tuple(zeros[m][r][c] for m in range(len(shape)) for r in range(shape[m])) for c in range(rank)]
+
+    best = None
+    for cols in _column_orders(classes, "cols" in symmetries, rank, twin_key):
+        form, mode_map, row_maps = _normalize(zeros, shape, groups, cols, permute_rows)
+        if best is None or form < best[0]:
+            best = (form, cols, mode_map, row_maps)
+
+    _, cols, mode_map, row_maps = best
+    perm = {
+        "modes": mode_map,
+        "rows": [row_maps[mode_map[m]] for m in range(len(shape))],
+        "cols": cols,
+    }
+    canonical = sorted(
+        (m, r, c)
+        for m in range(len(shape))
+        for r in range(shape[m])
+        for c in range(rank)
+        if zeros[perm["modes"][m]][perm["rows"][m][r]][perm["cols"][c]]
+    )
+    return canonical, perm
+
+
+def map_back(constraints, perm):
+    return sorted((perm["modes"][m], perm["rows"][m][r], perm["cols"][c]) for m, r, c in constraints)
+
+
+def orbit_key(shape, rank, constraints, symmetries=ALL_SYMMETRIES):
+    canonical, _ = canonical_form(shape, rank, constraints, symmetries)
+    return (tuple(shape), rank, tuple(canonical))
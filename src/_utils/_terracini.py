@@ -0,0 +1,100 @@
+'''
+Numerical evaluation of the constrained CP Jacobian over ZZ/p.
+
+Columns follow the factor variable order used by the generators (mode, row, col), with constrained variables dropped. Every function takes the CPSupport of the problem and reads the free factor entries from support.free.
+
+sparse_cp_jacobian() gives the same matrix as (row, col, value) triples in the orientation of M2's jacobian F, with one row per ring variable and one column per ring tensor entry. It only visits the live (entry, component) pairs of a CPSupport. d t_idx / d v_(m,r,j) is nonzero only for r = idx[m], where it is the product of the other factors of component j.
+'''
+
+import numpy as np
+
+from _utils._modp import IncrementalSpan, rank_mod_p
+
+
+def random_point(support, p, rng):
+    return [rng.integers(0, p, size=(dim, support.rank), dtype=np.int64) * free
+            for dim, free in zip(support.shape, support.free)]
+
+
+def mode_jacobian_block(shape, factors, mode, p):
+    N = len(shape)
+    rank = factors[0].shape[1]
+
+    # product of the other modes' factor columns, with a singleton axis at `mode`
+    others = np.ones([1] * N + [rank], dtype=np.int64)
+    for m in range(N):
+        if m == mode:
+            continue
+        view = [1] * N + [rank]
+        view[m] = shape[m]
+        others = others * factors[m].reshape(view) % p
+
+    # d t_(idx) / d v_(mode,r,j) = [idx[mode] == r] * others[idx, j]
+    eye_view = [1] * N + [shape[mode], 1]
+    eye_view[mode] = shape[mode]
+    delta = np.eye(shape[mode], dtype=np.int64).reshape(eye_view)
+    block = others[..., np.newaxis, :] * delta
+
+    n_entries = int(np.prod(shape))
+    return block.reshape(n_entries, shape[mode] * rank)
+
+
+def sparse_cp_jacobian(support, factors, p, prune=True):
+    shape, rank = support.shape, support.rank
+    entry, col = np.nonzero(support.live.reshape(-1, rank))
+    coords = np.unravel_index(entry, shape)
+    kept_entries = ~support.zero_mask.reshape(-1) if prune else np.ones(int(np.prod(shape)), dtype=bool)
+    entry_position = np.cumsum(kept_entries) - 1
+
+    rows, cols, values = [], [], []
+    offset = 0
+    for mode, free in enumerate(support.free):
+        kept = free & ~support.unused_mask[mode] if prune else free
+        position = (np.cumsum(kept.reshape(-1)) - 1 + offset).reshape(kept.shape)
+        value = np.ones(entry.size, dtype=np.int64)
+        for m in range(len(shape)):
+            if m != mode:
+                value = value * factors[m][coords[m], col] % p
+        rows.append(position[coords[mode], col])
+        cols.append(entry_position[entry])
+        values.append(value)
+        offset += int(kept.sum())
+
+    rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+    # a random factor can vanish mod p; keep the triples sorted by row, then column
+    nonzero = values != 0
+    order = np.lexsort((cols[nonzero], rows[nonzero]))
+    return rows[nonzero][order], cols[nonzero][order], values[nonzero][order], (offset, int(kept_entries.sum()))
+
+
+def cp_jacobian(support, factors, p):
+    blocks = []
+    for mode, free in enumerate(support.free):
+        block = mode_jacobian_block(support.shape, factors, mode, p)
+        blocks.append(block[:, free.reshape(-1)])
+    return np.concatenate(blocks, axis=1)
+
+
+def jacobian_rank(support, p, seed=None):
+    rng = np.random.default_rng(seed)
+    return rank_mod_p(cp_jacobian(support, random_point(support, p, rng), p), p)
+
+
+def jacobian_ranks(support, p, points=1, seed=None):
+    rng = np.random.default_rng(seed)
+    return [rank_mod_p(cp_jacobian(support, random_point(support, p, rng), p), p) for _ in range(points)]
+
+
+def incremental_jacobian_ranks(support, p, seed=None):
+    # going from rank r to r+1 only appends the columns of component r, so one span serves every rank
+    shape = support.shape
+    rng = np.random.default_rng(seed)
+    factors = random_point(support, p, rng)
+    span = IncrementalSpan(int(np.prod(shape)), p)
+    ranks = []
+    for col in range(support.rank):
+        component = [factor[:, [col]] for factor in factors]
+        block = np.concatenate([mode_jacobian_block(shape, component, mode, p)[:, free[:, col]]
+                                for mode, free in enumerate(support.free)], axis=1)
+        ranks.append(span.add(block.T))
+    return ranks
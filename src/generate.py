@@ -3,7 +3,39 @@ Generates M2 script to compute the defining ideal of a sample graph-constrained
 '''
 
 import argparse
+import importlib
 import os
+import sys
+
+
+GENERATOR_TYPES = ['flattening', 'full', 'koszul', 'slicing', 'strassen', 'terracini']
+
+
+def _generator_module(gen_type):
+    if gen_type not in GENERATOR_TYPES:
+        raise ValueError(f"Unknown generator type: {gen_type}")
+    return importlib.import_module(f"_generators.generator_{gen_type}")
+
+
+def load_generator(gen_type):
+    return _generator_module(gen_type).ConstrainedSecantGenerator
+
+
+def generator_version(gen_type):
+    return _generator_module(gen_type).GENERATOR_VERSION
+
+
+def generator_symmetries(gen_type):
+    return _generator_module(gen_type).SYMMETRIES
+
+
+def elimination_options(args):
+    options = {"order": "block"}
+    if args.degree_limit:
+        options["degree_limit"] = args.degree_limit
+    if args.linear_section:
+        options["linear_section"] = args.linear_section
+    return options
 
 
 def parse_constraints(c_str):
@@ -19,30 +51,83 @@ def parse_constraints(c_str):
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Compile M2 scripts for constrained secant varieties.")
-    parser.add_argument('--type', type=str, required=True, choices=['flattening', 'full', 'slicing', 'strassen', 'terracini'], help="Which algebraic shortcut to use.")
+    parser.add_argument('--type', type=str, required=True, choices=GENERATOR_TYPES, help="Which algebraic shortcut to use.")
     parser.add_argument('--field', type=str, default="ZZ/32003", help="Base field for computations (default: finite field of size 32003)")
     parser.add_argument('--shape', type=str, required=True, help="Tensor dimensions, e.g., '3,3,3'")
     parser.add_argument('--rank', type=int, required=True, help="CP Rank")
     parser.add_argument('--constraints', type=str, default="", help="Zeroed paths, e.g., '2,0,0;2,1,2'")
-    parser.add_argument('--out', type=str, required=True, help="Output filename (saved in src/M2/)")
+    parser.add_argument('--out', type=str, default=None, help="Output filename (saved in src/M2/), or '-' for stdout")
+    parser.add_argument('--engine', type=str, default='m2', choices=['m2', 'native'], help="Emit an M2 script, or compute in-process (terracini only)")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for the Terracini points, native or in M2 (default: fresh entropy)")
+    parser.add_argument('--points', type=int, default=1, help="Random points to evaluate the Terracini Jacobian at (terracini only)")
+    parser.add_argument('--jacobian', type=str, default='symbolic', choices=['symbolic', 'evaluated'], help="Differentiate in M2, or evaluate the Jacobian mod p in Python and only rank it in M2 (terracini only; --seed seeds the points)")
+    parser.add_argument('--incremental', action='store_true', help="Report the Terracini dimension for every rank up to --rank in one pass (native terracini only)")
+    parser.add_argument('--bipartitions', type=str, default=None, help="Flattenings to use: principal, balanced, cheapest, all, or row modes such as '0,1;0,2' (flattening only)")
+    parser.add_argument('--slices', type=str, default=None, choices=['all', 'covering', 'minimal', 'random'], help="Which 2D slices to take minors of (slicing only; --seed seeds random)")
+    parser.add_argument('--slice-count', type=int, default=None, help="Number of slices for --slices random")
+    parser.add_argument('--stream-minors', action='store_true', help="Add slice minors one slice at a time into a deduplicated set (slicing only)")
+    parser.add_argument('--block-order', action='store_true', help="Eliminate with an explicit Groebner basis in a block elimination order (not terracini)")
+    parser.add_argument('--degree-limit', type=int, default=None, help="Only compute generators up to this degree (implies --block-order)")
+    parser.add_argument('--linear-section', type=int, default=0, help="Cut by this many random hyperplanes before eliminating (implies --block-order)")
+    parser.add_argument('--no-prune', action='store_true', help="Keep identically-zero tensor entries and unused factor variables in the ring")
+    parser.add_argument('--compact', action='store_true', help="Emit loops over index ranges instead of unrolled literals")
+    parser.add_argument('--profile', action='store_true', help="Time each stage of the script and print PROFILE lines with stage timings and ideal sizes")
+    parser.add_argument('--canonical', action='store_true', help="Replace the constraints by their orbit representative under the generator's symmetries")
     
     args = parser.parse_args()
+    if args.engine == 'native' and args.type != 'terracini':
+        parser.error("--engine native is only available for --type terracini")
+    if args.points != 1 and args.type != 'terracini':
+        parser.error("--points is only available for --type terracini")
+    if args.jacobian != 'symbolic' and args.type != 'terracini':
+        parser.error("--jacobian is only available for --type terracini")
+    if args.bipartitions and args.type != 'flattening':
+        parser.error("--bipartitions is only available for --type flattening")
+    if (args.slices or args.slice_count or args.stream_minors) and args.type != 'slicing':
+        parser.error("--slices, --slice-count and --stream-minors are only available for --type slicing")
+    if args.slice_count and args.slices != 'random':
+        parser.error("--slice-count is only used with --slices random")
+    if (args.block_order or args.degree_limit or args.linear_section) and args.type == 'terracini':
+        parser.error("--block-order, --degree-limit and --linear-section are not available for --type terracini")
+    if args.incremental and args.engine != 'native':
+        parser.error("--incremental is only available with --engine native")
+    if args.engine == 'm2' and not args.out:
+        parser.error("--out is required when emitting an M2 script")
     
     shape = list(map(int, args.shape.split(',')))
     constraints = parse_constraints(args.constraints)
     
-    if args.type == 'flattening':
-        from _generators.generator_flattening import ConstrainedSecantGenerator
-    elif args.type == 'full':
-        from _generators.generator_full import ConstrainedSecantGenerator
-    elif args.type == 'slicing':
-        from _generators.generator_slicing import ConstrainedSecantGenerator
-    elif args.type == 'strassen':
-        from _generators.generator_strassen import ConstrainedSecantGenerator
-    elif args.type == 'terracini':
-        from _generators.generator_terracini import ConstrainedSecantGenerator
-        
-    gen = ConstrainedSecantGenerator(shape=shape, rank=args.rank, constraints=constraints, field=args.field)
+    if args.canonical:
+        from _utils._symmetry import canonical_form
+        constraints, perm = canonical_form(shape, args.rank, constraints, generator_symmetries(args.type))
+        print(f"Canonical constraints: {';'.join(','.join(map(str, c)) for c in constraints)}", file=sys.stderr)
+        print(f"Maps back by modes {perm['modes']}, rows {perm['rows']}, cols {perm['cols']}", file=sys.stderr)
+    
+    ConstrainedSecantGenerator = load_generator(args.type)
+    extra = {"points": args.points, "jacobian_seed": args.seed} if args.type == 'terracini' else {}
+    if args.jacobian == 'evaluated':
+        extra["jacobian"] = "evaluated"
+    if args.bipartitions:
+        from _utils._flattenings import parse_bipartitions
+        extra["bipartitions"] = parse_bipartitions(args.bipartitions)
+    if args.block_order or args.degree_limit or args.linear_section:
+        extra["elimination"] = elimination_options(args)
+    if args.type == 'slicing':
+        extra.update(slices=args.slices or "all", slice_count=args.slice_count, slice_seed=args.seed,
+                     stream_minors=args.stream_minors)
+    gen = ConstrainedSecantGenerator(shape=shape, rank=args.rank, constraints=constraints, field=args.field,
+                                     prune=not args.no_prune, compact=args.compact, profile=args.profile, **extra)
+    
+    if args.engine == 'native':
+        if args.incremental:
+            gen.run_native_by_rank(seed=args.seed)
+        else:
+            gen.run_native(seed=args.seed)
+        raise SystemExit(0)
+    
+    if args.out == '-':
+        gen.export(sys.stdout)
+        raise SystemExit(0)
     
     base_dir = os.path.dirname(os.path.abspath(__file__))
     out_path = os.path.join(base_dir, 'M2', args.out)
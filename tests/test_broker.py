@@ -0,0 +1,147 @@
+'''
+Broker failure handling, with workers in threads of the test process.
+
+run_job is stubbed, so no M2 is needed. Raw BrokerClient connections stand in for workers that die or go silent: they pull a job and then disconnect, stop talking, or answer late.
+'''
+
+import threading
+import time
+
+import pytest
+
+from _utils import _broker
+from _utils._broker import Broker, BrokerClient, run_worker
+from _utils._journal import job_id
+from _utils._scheduler import make_job
+
+
+WAIT = 5.0
+
+
+@pytest.fixture(autouse=True)
+def fast_broker(monkeypatch):
+    calls = []
+
+    def fake_run_job(job, **kwargs):
+        calls.append(job["name"])
+        return dict(job, status="ok", returncode=0, output="")
+
+    monkeypatch.setattr(_broker, "run_job", fake_run_job)
+    monkeypatch.setattr(_broker, "POLL_INTERVAL", 0.05)
+    return calls
+
+
+def _jobs(n):
+    return [make_job(f"job{i}", "full", "2,2,2", 1, "") for i in range(n)]
+
+
+def _start(jobs, **kwargs):
+    broker = Broker(jobs, port=0, **kwargs)
+    broker.start()
+    return broker
+
+
+def _worker_thread(broker, name):
+    thread = threading.Thread(target=lambda: list(run_worker(port=broker.port, worker=name, connect_wait=WAIT)),
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+def _pull(client, name):
+    client.request({"op": "hello", "worker": name})
+    deadline = time.time() + WAIT
+    while time.time() < deadline:
+        reply = client.request({"op": "pull", "worker": name})
+        if reply.get("job") is not None:
+            return reply
+        time.sleep(0.05)
+    raise AssertionError(f"{name} got no job")
+
+
+def _collect(broker, threads=()):
+    results = list(broker.run())
+    for thread in threads:
+        thread.join(WAIT)
+        assert not thread.is_alive()
+    return {result["name"]: result for result in results}, results
+
+
+def test_workers_finish_every_job_once(fast_broker):
+    broker = _start(_jobs(6))
+    threads = [_worker_thread(broker, f"w{i}") for i in range(2)]
+    by_name, results = _collect(broker, threads)
+    assert len(results) == 6
+    assert all(result["status"] == "ok" for result in results)
+    assert sorted(fast_broker) == sorted(by_name)
+
+
+def test_disconnected_worker_jobs_are_requeued():
+    broker = _start(_jobs(3))
+    dropped = BrokerClient(port=broker.port)
+    lost_job = _pull(dropped, "dropped")["job"]
+    dropped.close()
+
+    by_name, results = _collect(broker, [_worker_thread(broker, "live")])
+    assert len(results) == 3
+    assert by_name[lost_job["name"]]["status"] == "ok"
+    assert by_name[lost_job["name"]]["worker"] == "live"
+    assert broker.attempts[job_id(lost_job)] == 1
+
+
+def test_silent_worker_is_reaped():
+    broker = _start(_jobs(2), heartbeat_timeout=0.4)
+    # the connection stays open, but no heartbeat ever comes
+    silent = BrokerClient(port=broker.port)
+    try:
+        silent_job = _pull(silent, "silent")["job"]
+        by_name, results = _collect(broker, [_worker_thread(broker, "live")])
+    finally:
+        silent.close()
+    assert len(results) == 2
+    assert by_name[silent_job["name"]]["status"] == "ok"
+    assert by_name[silent_job["name"]]["worker"] == "live"
+    assert "silent" not in broker.workers
+
+
+def test_job_is_lost_after_max_attempts(fast_broker):
+    broker = _start(_jobs(1), max_attempts=2)
+    for attempt in range(2):
+        client = BrokerClient(port=broker.port)
+        _pull(client, f"dropped{attempt}")
+        client.close()
+
+    # the live worker only drains the queue; the lost job is never offered again
+    _, results = _collect(broker, [_worker_thread(broker, "live")])
+    assert fast_broker == []
+    assert len(results) == 1
+    assert results[0]["status"] == "lost"
+    assert "dropped1 disconnected" in results[0]["error"]
+
+
+@pytest.mark.parametrize("first", ["late", "retry"])
+def test_first_result_wins(first):
+    broker = _start(_jobs(1))
+    late, retry = BrokerClient(port=broker.port), BrokerClient(port=broker.port)
+    try:
+        key = _pull(late, "late")["id"]
+        # declared dead while its connection is still open, so it can still answer
+        broker.disconnect("late")
+        assert _pull(retry, "retry")["id"] == key
+
+        clients = {"late": late, "retry": retry}
+        order = [first, "retry" if first == "late" else "late"]
+        for name in order:
+            reply = clients[name].request({"op": "result", "worker": name, "id": key,
+                                           "result": {"name": "job0", "status": "ok", "answer": name}})
+            assert reply == {"ok": True}
+
+        assert broker.results.qsize() == 1
+        result = broker.results.get_nowait()
+        assert result["worker"] == first
+        assert result["answer"] == first
+        assert retry.request({"op": "pull", "worker": "retry"})["done"]
+    finally:
+        late.close()
+        retry.close()
+        broker.shutdown()
@@ -0,0 +1,86 @@
+'''
+Keys and eviction of the on-disk result cache.
+'''
+
+import os
+import time
+
+from _utils._cache import ResultCache, cache_key, key_symmetries
+from _utils._scheduler import make_job
+
+
+def _job(gen_type="full", constraints="0,0,0", options=None, shape="3,3,3", rank=2):
+    job = make_job("cache_test", gen_type, shape, rank, constraints)
+    if options is not None:
+        job["options"] = options
+    return job
+
+
+def test_isomorphic_problems_share_a_key():
+    # zeroing a different row, column and mode gives the same orbit
+    assert cache_key(_job(constraints="0,0,0")) == cache_key(_job(constraints="2,1,1"))
+    assert cache_key(_job(constraints="0,0,0")) != cache_key(_job(constraints="0,0,0;0,0,1"))
+
+
+def test_mode_naming_options_keep_the_mode_labels():
+    flattening = {"bipartitions": [[0]]}
+    assert key_symmetries(_job("flattening", options=flattening)) == ("cols", "rows")
+    assert key_symmetries(_job("flattening", options={"bipartitions": "all"})) == ("cols", "rows", "modes")
+    # a zero in mode 0 and a zero in mode 2 meet the mode-0 flattening differently
+    assert (cache_key(_job("flattening", "0,0,0", flattening)) !=
+            cache_key(_job("flattening", "2,0,0", flattening)))
+    assert (cache_key(_job("flattening", "0,0,0", flattening)) ==
+            cache_key(_job("flattening", "0,2,1", flattening)))
+
+
+def test_random_choices_keep_the_labels_they_draw_from():
+    assert key_symmetries(_job("slicing", options={"slices": "covering"})) == ("cols", "rows")
+    assert key_symmetries(_job("slicing", options={"slices": "random", "slice_seed": 1})) == ("cols",)
+    assert key_symmetries(_job(options={"elimination": {"linear_section": 2}})) == ("cols",)
+    assert key_symmetries(_job("terracini", options={"jacobian_seed": 1})) == ()
+
+
+def test_unseeded_random_runs_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for job in (_job("terracini"), _job("slicing", options={"slices": "random"})):
+        assert cache.put(job, "script", "output", {}) is None
+        assert cache.get(job) is None
+    seeded = _job("terracini", options={"jacobian_seed": 1})
+    cache.put(seeded, "script", "output", {"elapsed": 1.0})
+    assert cache.get(seeded)["output"] == "output"
+    assert cache.stats()["entries"] == 1
+
+
+def _age(cache, key, seconds):
+    meta_path = os.path.join(cache._entry_dir(key), "entry.json")
+    then = time.time() - seconds
+    os.utime(meta_path, (then, then))
+
+
+def test_eviction_drops_the_least_recently_used_entry(tmp_path):
+    jobs = [_job(constraints=constraints) for constraints in ("0,0,0", "0,0,0;0,0,1", "0,0,0;1,0,1")]
+    cache = ResultCache(str(tmp_path))
+    first, second = (cache.put(job, "script", "x" * 4000, {}) for job in jobs[:2])
+    entry_bytes = cache.stats()["bytes"] / 2
+    cache.max_bytes = int(2.5 * entry_bytes)
+
+    _age(cache, first, 200)
+    _age(cache, second, 100)
+    # a hit makes the first entry the most recently used
+    assert cache.get(jobs[0]) is not None
+    third = cache.put(jobs[2], "script", "x" * 4000, {})
+
+    assert cache.get(jobs[1]) is None
+    assert cache.get(jobs[0]) is not None and cache.get(jobs[2]) is not None
+    assert cache.stats()["entries"] == 2
+    assert {first, third} == {os.path.basename(path) for path in cache._entries()}
+
+
+def test_invalidate_by_problem_fields(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put(_job(rank=2), "script", "output", {})
+    cache.put(_job(rank=3), "script", "output", {})
+    cache.put(_job("terracini", rank=3, options={"jacobian_seed": 1}), "script", "output", {})
+    assert cache.invalidate(rank=3, type="full") == 1
+    assert cache.stats()["entries"] == 2
+    assert cache.clear() == 2
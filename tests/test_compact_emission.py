@@ -0,0 +1,101 @@
+'''
+Compact and unrolled emission must describe the same problem.
+
+The structural tests read the data block of a compact script (shape, rank, constraints, pruned entries and factors), expand it the way the M2 definitions in _utils._compact do, and compare the result with the ring, CP ideal and CP map written out by the unrolled script. They run without M2. The M2 tests run both scripts for test1-test3 and compare the parsed Betti tables (Jacobian ranks for terracini); they are skipped when M2 is not on PATH.
+'''
+
+import itertools
+import re
+import shutil
+
+import pytest
+
+from _utils._compare_emission import TEST_CASES, run_m2
+from _utils._parse import parse_betti, parse_terracini
+from generate import GENERATOR_TYPES, load_generator, parse_constraints
+
+
+STRUCTURAL_CASES = TEST_CASES + [
+    # every entry with first index 0 is identically zero
+    ("zero_entries", [3, 3, 3], 2, "0,0,0;0,0,1"),
+    # component 1 is dead in mode 0, so its factors in the other modes are unused
+    ("unused_factors", [3, 3, 3], 2, "0,0,1;0,1,1;0,2,1"),
+]
+M2_TIMEOUT = 600
+
+
+def _script(gen_type, shape, rank, constraints, compact, prune=True):
+    gen = load_generator(gen_type)(shape=shape, rank=rank, constraints=parse_constraints(constraints),
+                                   field="ZZ/32003", prune=prune, compact=compact)
+    return gen.generate_m2_script()
+
+
+def _m2_set(script, name):
+    line = re.search(rf"^{name} = set \{{(.*)\}}$", script, re.MULTILINE).group(1)
+    return {tuple(map(int, t.split(","))) for t in re.findall(r"\(([\d,]+)\)", line)}
+
+
+def _expand_compact(script):
+    shape = list(map(int, re.search(r"^shape = \{(.*)\}$", script, re.MULTILINE).group(1).split(", ")))
+    rank = int(re.search(r"^cpRank = (\d+)$", script, re.MULTILINE).group(1))
+    constraints = _m2_set(script, "constraints")
+    zero_entries = _m2_set(script, "zeroEntries")
+    unused_factors = _m2_set(script, "unusedFactors")
+
+    def name(prefix, indices):
+        return f"{prefix}_({','.join(map(str, indices))})"
+
+    def factor(m, r, c):
+        return None if (m, r, c) in constraints or (m, r, c) in unused_factors else name("v", (m, r, c))
+
+    factor_indices = [(m, r, c) for m, dim in enumerate(shape) for r in range(dim) for c in range(rank)
+                      if (m, r, c) not in constraints and (m, r, c) not in unused_factors]
+    tensor_indices = [i for i in itertools.product(*map(range, shape)) if i not in zero_entries]
+    cp = {}
+    for i in tensor_indices:
+        terms = [[factor(m, i[m], c) for m in range(len(shape))] for c in range(rank)]
+        cp[i] = " + ".join("*".join(term) for term in terms if None not in term) or "0"
+    return {
+        "constraints": constraints,
+        "factor_vars": [name("v", i) for i in factor_indices],
+        "tensor_vars": [name("t", i) for i in tensor_indices],
+        "cp": [(name("t", i), cp[i]) for i in tensor_indices],
+    }
+
+
+@pytest.mark.parametrize("gen_type", GENERATOR_TYPES)
+@pytest.mark.parametrize("case", STRUCTURAL_CASES, ids=[case[0] for case in STRUCTURAL_CASES])
+@pytest.mark.parametrize("prune", [True, False], ids=["prune", "no_prune"])
+def test_compact_matches_unrolled_structure(gen_type, case, prune):
+    _, shape, rank, constraints = case
+    unrolled = _script(gen_type, shape, rank, constraints, compact=False, prune=prune)
+    expanded = _expand_compact(_script(gen_type, shape, rank, constraints, compact=True, prune=prune))
+
+    assert expanded["constraints"] == set(parse_constraints(constraints))
+
+    ring = re.search(r"^R = kk\[(.*)\]$", unrolled, re.MULTILINE).group(1)
+    if gen_type == "terracini":
+        assert ring == ", ".join(expanded["factor_vars"])
+        cp_map = re.search(r"^F = matrix\{\{ (.*) \}\}$", unrolled, re.MULTILINE).group(1)
+        assert cp_map == ", ".join(expr for _, expr in expanded["cp"])
+    else:
+        assert ring == ", ".join(expanded["factor_vars"] + expanded["tensor_vars"])
+        ideal = re.search(r"^\w+ = ideal\(\n(.*?)\n\)$", unrolled, re.MULTILINE | re.DOTALL).group(1)
+        assert ideal.split(",\n") == [f"    {t_var} - ({expr})" for t_var, expr in expanded["cp"]]
+
+
+@pytest.mark.skipif(shutil.which("M2") is None, reason="M2 not found on PATH")
+@pytest.mark.parametrize("gen_type", GENERATOR_TYPES)
+@pytest.mark.parametrize("case", TEST_CASES, ids=[case[0] for case in TEST_CASES])
+def test_compact_matches_unrolled_in_m2(gen_type, case, tmp_path):
+    name, shape, rank, constraints = case
+    parsed = {}
+    for compact in (False, True):
+        gen = load_generator(gen_type)(shape=shape, rank=rank, constraints=parse_constraints(constraints),
+                                       field="ZZ/32003", compact=compact)
+        output = run_m2(gen, str(tmp_path), f"{name}_{gen_type}_{'compact' if compact else 'unrolled'}", M2_TIMEOUT)
+        if output is None:
+            pytest.skip(f"M2 timed out after {M2_TIMEOUT}s")
+        parsed[compact] = parse_terracini(output) if gen_type == "terracini" else parse_betti(output)
+        assert parsed[compact] is not None, output
+    assert parsed[False] == parsed[True]
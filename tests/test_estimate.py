@@ -0,0 +1,18 @@
+'''
+Pre-flight counts must describe the equations the generator actually builds.
+'''
+
+from _utils._estimate import estimate_job
+from _utils._scheduler import build_generator, make_job
+
+
+def test_koszul_estimate_follows_the_requested_degree():
+    job = make_job("koszul_degree", "koszul", "5,5,5", 6, "")
+    default = estimate_job(job)
+    job["options"] = {"koszul_degree": 2}
+    counts = estimate_job(job)
+    config = build_generator(job).koszul
+    assert config["degree"] == 2
+    assert counts["equations"] == config["minor_count"]
+    assert counts["equation_degree"] == config["minor_size"]
+    assert counts["equations"] != default["equations"]
@@ -0,0 +1,81 @@
+'''
+Journal replay and resume, on journal files in a temporary directory.
+'''
+
+import json
+
+from _utils._journal import JobJournal, job_id, start_in_worker
+from _utils._scheduler import make_job
+
+
+def _jobs(n):
+    return [make_job(f"job{i}", "full", "2,2,2", 1, "") for i in range(n)]
+
+
+def _states(path):
+    with open(path) as f:
+        return [(event["name"], event["state"], event["attempt"]) for event in map(json.loads, f)]
+
+
+def test_resume_skips_finished_and_retries_failed(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    jobs = _jobs(4)
+    journal = JobJournal(path, max_attempts=2)
+    assert list(journal.resume(jobs)) == jobs
+    for job, status in zip(jobs, ["ok", "error", "timeout", "refused"]):
+        journal.start(job)
+        journal.finish(job, {"status": status})
+
+    replayed = JobJournal(path, max_attempts=2)
+    assert replayed.counts()["done"] == 1
+    assert replayed.entries[job_id(jobs[1])] == {"name": "job1", "state": "failed", "attempts": 1}
+    assert [job["name"] for job in replayed.resume(jobs)] == ["job1", "job2"]
+
+    # both retries use up the last attempt
+    for job in jobs[1:3]:
+        replayed.start(job)
+        replayed.finish(job, {"status": "error"})
+    assert list(JobJournal(path, max_attempts=2).resume(jobs)) == []
+
+
+def test_replay_skips_a_truncated_last_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    job, other = _jobs(2)
+    journal = JobJournal(path)
+    journal.start(job)
+    with open(path, "a") as f:
+        f.write('{"id": "trunc')
+
+    journal = JobJournal(path)
+    assert journal.entries[job_id(job)]["state"] == "running"
+    journal.record(other, "queued")
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[-2] == '{"id": "trunc'
+    assert json.loads(lines[-1])["name"] == "job1"
+
+
+def test_claimed_attempt_is_journaled_by_the_worker(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    job = _jobs(1)[0]
+    journal = JobJournal(path)
+    attempt = journal.claim(job)
+    start_in_worker(path, job, attempt)
+    assert JobJournal(path).entries[job_id(job)] == {"name": "job0", "state": "running", "attempts": 1}
+
+
+def test_interrupted_job_is_lost_after_max_attempts(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    job = _jobs(1)[0]
+    for attempt in range(1, 3):
+        journal = JobJournal(path, max_attempts=2)
+        assert list(journal.resume([job])) == [job]
+        # the run dies with the job still running
+        journal.start(job)
+        assert journal.entries[job_id(job)]["attempts"] == attempt
+
+    journal = JobJournal(path, max_attempts=2)
+    assert list(journal.resume([job])) == []
+    assert journal.counts()["lost"] == 1
+    assert _states(path)[-1] == ("job0", "lost", 2)
+    assert list(JobJournal(path, max_attempts=2).resume([job])) == []
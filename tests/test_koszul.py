@@ -0,0 +1,68 @@
+'''
+Koszul-Young flattenings, assembled numerically from wedge_entries the way the generator assembles them in M2.
+'''
+
+import math
+
+import numpy as np
+
+from _utils._koszul import choose_configuration, configurations, wedge_entries
+from _utils._modp import rank_mod_p
+
+
+P = 32003
+
+
+def _wedge(a_dim, p, i):
+    W = np.zeros((math.comb(a_dim, p), math.comb(a_dim, p + 1)), dtype=np.int64)
+    for row, col, sign in wedge_entries(a_dim, p, i):
+        W[row, col] = sign
+    return W
+
+
+def _koszul_matrix(tensor, config):
+    # sum_i W_i (x) X_i, with X_i the B x C slice at A-index i
+    moved = np.moveaxis(tensor, [config["a_mode"]] + config["b_modes"] + config["c_modes"], range(tensor.ndim))
+    rows = math.prod(moved.shape[1:1 + len(config["b_modes"])])
+    return sum(np.kron(_wedge(config["a_dim"], config["degree"], i), moved[i].reshape(rows, -1))
+               for i in range(config["a_dim"])) % P
+
+
+def _cp_tensor(shape, rank, rng):
+    factors = [rng.integers(0, P, (dim, rank)) for dim in shape]
+    tensor = np.zeros(shape, dtype=np.int64)
+    for j in range(rank):
+        term = factors[0][:, j]
+        for factor in factors[1:]:
+            term = np.multiply.outer(term, factor[:, j]) % P
+        tensor = (tensor + term) % P
+    return tensor
+
+
+def test_wedge_is_signed_and_squares_to_zero():
+    # e_1 wedge {0} = -{0, 1}, e_1 wedge {2} = {1, 2}
+    assert wedge_entries(3, 1, 1) == [(0, 0, -1), (2, 2, 1)]
+    for i in range(4):
+        for j in range(4):
+            product = _wedge(4, 0, i) @ _wedge(4, 1, j) + _wedge(4, 0, j) @ _wedge(4, 1, i)
+            assert not product.any()
+
+
+def test_strassen_flattening_of_a_rank_four_tensor():
+    config = choose_configuration([3, 3, 3], 4)
+    assert (config["rows"], config["cols"], config["minor_size"], config["minor_count"]) == (9, 9, 9, 1)
+    rng = np.random.default_rng(0)
+    assert rank_mod_p(_koszul_matrix(_cp_tensor([3, 3, 3], 1, rng), config), P) == 2
+    # the single 9x9 minor vanishes on rank 4, but not on a generic tensor
+    assert rank_mod_p(_koszul_matrix(_cp_tensor([3, 3, 3], 4, rng), config), P) == 8
+    assert rank_mod_p(_koszul_matrix(rng.integers(0, P, (3, 3, 3)), config), P) == 9
+
+
+def test_rank_bound_of_every_configuration():
+    rng = np.random.default_rng(1)
+    shape, rank = [4, 3, 3], 2
+    tensor = _cp_tensor(shape, rank, rng)
+    for config in configurations(shape, rank):
+        matrix = _koszul_matrix(tensor, config)
+        assert matrix.shape == (config["rows"], config["cols"])
+        assert rank_mod_p(matrix, P) == config["minor_size"] - 1
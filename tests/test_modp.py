@@ -0,0 +1,73 @@
+'''
+Ranks and row spans over ZZ/p.
+'''
+
+import numpy as np
+import pytest
+
+from _utils._modp import IncrementalSpan, field_prime, is_prime, next_primes, rank_mod_p, rref_mod_p
+
+
+P = 32003
+
+
+def test_rank_of_known_matrices():
+    assert rank_mod_p(np.eye(4, dtype=np.int64), P) == 4
+    assert rank_mod_p([[1, 2, 3], [2, 4, 6]], P) == 1
+    assert rank_mod_p(np.zeros((3, 5), dtype=np.int64), P) == 0
+    assert rank_mod_p(np.zeros((0, 3), dtype=np.int64), P) == 0
+    # full rank over QQ, but the determinant 7 vanishes mod 7
+    assert rank_mod_p([[1, 2], [3, 13]], 7) == 1
+    assert rank_mod_p([[1, 2], [3, 13]], P) == 2
+
+
+def test_rank_of_a_product_of_random_factors():
+    rng = np.random.default_rng(0)
+    for rows, cols, inner in [(8, 12, 5), (12, 8, 5), (10, 10, 10)]:
+        A = rng.integers(0, P, (rows, inner))
+        B = rng.integers(0, P, (inner, cols))
+        product = (A @ B) % P
+        assert rank_mod_p(product, P) == inner
+        assert rank_mod_p(product.T, P) == inner
+
+
+def test_rref_is_reduced_at_its_pivots():
+    rng = np.random.default_rng(1)
+    matrix = rng.integers(0, P, (4, 7))
+    matrix[3] = (matrix[0] + 2 * matrix[1]) % P
+    basis, pivots = rref_mod_p(matrix, P)
+    assert len(pivots) == 3 == rank_mod_p(matrix, P)
+    assert (basis[:, pivots] == np.eye(3, dtype=np.int64)).all()
+
+
+def test_incremental_span_tracks_the_rank_of_all_vectors_added():
+    rng = np.random.default_rng(2)
+    # 9 vectors in a 6-dimensional subspace of ZZ/p^10
+    vectors = rng.integers(0, P, (9, 6)) @ rng.integers(0, P, (6, 10)) % P
+    span = IncrementalSpan(10, P)
+    for end in range(3, 10, 3):
+        assert span.add(vectors[end - 3:end]) == rank_mod_p(vectors[:end], P)
+    assert span.rank == 6
+    assert not span.full
+    assert (span.basis[:, span.pivots] == np.eye(6, dtype=np.int64)).all()
+
+
+def test_extended_leaves_the_span_untouched():
+    span = IncrementalSpan(3, P)
+    span.add([[1, 0, 0]])
+    grown = span.extended([[0, 1, 0], [1, 1, 0]])
+    assert (span.rank, grown.rank) == (1, 2)
+    assert span.extended([[5, 0, 0]]) is span
+    assert grown.extended([[0, 0, 1]]).full
+
+
+def test_field_prime():
+    assert field_prime("ZZ/32003") == 32003
+    assert field_prime("QQ") == 2147483647
+    with pytest.raises(ValueError):
+        field_prime("GF(101)")
+
+
+def test_primes():
+    assert [n for n in range(20) if is_prime(n)] == [2, 3, 5, 7, 11, 13, 17, 19]
+    assert next_primes(32003, 3) == [32003, 32009, 32027]
@@ -0,0 +1,37 @@
+'''
+Schwartz-Zippel bound and consensus of multi-prime Terracini checks.
+'''
+
+import math
+
+import pytest
+
+from _utils._multiprime import compare, rank_error_bound
+
+
+def test_bound_uses_the_degree_of_the_next_minor():
+    # an observed rank of 26 is only too low if a nonzero 27x27 minor, of degree 27 * 2, vanishes
+    assert rank_error_bound([3, 3, 3], 26, [32003], 1) == pytest.approx(54 / 32003)
+
+
+def test_bound_multiplies_over_primes_and_points():
+    expected = (54 / 32003) ** 2 * (54 / 32009) ** 2
+    assert rank_error_bound([3, 3, 3], 26, [32003, 32009], 2) == pytest.approx(expected)
+
+
+def test_bound_is_capped_at_one():
+    assert rank_error_bound([2, 2, 2, 2], 10, [5], 1) == 1.0
+    assert rank_error_bound([2, 2, 2, 2], 10, [5, 101], 1) == pytest.approx(33 / 101)
+
+
+def test_terracini_consensus_is_the_maximum_rank():
+    job = {"type": "terracini", "shape": "3,3,3"}
+    results = [{"prime": 32003, "status": "ok", "result": {"actual_dimension": 26}},
+               {"prime": 32009, "status": "ok", "result": {"actual_dimension": 25}},
+               {"prime": 32027, "status": "failed"}]
+    check = compare(job, results)
+    assert check["consensus"] == 26
+    assert check["dissenting"] == [32009]
+    assert check["missing"] == [32027]
+    assert not check["agree"]
+    assert check["error_bound"] == pytest.approx(math.prod(54 / p for p in (32003, 32009)))
@@ -0,0 +1,62 @@
+'''
+Parsing the reports our scripts print.
+'''
+
+from _generators.generator_terracini import ConstrainedSecantGenerator
+from _utils._parse import parse_betti, parse_output, parse_terracini
+
+
+BETTI_OUTPUT = """\
+--- Betti Table of the Generators ---
+            0  1
+total:      1 31
+    0:      1  .
+    1:      .  4
+    2:      . 27
+
+Degree Limit: 3
+Hilbert Function: {1, 27, 374, 3272}
+"""
+
+
+def test_betti_counts_generators_by_degree():
+    betti = parse_betti(BETTI_OUTPUT)
+    assert betti["columns"] == [0, 1]
+    assert betti["totals"] == [1, 31]
+    assert betti["rows"] == {0: [1, 0], 1: [0, 4], 2: [0, 27]}
+    assert betti["generators_by_degree"] == {2: 4, 3: 27}
+    assert betti["num_generators"] == 31
+
+
+def test_output_without_a_betti_table():
+    assert parse_betti("J = ideal()\n") is None
+    assert parse_output("nothing to see\n") == {}
+
+
+def test_elimination_report_is_merged_into_the_output():
+    parsed = parse_output(BETTI_OUTPUT)
+    assert parsed["betti"]["num_generators"] == 31
+    assert parsed["degree_limit"] == 3
+    assert parsed["hilbert_function"] == [1, 27, 374, 3272]
+
+
+def test_terracini_report_of_the_native_engine(capsys):
+    # 3x3x3 at rank 4 is defective: 28 expected, 26 actual
+    gen = ConstrainedSecantGenerator(shape=[3, 3, 3], rank=4, field="ZZ/32003", points=2)
+    gen.run_native(seed=0)
+    report = parse_terracini(capsys.readouterr().out)
+    assert report == {
+        "free_parameters": 36,
+        "scaling_redundancies": 8,
+        "expected_dimension": 28,
+        "actual_dimension": 26,
+        "point_ranks": [26, 26],
+    }
+
+
+def test_rank_sweep_report_of_the_native_engine(capsys):
+    gen = ConstrainedSecantGenerator(shape=[2, 2, 2], rank=3, field="ZZ/32003")
+    gen.run_native_by_rank(seed=0)
+    parsed = parse_output(capsys.readouterr().out)
+    assert [entry["actual_dimension"] for entry in parsed["by_rank"]] == [4, 8, 8]
+    assert parsed["filling_rank"] == 2
@@ -0,0 +1,37 @@
+'''
+Orbit representatives from enumerate_patterns, against brute force over every subset of factor entries.
+'''
+
+import itertools
+
+import pytest
+
+from _utils._sweep import enumerate_patterns
+from _utils._symmetry import orbit_key
+
+
+def _entries(shape, rank):
+    return [(m, r, c) for m, dim in enumerate(shape) for r in range(dim) for c in range(rank)]
+
+
+def test_orbits_of_two_zeros():
+    # same mode and component (other row), same component (other mode), other component in
+    # the same row, another row of the same mode, or another mode
+    counts = [sum(len(pattern) == k for pattern in enumerate_patterns([2, 2, 2], 2, 2)) for k in range(3)]
+    assert counts == [1, 1, 5]
+
+
+@pytest.mark.parametrize("shape, rank, max_zeros, symmetries", [
+    ([2, 2, 2], 2, 4, ("cols", "rows", "modes")),
+    ([2, 3], 2, 3, ("cols", "rows", "modes")),
+    ([2, 2, 2], 2, 3, ("cols",)),
+])
+def test_enumerated_orbits_match_brute_force(shape, rank, max_zeros, symmetries):
+    patterns = list(enumerate_patterns(shape, rank, max_zeros, symmetries))
+    keys = [orbit_key(shape, rank, pattern, symmetries) for pattern in patterns]
+    assert len(set(keys)) == len(keys)
+
+    entries = _entries(shape, rank)
+    for k in range(max_zeros + 1):
+        orbits = {orbit_key(shape, rank, subset, symmetries) for subset in itertools.combinations(entries, k)}
+        assert sum(len(pattern) == k for pattern in patterns) == len(orbits)
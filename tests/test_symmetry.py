@@ -0,0 +1,46 @@
+'''
+Canonical forms of constraint patterns under relabelling.
+'''
+
+import random
+
+import pytest
+
+from _utils._symmetry import canonical_form, map_back, orbit_key
+
+
+def _entries(shape, rank):
+    return [(m, r, c) for m, dim in enumerate(shape) for r in range(dim) for c in range(rank)]
+
+
+def _relabel(constraints, shape, rank, rng, symmetries):
+    # a random element of the symmetry group, applied to a pattern
+    modes = list(range(len(shape)))
+    if "modes" in symmetries:
+        for dim in set(shape):
+            group = [m for m in modes if shape[m] == dim]
+            for m, target in zip(group, rng.sample(group, len(group))):
+                modes[m] = target
+    rows = [rng.sample(range(dim), dim) if "rows" in symmetries else list(range(dim)) for dim in shape]
+    cols = rng.sample(range(rank), rank) if "cols" in symmetries else list(range(rank))
+    return sorted((modes[m], rows[modes[m]][r], cols[c]) for m, r, c in constraints)
+
+
+@pytest.mark.parametrize("symmetries", [("cols", "rows", "modes"), ("cols", "rows"), ("cols",)])
+def test_canonical_form_is_invariant_under_the_group(symmetries):
+    rng = random.Random(0)
+    for shape, rank in [([3, 3, 3], 3), ([2, 3, 3], 2), ([2, 2, 2, 2], 3)]:
+        entries = _entries(shape, rank)
+        for _ in range(20):
+            pattern = sorted(rng.sample(entries, rng.randint(1, 6)))
+            canonical, perm = canonical_form(shape, rank, pattern, symmetries)
+            assert map_back(canonical, perm) == pattern
+            relabelled = _relabel(pattern, shape, rank, rng, symmetries)
+            assert canonical_form(shape, rank, relabelled, symmetries)[0] == canonical
+
+
+def test_fewer_symmetries_tell_more_patterns_apart():
+    shape, rank = [3, 3, 3], 2
+    assert orbit_key(shape, rank, [(0, 0, 0)]) == orbit_key(shape, rank, [(2, 1, 1)])
+    assert orbit_key(shape, rank, [(0, 0, 0)], ("cols", "rows")) != orbit_key(shape, rank, [(2, 1, 1)], ("cols", "rows"))
+    assert orbit_key(shape, rank, [(0, 0, 0)], ("cols",)) != orbit_key(shape, rank, [(0, 1, 0)], ("cols",))
@@ -0,0 +1,39 @@
+'''
+Native Terracini dimensions over ZZ/p.
+'''
+
+import numpy as np
+
+from _utils._support import CPSupport
+from _utils._terracini import (cp_jacobian, incremental_jacobian_ranks, jacobian_rank, jacobian_ranks, random_point,
+                               sparse_cp_jacobian)
+
+
+P = 32003
+
+
+def test_defective_three_by_three_by_three():
+    # sigma_4 of P2 x P2 x P2 is a hypersurface: 26, not the expected 28 capped at 27
+    support = CPSupport([3, 3, 3], 4, set())
+    assert jacobian_rank(support, P, seed=0) == 26
+    assert jacobian_ranks(support, P, points=3, seed=0) == [26, 26, 26]
+    assert incremental_jacobian_ranks(support, P, seed=0) == [7, 14, 21, 26]
+
+
+def test_constraints_drop_jacobian_columns():
+    # zeroing a whole factor column leaves component 1 without mode 0, so it adds nothing
+    constraints = {(0, r, 1) for r in range(3)}
+    support = CPSupport([3, 3, 3], 2, constraints)
+    factors = random_point(support, P, np.random.default_rng(0))
+    assert cp_jacobian(support, factors, P).shape == (27, 15)
+    assert jacobian_rank(support, P, seed=0) == 7
+    assert incremental_jacobian_ranks(support, P, seed=0) == [7, 7]
+
+
+def test_sparse_jacobian_matches_the_dense_one():
+    support = CPSupport([2, 3, 3], 3, {(0, 0, 0), (1, 2, 1), (2, 0, 2)})
+    factors = random_point(support, P, np.random.default_rng(1))
+    rows, cols, values, (n_rows, n_cols) = sparse_cp_jacobian(support, factors, P, prune=False)
+    sparse = np.zeros((n_rows, n_cols), dtype=np.int64)
+    sparse[rows, cols] = values
+    assert (sparse == cp_jacobian(support, factors, P).T).all()